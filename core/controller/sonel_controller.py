@@ -17,16 +17,23 @@ import logging
 import traceback
 from pathlib import Path
 from datetime import datetime
-from typing import Tuple, Dict, Any, Optional
+from typing import Tuple, Dict, Any, Optional, Callable
 
 from core.etl.sonel_etl import SonelETL
 from config.logger import get_logger
 from core.database.connection import DatabaseConnection
+from core.utils.config_options import get_config_int
+from core.database.schema import ensure_schema
+from core.database.export_watermark import ExportWatermark
 from core.extractors.pywin_extractor import SonelExtractorCompleto
 from core.extractors.pygui_extractor import SonelGuiExtractorCompleto
 from config.settings import get_full_config, validate_configuration, validate_screen_resolution, get_portable_paths, find_sonel_exe, get_application_directory, load_config
 
 
+class ExportCancelledError(Exception):
+    """La exportación fue cancelada antes de terminar"""
+
+
 class SonelController:
     """
     Controlador principal que maneja tanto la extracción PYWIN como el procesamiento ETL
@@ -846,12 +853,21 @@ class SonelController:
             'db_summary': db_summary
         }
     
-    def export_mediciones_to_csv(self, file_path: str = None) -> Tuple[bool, str]:
+    def export_mediciones_to_csv(self, file_path: str = None, fecha_desde=None, fecha_hasta=None,
+                                 progress_callback: Optional[Callable[[int, int], None]] = None,
+                                 cancel_event=None, incremental: bool = False,
+                                 target: str = "eeasa") -> Tuple[bool, str]:
         """
         Exporta todos los registros de mediciones_planas a CSV con formato empresarial EEASA
         
         Args:
             file_path: Ruta donde guardar el archivo CSV (opcional)
+            fecha_desde: Fecha inicial de las mediciones a exportar (opcional, inclusive)
+            fecha_hasta: Fecha final de las mediciones a exportar (opcional, inclusive)
+            progress_callback: Función (registros_exportados, total) llamada tras cada bloque (opcional)
+            cancel_event: Objeto con is_set() (p. ej. threading.Event) para cancelar la exportación (opcional)
+            incremental: Si es True, solo exporta los registros posteriores a la marca de agua del destino
+            target: Destino de exportación al que pertenece la marca de agua (modo incremental)
             
         Returns:
             tuple: (success: bool, message: str) - Estado y mensaje de resultado
@@ -872,10 +888,18 @@ class SonelController:
             if file_path is None:
                 timestamp = time.strftime("%Y%m%d_%H%M%S")
                 output_dir = self.rutas.get("output_directory", ".")
-                file_path = os.path.join(output_dir, f"mediciones_planas_EEASA_{timestamp}.csv")
+                prefix = f"mediciones_planas_EEASA_delta_{target}" if incremental else "mediciones_planas_EEASA"
+                file_path = os.path.join(output_dir, f"{prefix}_{timestamp}.csv")
+
+            # La tabla de marcas de agua forma parte del esquema versionado
+            if incremental and not ensure_schema(db_connection):
+                return False, "Error: no se pudo verificar el esquema de la base de datos"
             
             # Extraer datos de la base de datos
-            success, message = self._extract_and_save_eeasa_csv(db_connection, file_path)
+            success, message = self._extract_and_save_eeasa_csv(
+                db_connection, file_path, fecha_desde, fecha_hasta,
+                progress_callback=progress_callback, cancel_event=cancel_event,
+                watermark_target=target if incremental else None)
             
             if success:
                 self.logger.info(f"Exportación exitosa a: {file_path}")
@@ -892,7 +916,63 @@ class SonelController:
             if db_connection:
                 db_connection.close()
 
-    def _extract_and_save_eeasa_csv(self, db_connection: DatabaseConnection, file_path: str) -> Tuple[bool, str]:
+    @staticmethod
+    def _build_eeasa_export_query(where_clause: str = "TRUE") -> str:
+        """
+        Construye la consulta de exportación EEASA (mediciones_planas con datos del código)
+        
+        Args:
+            where_clause: Condición SQL sobre mp (con marcadores de parámetros con nombre)
+            
+        Returns:
+            str: Consulta SQL ordenada por mp.id
+        """
+        # '%%' porque la consulta se ejecuta con parámetros
+        return f"""
+            SELECT 
+                mp.id,
+                c.codigo,
+                -- Extraer nombre sin extensión .csv
+                CASE 
+                    WHEN c.nombre_archivo ILIKE '%%.csv' THEN 
+                        LEFT(c.nombre_archivo, LENGTH(c.nombre_archivo) - 4)
+                    ELSE 
+                        c.nombre_archivo
+                END AS nombre_archivo_limpio,
+                c.origen,
+                mp.fecha,
+                mp.time,
+                mp.utc_zone,
+                mp.u_l1_avg,
+                mp.u_l2_avg,
+                mp.u_l3_avg,
+                mp.u_l12_avg,
+                mp.i_l1_avg,
+                mp.i_l2_avg,
+                mp.p_l1_avg,
+                mp.p_l2_avg,
+                mp.p_l3_avg,
+                mp.p_e_avg,
+                mp.q1_l1_avg,
+                mp.q1_l2_avg,
+                mp.q1_e_avg,
+                mp.sn_l1_avg,
+                mp.sn_l2_avg,
+                mp.sn_e_avg,
+                mp.s_l1_avg,
+                mp.s_l2_avg,
+                mp.s_e_avg,
+                mp.fecha_subida
+            FROM mediciones_planas mp
+            LEFT JOIN codigo c ON mp.codigo_id = c.id
+            WHERE {where_clause}
+            ORDER BY mp.id ASC
+        """
+
+    def _extract_and_save_eeasa_csv(self, db_connection: DatabaseConnection, file_path: str,
+                                    fecha_desde=None, fecha_hasta=None,
+                                    progress_callback: Optional[Callable[[int, int], None]] = None,
+                                    cancel_event=None, watermark_target: Optional[str] = None) -> Tuple[bool, str]:
         """
         Extrae datos de mediciones_planas y los guarda en formato CSV empresarial EEASA
         MODIFICADO: Incluye nombre_archivo sin extensión desde tabla codigo
@@ -900,176 +980,292 @@ class SonelController:
         Args:
             db_connection: Conexión a la base de datos
             file_path: Ruta donde guardar el archivo CSV
+            fecha_desde: Fecha inicial (opcional); con tabla particionada solo se leen los meses necesarios
+            fecha_hasta: Fecha final (opcional, inclusive)
+            progress_callback: Función (registros_exportados, total) llamada tras cada bloque (opcional)
+            cancel_event: Objeto con is_set() para cancelar la exportación (opcional)
+            watermark_target: Destino cuya marca de agua limita y avanza la exportación (modo incremental)
             
         Returns:
             tuple: (success: bool, message: str)
         """
+        # Los parámetros nulos se pliegan al planificar: con desde_id queda un rango sobre mp.id
+        where_clause = """
+            (%(fecha_desde)s::date IS NULL OR mp.fecha >= %(fecha_desde)s::date)
+            AND (%(fecha_hasta)s::date IS NULL OR mp.fecha <= %(fecha_hasta)s::date)
+            AND (%(desde_id)s::bigint IS NULL OR mp.id > %(desde_id)s::bigint)
+            AND (%(hasta_id)s::bigint IS NULL OR mp.id <= %(hasta_id)s::bigint)
+        """
+        params = {'fecha_desde': fecha_desde, 'fecha_hasta': fecha_hasta, 'desde_id': None, 'hasta_id': None}
+
         try:
-            # Query MODIFICADA para incluir nombre_archivo sin extensión
-            query = """
-                SELECT 
-                    mp.id,
-                    c.codigo,
-                    -- Extraer nombre sin extensión .csv
-                    CASE 
-                        WHEN c.nombre_archivo ILIKE '%.csv' THEN 
-                            LEFT(c.nombre_archivo, LENGTH(c.nombre_archivo) - 4)
-                        ELSE 
-                            c.nombre_archivo
-                    END AS nombre_archivo_limpio,
-                    c.origen,
-                    mp.fecha,
-                    mp.time,
-                    mp.utc_zone,
-                    mp.u_l1_avg,
-                    mp.u_l2_avg,
-                    mp.u_l3_avg,
-                    mp.u_l12_avg,
-                    mp.i_l1_avg,
-                    mp.i_l2_avg,
-                    mp.p_l1_avg,
-                    mp.p_l2_avg,
-                    mp.p_l3_avg,
-                    mp.p_e_avg,
-                    mp.q1_l1_avg,
-                    mp.q1_l2_avg,
-                    mp.q1_e_avg,
-                    mp.sn_l1_avg,
-                    mp.sn_l2_avg,
-                    mp.sn_e_avg,
-                    mp.s_l1_avg,
-                    mp.s_l2_avg,
-                    mp.s_e_avg,
-                    mp.fecha_subida
-                FROM mediciones_planas mp
-                LEFT JOIN codigo c ON mp.codigo_id = c.id
-                ORDER BY mp.id ASC;
-            """
-            
-            cursor = db_connection.execute_query(query, commit=False)
-            
-            if not cursor:
+            if watermark_target:
+                # Solo hasta el horizonte: por encima puede haber ids de cargas aún sin confirmar
+                params['desde_id'], params['hasta_id'] = self._read_export_watermark(db_connection,
+                                                                                     watermark_target)
+
+            result = self._stream_eeasa_csv(db_connection, file_path, where_clause, params,
+                                            progress_callback, cancel_event)
+            if result is None:
                 return False, "No se pudo ejecutar la consulta de exportación"
-            
-            # Obtener datos
-            rows = cursor.fetchall()
-            cursor.close()
-            
-            if not rows:
-                return True, "Exportación completada - No hay registros para exportar"
-            
-            # Escribir CSV con formato empresarial EEASA ACTUALIZADO
-            self._write_eeasa_format_csv(file_path, rows)
-            
-            return True, f"Exportación exitosa: {len(rows)} registros exportados"
-            
+
+            total, last_id, last_fecha_subida = result
+            if watermark_target and total:
+                self._save_export_watermark(db_connection, watermark_target, last_id,
+                                            last_fecha_subida, total, file_path)
+        except ExportCancelledError:
+            return False, "Exportación cancelada por el usuario"
         except Exception as e:
             self.logger.error(f"Error durante la exportación CSV: {e}")
             return False, f"Error técnico: {str(e)}"
 
-    def _write_eeasa_format_csv(self, file_path: str, rows: list) -> None:
+        if total == 0:
+            if watermark_target:
+                return True, f"Exportación incremental completada - Sin registros nuevos desde mp.id {params['desde_id']}"
+            return True, "Exportación completada - No hay registros para exportar"
+        if watermark_target:
+            return True, f"Exportación incremental exitosa: {total} registros nuevos (hasta mp.id {last_id})"
+        return True, f"Exportación exitosa: {total} registros exportados"
+
+    @staticmethod
+    def _read_export_watermark(db_connection: DatabaseConnection, target: str) -> Tuple[int, int]:
         """
-        Escribe el archivo CSV siguiendo el formato empresarial de EEASA
-        MODIFICADO: Incluye columna de nombre de archivo sin extensión
+        Lee el último mp.id exportado para un destino y el horizonte de visibilidad,
+        en una transacción corta que libera el bloqueo del horizonte al terminar
         
         Args:
-            file_path: Ruta del archivo CSV
-            rows: Datos a escribir (ahora incluye nombre_archivo_limpio en posición 2)
+            db_connection: Conexión a la base de datos
+            target: Destino de exportación
+            
+        Returns:
+            tuple: (último mp.id exportado (0 si es la primera exportación),
+                    mayor mp.id con todas las filas anteriores confirmadas)
         """
+        connection = db_connection.get_connection()
+        cursor = connection.cursor()
+        try:
+            watermark = ExportWatermark(cursor)
+            return watermark.get(target), watermark.visibility_horizon()
+        finally:
+            cursor.close()
+            connection.rollback()
+
+    @staticmethod
+    def _save_export_watermark(db_connection: DatabaseConnection, target: str, last_id: int,
+                               last_fecha_subida, rows: int, file_path: str) -> None:
+        """Avanza la marca de agua del destino tras escribir el archivo delta"""
+        connection = db_connection.get_connection()
+        cursor = connection.cursor()
+        try:
+            ExportWatermark(cursor).update(target, last_id, last_fecha_subida, rows, file_path)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def _stream_eeasa_csv(self, db_connection: DatabaseConnection, file_path: str, where_clause: str,
+                          params: Dict[str, Any],
+                          progress_callback: Optional[Callable[[int, int], None]] = None,
+                          cancel_event=None) -> Optional[Tuple[int, Optional[int], Any]]:
+        """
+        Escribe el CSV EEASA leyendo con un cursor del lado del servidor por bloques,
+        de modo que la memoria usada no depende del tamaño de la tabla. El conteo y
+        la lectura comparten una instantánea REPEATABLE READ, así el total del
+        encabezado coincide con las filas escritas. Se escribe en un archivo temporal
+        que solo reemplaza al destino al terminar.
         
-        # CORRECCIÓN: Usar UTF-8 con BOM para compatibilidad completa
-        with open(file_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
-            writer = csv.writer(csvfile, delimiter=';')
-            
-            # ENCABEZADO CORPORATIVO EEASA
-            writer.writerow(['EMPRESA ELÉCTRICA AMBATO REGIONAL CENTRO NORTE S.A.'])
-            writer.writerow(['Reporte de Mediciones Eléctricas - Sistema de Monitoreo SONEL'])
-            writer.writerow([])  # Línea en blanco
-            
-            # METADATOS DEL REPORTE
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            writer.writerow([f'Fecha de Generación: {timestamp}'])
-            writer.writerow([f'Total de Registros: {len(rows)}'])
-            writer.writerow([f'Sistema: SONEL Extractor v2.0'])
-            writer.writerow([])  # Línea en blanco
-            
-            # ENCABEZADOS ACTUALIZADOS con nueva columna
-            headers = [
-                'ID Registro',
-                'Código Cliente',
-                'Nombre Archivo Origen',
-                'Tipo de Origen',
-                'Fecha',
-                'Hora Local',
-                'Zona UTC',
-                'Voltaje L1 Promedio (V)',
-                'Voltaje L2 Promedio (V)',
-                'Voltaje L3 Promedio (V)',
-                'Voltaje L12 Promedio (V)',
-                'Corriente L1 Promedio (A)',
-                'Corriente L2 Promedio (A)',
-                'Potencia L1 Promedio (W)',
-                'Potencia L2 Promedio (W)',
-                'Potencia L3 Promedio (W)',
-                'Potencia Total Promedio (W)',
-                'Reactiva Q1 L1 Promedio (VAR)',
-                'Reactiva Q1 L2 Promedio (VAR)',
-                'Reactiva Q1 Total Promedio (VAR)',
-                'Potencia Aparente L1 Promedio (VA)',
-                'Potencia Aparente L2 Promedio (VA)',
-                'Potencia Aparente Total Promedio (VA)',
-                'Factor Potencia L1 Promedio',
-                'Factor Potencia L2 Promedio',
-                'Factor Potencia Total Promedio',
-                'Fecha de Carga en Sistema'
-            ]
-            writer.writerow(headers)
+        Args:
+            db_connection: Conexión a la base de datos
+            file_path: Ruta del archivo CSV
+            where_clause: Condición SQL sobre mp
+            params: Parámetros de la condición
+            progress_callback: Función (registros_exportados, total) (opcional)
+            cancel_event: Objeto con is_set() para cancelar (opcional)
             
-            # DATOS CON MAPEO ACTUALIZADO
-            for row in rows:
-                formatted_row = []
+        Returns:
+            tuple: (registros exportados, último mp.id, mayor fecha_subida) o None si no hay conexión
+        """
+        connection = db_connection.get_connection()
+        if not connection:
+            return None
+
+        chunk_rows = get_config_int(db_connection.config, 'EXPORT', 'chunk_rows', 10000)
+        temp_path = f"{file_path}.part"
+        written = 0
+        last_id = None
+        last_fecha_subida = None
+
+        connection.rollback()
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+            cursor.execute(f"SELECT COUNT(*) FROM mediciones_planas mp WHERE {where_clause}", params)
+            total = cursor.fetchone()[0]
+        finally:
+            cursor.close()
+
+        if total == 0:
+            connection.rollback()
+            return 0, None, None
+
+        stream = connection.cursor(name=f"eeasa_export_{os.getpid()}")
+        stream.itersize = chunk_rows
+        try:
+            stream.execute(self._build_eeasa_export_query(where_clause), params)
+
+            with open(temp_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
+                writer = csv.writer(csvfile, delimiter=';')
+                self._write_eeasa_header(writer, total)
+
+                while True:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise ExportCancelledError()
+
+                    rows = stream.fetchmany(chunk_rows)
+                    if not rows:
+                        break
+                    writer.writerows(self._format_eeasa_row(row) for row in rows)
+                    written += len(rows)
+
+                    # Ordenado por mp.id: la última fila del bloque tiene el mayor id
+                    last_id = rows[-1][0]
+                    chunk_fecha_subida = max((row[-1] for row in rows if row[-1] is not None), default=None)
+                    if chunk_fecha_subida is not None and (last_fecha_subida is None or chunk_fecha_subida > last_fecha_subida):
+                        last_fecha_subida = chunk_fecha_subida
+
+                    if progress_callback:
+                        progress_callback(written, total)
+
+                self._write_eeasa_footer(writer)
+
+            os.replace(temp_path, file_path)
+            self.logger.info(f"Exportación EEASA por bloques de {chunk_rows}: {written} registros")
+            return written, last_id, last_fecha_subida
+
+        except ExportCancelledError:
+            self.logger.warning(f"⚠️ Exportación cancelada tras {written}/{total} registros")
+            raise
+        finally:
+            try:
+                stream.close()
+            except Exception:
+                pass  # El cursor se descarta igualmente con el rollback
+            connection.rollback()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @staticmethod
+    def _write_eeasa_header(writer, total_rows: int) -> None:
+        """
+        Escribe el encabezado corporativo, los metadatos y los nombres de columna EEASA
+        
+        Args:
+            writer: csv.writer del archivo destino
+            total_rows: Total de registros del reporte
+        """
+        # ENCABEZADO CORPORATIVO EEASA
+        writer.writerow(['EMPRESA ELÉCTRICA AMBATO REGIONAL CENTRO NORTE S.A.'])
+        writer.writerow(['Reporte de Mediciones Eléctricas - Sistema de Monitoreo SONEL'])
+        writer.writerow([])  # Línea en blanco
+        
+        # METADATOS DEL REPORTE
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        writer.writerow([f'Fecha de Generación: {timestamp}'])
+        writer.writerow([f'Total de Registros: {total_rows}'])
+        writer.writerow([f'Sistema: SONEL Extractor v2.0'])
+        writer.writerow([])  # Línea en blanco
+        
+        # ENCABEZADOS ACTUALIZADOS con nueva columna
+        headers = [
+            'ID Registro',
+            'Código Cliente',
+            'Nombre Archivo Origen',
+            'Tipo de Origen',
+            'Fecha',
+            'Hora Local',
+            'Zona UTC',
+            'Voltaje L1 Promedio (V)',
+            'Voltaje L2 Promedio (V)',
+            'Voltaje L3 Promedio (V)',
+            'Voltaje L12 Promedio (V)',
+            'Corriente L1 Promedio (A)',
+            'Corriente L2 Promedio (A)',
+            'Potencia L1 Promedio (W)',
+            'Potencia L2 Promedio (W)',
+            'Potencia L3 Promedio (W)',
+            'Potencia Total Promedio (W)',
+            'Reactiva Q1 L1 Promedio (VAR)',
+            'Reactiva Q1 L2 Promedio (VAR)',
+            'Reactiva Q1 Total Promedio (VAR)',
+            'Potencia Aparente L1 Promedio (VA)',
+            'Potencia Aparente L2 Promedio (VA)',
+            'Potencia Aparente Total Promedio (VA)',
+            'Factor Potencia L1 Promedio',
+            'Factor Potencia L2 Promedio',
+            'Factor Potencia Total Promedio',
+            'Fecha de Carga en Sistema'
+        ]
+        writer.writerow(headers)
+
+    @staticmethod
+    def _write_eeasa_footer(writer) -> None:
+        """Escribe el pie del reporte EEASA"""
+        # PIE DEL REPORTE
+        writer.writerow([])
+        writer.writerow([f'Fin del reporte - EEASA {datetime.now().year}'])
+        writer.writerow(['Generado automáticamente por Sistema SONEL'])
+
+    @staticmethod
+    def _format_eeasa_row(row) -> list:
+        """
+        Da formato EEASA a una fila de la consulta de exportación
+        
+        Args:
+            row: Tupla de la consulta (nombre_archivo_limpio en posición 2)
             
-                for i, value in enumerate(row):
-                    if value is None:
-                        formatted_row.append('')
-                    elif i == 2:  # Columna 'nombre_archivo_limpio'
-                        # Asegurar que el nombre esté limpio (sin extensión)
-                        if value and str(value).lower().endswith('.csv'):
-                            clean_name = str(value)[:-4]  # Remover últimos 4 caracteres (.csv)
-                            formatted_row.append(clean_name)
-                        else:
-                            formatted_row.append(str(value) if value else '')
-                    elif i == 3:  # NUEVA: Columna 'origen'
-                        # Formatear el campo origen de manera legible
-                        if value:
-                            origen_display = str(value).title()  # Capitalizar primera letra
-                            formatted_row.append(origen_display)
-                        else:
-                            formatted_row.append('Cliente')  # Valor por defecto
-                    elif i == 4:  # Columna 'fecha' (antes era 3, ahora es 4)
-                        formatted_row.append(str(value))
-                    elif i == 5:  # Columna 'time' (antes era 4, ahora es 5)
-                        formatted_row.append(str(value))
-                    elif i == 6:  # Columna 'utc_zone' (antes era 5, ahora es 6)
-                        if value:
-                            formatted_row.append(f"{value}")
-                        else:
-                            formatted_row.append('')
-                    elif i in [7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25]:  # Columnas numéricas (indices aumentados en 1 más)
-                        # Formatear números con 3 decimales para mayor precisión
-                        try:
-                            if value is not None and value != '':
-                                formatted_row.append(f"{float(value):.3f}")
-                            else:
-                                formatted_row.append('')
-                        except (ValueError, TypeError):
-                            formatted_row.append(str(value))
+        Returns:
+            list: Valores formateados para el CSV
+        """
+        formatted_row = []
+    
+        for i, value in enumerate(row):
+            if value is None:
+                formatted_row.append('')
+            elif i == 2:  # Columna 'nombre_archivo_limpio'
+                # Asegurar que el nombre esté limpio (sin extensión)
+                if value and str(value).lower().endswith('.csv'):
+                    clean_name = str(value)[:-4]  # Remover últimos 4 caracteres (.csv)
+                    formatted_row.append(clean_name)
+                else:
+                    formatted_row.append(str(value) if value else '')
+            elif i == 3:  # NUEVA: Columna 'origen'
+                # Formatear el campo origen de manera legible
+                if value:
+                    origen_display = str(value).title()  # Capitalizar primera letra
+                    formatted_row.append(origen_display)
+                else:
+                    formatted_row.append('Cliente')  # Valor por defecto
+            elif i == 4:  # Columna 'fecha' (antes era 3, ahora es 4)
+                formatted_row.append(str(value))
+            elif i == 5:  # Columna 'time' (antes era 4, ahora es 5)
+                formatted_row.append(str(value))
+            elif i == 6:  # Columna 'utc_zone' (antes era 5, ahora es 6)
+                if value:
+                    formatted_row.append(f"{value}")
+                else:
+                    formatted_row.append('')
+            elif 7 <= i <= 25:  # Columnas numéricas
+                # Formatear números con 3 decimales para mayor precisión
+                try:
+                    if value is not None and value != '':
+                        formatted_row.append(f"{float(value):.3f}")
                     else:
-                        formatted_row.append(str(value))
-                
-                writer.writerow(formatted_row)
-            
-            # PIE DEL REPORTE
-            writer.writerow([])
-            writer.writerow([f'Fin del reporte - EEASA {datetime.now().year}'])
-            writer.writerow(['Generado automáticamente por Sistema SONEL'])
\ No newline at end of file
+                        formatted_row.append('')
+                except (ValueError, TypeError):
+                    formatted_row.append(str(value))
+            else:
+                formatted_row.append(str(value))
+        
+        return formatted_row
@@ -0,0 +1,13 @@
+#sonel_extractor/database/advisory_locks.py
+
+# Claves de los advisory locks de transacción (pg_advisory_xact_lock) que usa la aplicación.
+# Cada clave tiene un valor propio para que no se confundan entre sí al leer pg_locks.
+
+# Serializa las migraciones de esquema entre procesos (una clave bigint)
+SCHEMA_LOCK_KEY = 724001
+
+# Serializa la creación y conversión de particiones de mediciones_planas (una clave bigint)
+PARTITION_LOCK_KEY = 724002
+
+# Serializa las fusiones sin duplicados de un mismo medidor: (clave, codigo_id) como dos int4
+FLAT_MERGE_LOCK_KEY = 724003
@@ -0,0 +1,580 @@
+#sonel_extractor/database/bulk_loader.py
+import io
+import re
+import csv
+import struct
+import numpy as np
+import pandas as pd
+from config.logger import logger
+from core.database.advisory_locks import FLAT_MERGE_LOCK_KEY
+from core.transformers.columnar_batch import (
+    ColumnarBatch, MEASUREMENT_FIELDS, DATE_FIELDS, PG_EPOCH, format_dates, format_times
+)
+from config.settings import (
+    INSERT_MEDICION_QUERY, INSERT_VOLTAJE_QUERY, INSERT_CORRIENTE_QUERY,
+    INSERT_POTENCIA_QUERY, INSERT_TABLA_UNICA_QUERY
+)
+
+# Campos del DataFrame transformado para mediciones_planas, en el orden de INSERT_TABLA_UNICA_QUERY
+FLAT_SOURCE_FIELDS = ['codigo_id', 'tiempo_utc', 'time', 'utc_zone'] + MEASUREMENT_FIELDS
+
+# Columnas por defecto si no se pueden leer de la consulta configurada
+DEFAULT_FLAT_COLUMNS = ['codigo_id', 'fecha', 'time', 'utc_zone'] + MEASUREMENT_FIELDS
+
+# Tablas normalizadas: consulta INSERT de config.settings y campos en el orden de sus parámetros
+RELATIONAL_TABLES = [
+    (INSERT_MEDICION_QUERY, ['codigo_id', 'tiempo_utc']),
+    (INSERT_VOLTAJE_QUERY, MEASUREMENT_FIELDS[0:4] + ['medicion_id']),
+    (INSERT_CORRIENTE_QUERY, MEASUREMENT_FIELDS[4:6] + ['medicion_id']),
+    (INSERT_POTENCIA_QUERY, MEASUREMENT_FIELDS[6:] + ['medicion_id'])
+]
+
+# Tabla temporal de sesión usada para fusionar sin duplicados (no genera WAL)
+FLAT_STAGING_TABLE = 'mediciones_planas_staging'
+
+# Clave natural de una medición en mediciones_planas (índice idx_mediciones_planas_clave)
+FLAT_NATURAL_KEY = ('codigo_id', 'fecha', 'time')
+
+# Encabezado y cola del formato binario de COPY de PostgreSQL
+PGCOPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('!ii', 0, 0)
+PGCOPY_TRAILER = struct.pack('!h', -1)
+
+# Tipos de PostgreSQL soportados por el codificador binario
+BINARY_TYPE_MAP = {
+    'double precision': 'float8',
+    'real': 'float4',
+    'smallint': 'int2',
+    'integer': 'int4',
+    'bigint': 'int8',
+    'date': 'date',
+    'time without time zone': 'time',
+    'text': 'text',
+    'character varying': 'text',
+    'character': 'text'
+}
+
+NUMERIC_BINARY_DTYPES = {
+    'float8': '>f8',
+    'float4': '>f4',
+    'int2': '>i2',
+    'int4': '>i4',
+    'int8': '>i8'
+}
+
+
+def parse_insert_columns(query):
+    """
+    Obtiene la tabla y la lista de columnas de una consulta INSERT
+
+    Args:
+        query: Consulta INSERT INTO tabla (col1, col2, ...) VALUES ...
+
+    Returns:
+        tuple: (tabla, [columnas]) o (None, []) si no se pudo interpretar
+    """
+    match = re.search(r'(?is)insert\s+into\s+([\w\.]+)\s*\(([^)]*)\)', query or '')
+    if not match:
+        return None, []
+    columns = [col.strip().strip('"') for col in match.group(2).split(',') if col.strip()]
+    return match.group(1), columns
+
+
+class BulkLoader:
+    """Carga masiva de DataFrames en PostgreSQL mediante COPY ... FROM STDIN"""
+
+    # Tipos de columna por base de datos y tabla, consultados una sola vez por proceso
+    _column_types_cache = {}
+
+    def __init__(self, db_connection, copy_format='text', chunk_rows=100000):
+        """
+        Inicializa el cargador masivo
+
+        Args:
+            db_connection: Objeto DatabaseConnection
+            copy_format: Formato de COPY ('text' o 'binary')
+            chunk_rows: Filas codificadas por bloque al construir el flujo de datos
+        """
+        self.db_connection = db_connection
+        self.copy_format = copy_format if copy_format in ('text', 'binary') else 'text'
+        self.chunk_rows = max(int(chunk_rows), 1)
+
+    def copy_flat_measurements(self, data, codigo_id, archivo_fuente_id=None):
+        """
+        Carga el DataFrame transformado en mediciones_planas con un solo COPY
+
+        Args:
+            data: DataFrame con los datos transformados
+            codigo_id: ID del código/cliente
+            archivo_fuente_id: ID del archivo fuente para el linaje (opcional)
+
+        Returns:
+            int: Número de filas copiadas
+        """
+        table, columns, fields, constants = self._flat_layout(codigo_id, archivo_fuente_id)
+        frame = self.prepare_frame(data, fields, constants=constants)
+        frame.columns = columns
+        return self.copy_frame(table, frame)
+
+    @staticmethod
+    def _flat_layout(codigo_id, archivo_fuente_id=None):
+        """
+        Obtiene la tabla plana, sus columnas, los campos de origen y las constantes
+
+        Returns:
+            tuple: (tabla, columnas, campos, constantes)
+        """
+        table, columns = parse_insert_columns(INSERT_TABLA_UNICA_QUERY)
+        if not table or len(columns) != len(FLAT_SOURCE_FIELDS):
+            table, columns = 'mediciones_planas', list(DEFAULT_FLAT_COLUMNS)
+
+        fields = list(FLAT_SOURCE_FIELDS)
+        constants = {'codigo_id': codigo_id}
+        if archivo_fuente_id is not None:
+            fields.append('archivo_fuente_id')
+            columns = columns + ['archivo_fuente_id']
+            constants['archivo_fuente_id'] = archivo_fuente_id
+        return table, columns, fields, constants
+
+    def merge_flat_measurements(self, data, codigo_id, archivo_fuente_id=None):
+        """
+        Copia el DataFrame a una tabla temporal y lo fusiona en mediciones_planas
+        omitiendo las mediciones ya existentes (mismo codigo_id, fecha y time; un time nulo
+        coincide con otro nulo).
+        No hace commit; el llamador controla la transacción.
+
+        Args:
+            data: DataFrame con los datos transformados
+            codigo_id: ID del código/cliente
+            archivo_fuente_id: ID del archivo fuente para el linaje (opcional)
+
+        Returns:
+            tuple: (filas copiadas a staging, filas insertadas en mediciones_planas)
+        """
+        table, columns, fields, constants = self._flat_layout(codigo_id, archivo_fuente_id)
+        missing_key = [col for col in FLAT_NATURAL_KEY if col not in columns]
+        if missing_key:
+            raise ValueError(f"La consulta de {table} no incluye las columnas de la clave natural: {missing_key}")
+        column_list = ', '.join(f'"{col}"' for col in columns)
+        connection = self.db_connection.get_connection()
+        if not connection:
+            raise RuntimeError("No hay conexión a la base de datos para la fusión")
+
+        cursor = connection.cursor()
+        try:
+            # Tabla temporal por sesión: sin WAL y sin colisiones entre procesos concurrentes
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {FLAT_STAGING_TABLE} AS "
+                f"SELECT {column_list} FROM {table} WITH NO DATA"
+            )
+            cursor.execute(f"TRUNCATE {FLAT_STAGING_TABLE}")
+        finally:
+            cursor.close()
+
+        frame = self.prepare_frame(data, fields, constants=constants)
+        frame.columns = columns
+        staged = self.copy_frame(FLAT_STAGING_TABLE, frame)
+
+        select_list = ', '.join(f's."{col}"' for col in columns)
+        key_match = self._natural_key_match('mp', 's')
+        cursor = connection.cursor()
+        try:
+            # El índice de clave natural no es único: las fusiones concurrentes del mismo
+            # medidor se serializan hasta el commit para que el anti-join vea las filas de la otra
+            cursor.execute("SELECT pg_advisory_xact_lock(%s, %s)", (FLAT_MERGE_LOCK_KEY, int(codigo_id)))
+            cursor.execute(
+                f"INSERT INTO {table} ({column_list}) "
+                f"SELECT {select_list} FROM {FLAT_STAGING_TABLE} s "
+                f"WHERE NOT EXISTS (SELECT 1 FROM {table} mp WHERE {key_match})"
+            )
+            inserted = cursor.rowcount
+            cursor.execute(f"TRUNCATE {FLAT_STAGING_TABLE}")
+        finally:
+            cursor.close()
+
+        logger.debug(f"Fusión en {table}: {inserted}/{staged} filas nuevas")
+        return staged, inserted
+
+    @staticmethod
+    def _natural_key_match(target, source):
+        """
+        Condición de igualdad de la clave natural entre dos alias. fecha y time se
+        comparan de forma que NULL iguala a NULL: los archivos sin Time (UTC) cargan
+        time nulo y sus mediciones también deben reconocerse como ya cargadas.
+        """
+        conditions = []
+        for col in FLAT_NATURAL_KEY:
+            equal = f'{target}."{col}" = {source}."{col}"'
+            if col == 'codigo_id':
+                conditions.append(equal)
+            else:
+                conditions.append(f'({equal} OR ({target}."{col}" IS NULL AND {source}."{col}" IS NULL))')
+        return ' AND '.join(conditions)
+
+    def copy_relational_measurements(self, data, codigo_id, archivo_fuente_id=None):
+        """
+        Carga las tablas normalizadas (mediciones y sus tablas hijas) con un número
+        constante de sentencias: reserva un bloque de IDs de mediciones y ejecuta
+        un COPY por tabla. No hace commit; el llamador controla la transacción.
+
+        Args:
+            data: DataFrame con los datos transformados
+            codigo_id: ID del código/cliente
+            archivo_fuente_id: ID del archivo fuente para el linaje (opcional)
+
+        Returns:
+            dict: Filas copiadas por tabla
+        """
+        tables = []
+        for query, fields in RELATIONAL_TABLES:
+            table, columns = parse_insert_columns(query)
+            if not table or len(columns) != len(fields):
+                raise ValueError(f"No se pudieron interpretar las columnas de la consulta: {query}")
+            tables.append((table, columns, fields))
+
+        parent_table = tables[0][0]
+        medicion_ids = self.reserve_ids(parent_table, len(data))
+        constants = {'codigo_id': codigo_id, 'medicion_id': medicion_ids, 'archivo_fuente_id': archivo_fuente_id}
+
+        stats = {}
+        for position, (table, columns, fields) in enumerate(tables):
+            if position == 0:
+                # La tabla padre recibe el ID reservado explícitamente
+                fields = ['medicion_id'] + fields
+                columns = ['id'] + columns
+                if archivo_fuente_id is not None:
+                    fields = fields + ['archivo_fuente_id']
+                    columns = columns + ['archivo_fuente_id']
+            frame = self.prepare_frame(data, fields, constants=constants)
+            frame.columns = columns
+            stats[table] = self.copy_frame(table, frame)
+
+        return stats
+
+    def insert_relational_rows(self, data, codigo_id, archivo_fuente_id=None):
+        """
+        Inserta las tablas normalizadas fila a fila con las consultas de config.settings
+        (relational_mode = rows). Usa la transacción abierta de la conexión y no hace
+        commit, de modo que la fila de mediciones y sus tablas hijas se revierten o
+        reemplazan junto con mediciones_planas.
+
+        Args:
+            data: DataFrame o ColumnarBatch con los datos transformados
+            codigo_id: ID del código/cliente
+            archivo_fuente_id: ID del archivo fuente para el linaje (opcional)
+
+        Returns:
+            int: Filas insertadas en mediciones
+        """
+        if isinstance(data, ColumnarBatch):
+            data = data.to_frame()
+
+        parent_table, _ = parse_insert_columns(RELATIONAL_TABLES[0][0])
+        params = []
+        for _, fields in RELATIONAL_TABLES:
+            frame = self.prepare_frame(data, fields, constants={'codigo_id': codigo_id}).astype(object)
+            params.append(frame.where(frame.notna(), None).to_numpy().tolist())
+
+        connection = self.db_connection.get_connection()
+        if not connection:
+            raise RuntimeError("No hay conexión a la base de datos para insertar las tablas relacionales")
+
+        cursor = connection.cursor()
+        try:
+            for position in range(len(data)):
+                cursor.execute(RELATIONAL_TABLES[0][0], params[0][position])
+                medicion_id = cursor.fetchone()[0]
+                if archivo_fuente_id is not None:
+                    cursor.execute(f"UPDATE {parent_table or 'mediciones'} SET archivo_fuente_id = %s WHERE id = %s",
+                                   (archivo_fuente_id, medicion_id))
+                # La última columna de cada tabla hija es la referencia a mediciones
+                for (query, _), rows in zip(RELATIONAL_TABLES[1:], params[1:]):
+                    cursor.execute(query, rows[position][:-1] + [medicion_id])
+        finally:
+            cursor.close()
+
+        return len(data)
+
+    def reserve_ids(self, table, count):
+        """
+        Reserva un bloque de IDs de la secuencia de la tabla en una sola consulta
+
+        Args:
+            table: Tabla con columna id serial
+            count: Cantidad de IDs a reservar
+
+        Returns:
+            numpy.ndarray: IDs reservados (no necesariamente contiguos)
+        """
+        connection = self.db_connection.get_connection()
+        if not connection:
+            raise RuntimeError("No hay conexión a la base de datos para reservar IDs")
+
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", (table,))
+            row = cursor.fetchone()
+            if not row or not row[0]:
+                raise ValueError(f"La tabla {table} no tiene secuencia asociada a la columna id")
+
+            cursor.execute("SELECT nextval(%s) FROM generate_series(1, %s)", (row[0], int(count)))
+            ids = np.fromiter((r[0] for r in cursor.fetchall()), dtype=np.int64, count=int(count))
+        finally:
+            cursor.close()
+
+        return ids
+
+    def prepare_frame(self, data, fields, constants=None):
+        """
+        Construye un DataFrame con las columnas en el orden indicado y los valores
+        nulos normalizados con máscaras vectorizadas (misma semántica que clean_value)
+
+        Args:
+            data: DataFrame o ColumnarBatch de origen
+            fields: Lista de campos a incluir en orden
+            constants: Diccionario {campo: valor} para columnas constantes
+
+        Returns:
+            DataFrame listo para serializar
+        """
+        constants = constants or {}
+        if isinstance(data, ColumnarBatch):
+            return self._prepare_batch(data, fields, constants)
+
+        prepared = {}
+
+        for field in fields:
+            if field in constants:
+                prepared[field] = pd.Series(constants[field], index=data.index)
+            elif field in data.columns:
+                prepared[field] = self._clean_series(data[field])
+            else:
+                prepared[field] = pd.Series(None, index=data.index, dtype=object)
+
+        return pd.DataFrame(prepared, index=data.index)
+
+    @staticmethod
+    def _prepare_batch(batch, fields, constants):
+        """
+        Construye el DataFrame de COPY desde un ColumnarBatch sin crear objetos por
+        celda: mediciones como flotantes y fechas y horas como enteros con máscara
+        de nulos. Las posiciones de esas columnas quedan en attrs['encoded_columns']
+        para que el formato texto las escriba como fecha y hora.
+
+        Args:
+            batch: ColumnarBatch de origen
+            fields: Lista de campos a incluir en orden
+            constants: Diccionario {campo: valor} para columnas constantes
+
+        Returns:
+            DataFrame listo para serializar
+        """
+        index = pd.RangeIndex(len(batch))
+        prepared = {}
+        encoded = {}
+
+        for position, field in enumerate(fields):
+            if field in constants:
+                prepared[field] = pd.Series(constants[field], index=index)
+            elif field in batch.integers:
+                values = pd.arrays.IntegerArray(batch.values(field), batch.is_null(field))
+                prepared[field] = pd.Series(values, index=index)
+                encoded[position] = 'date' if field in DATE_FIELDS else 'time'
+            elif field in batch.columns:
+                prepared[field] = batch[field]
+            else:
+                prepared[field] = pd.Series(None, index=index, dtype=object)
+
+        frame = pd.DataFrame(prepared, index=index)
+        frame.attrs['encoded_columns'] = encoded
+        return frame
+
+    @staticmethod
+    def _clean_series(series):
+        """
+        Convierte NaN, None, cadenas vacías y 'nan' en nulos sin recorrer celda a celda
+
+        Args:
+            series: Serie de pandas
+
+        Returns:
+            Serie con nulos como NaN/None
+        """
+        if pd.api.types.is_datetime64_any_dtype(series):
+            # Igual que clean_value: los datetime se cargan como fecha
+            return series.dt.strftime('%Y-%m-%d')
+
+        if pd.api.types.is_numeric_dtype(series):
+            return series
+
+        text = series.astype(str)
+        stripped = text.str.strip()
+        null_mask = series.isna() | stripped.eq('') | stripped.str.lower().eq('nan')
+        return text.where(~null_mask)
+
+    def copy_frame(self, table, frame):
+        """
+        Ejecuta COPY table (columnas) FROM STDIN con el DataFrame preparado
+
+        Args:
+            table: Tabla destino
+            frame: DataFrame cuyas columnas coinciden con las de la tabla
+
+        Returns:
+            int: Número de filas copiadas
+        """
+        if frame is None or frame.empty:
+            return 0
+
+        connection = self.db_connection.get_connection()
+        if not connection:
+            raise RuntimeError("No hay conexión a la base de datos para COPY")
+
+        column_list = ', '.join(f'"{col}"' for col in frame.columns)
+        copy_format = self.copy_format
+
+        if copy_format == 'binary':
+            pg_types = self._get_binary_types(connection, table, list(frame.columns))
+            if pg_types is None:
+                logger.warning(f"Tipos de {table} no soportados en COPY binario, usando formato texto")
+                copy_format = 'text'
+
+        if copy_format == 'binary':
+            payload = self._build_binary_payload(frame, pg_types)
+            statement = f"COPY {table} ({column_list}) FROM STDIN WITH (FORMAT binary)"
+        else:
+            payload = self._build_text_payload(frame)
+            statement = f"COPY {table} ({column_list}) FROM STDIN WITH (FORMAT text, NULL '')"
+
+        cursor = connection.cursor()
+        try:
+            cursor.copy_expert(statement, payload)
+            copied = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else len(frame)
+        finally:
+            cursor.close()
+
+        logger.debug(f"COPY {copy_format} en {table}: {copied} filas")
+        return copied
+
+    def _build_text_payload(self, frame):
+        """Serializa el DataFrame en el formato texto de COPY (NULL = cadena vacía)"""
+        encoded = frame.attrs.get('encoded_columns')
+        if encoded:
+            # Fechas y horas de un ColumnarBatch: texto formateado por valores distintos
+            frame = frame.copy(deep=False)
+            for position, kind in encoded.items():
+                series = frame.iloc[:, position]
+                values = series.to_numpy(dtype=np.int64, na_value=0)
+                null_mask = series.isna().to_numpy()
+                frame.isetitem(position, format_dates(values, null_mask) if kind == 'date'
+                               else format_times(values, null_mask))
+
+        buffer = io.StringIO()
+        frame.to_csv(buffer, sep='\t', header=False, index=False, na_rep='',
+                     quoting=csv.QUOTE_NONE, escapechar='\\')
+        buffer.seek(0)
+        return buffer
+
+    def _get_binary_types(self, connection, table, columns):
+        """
+        Obtiene los tipos binarios de las columnas destino
+
+        Returns:
+            list: Tipos por columna o None si alguno no está soportado
+        """
+        cache_key = (self.db_connection.database_key(), table)
+        if cache_key not in self._column_types_cache:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(
+                    "SELECT column_name, data_type FROM information_schema.columns "
+                    "WHERE table_name = %s AND table_schema = ANY(current_schemas(true))",
+                    (table.split('.')[-1],)
+                )
+                BulkLoader._column_types_cache[cache_key] = {name: data_type for name, data_type in cursor.fetchall()}
+            finally:
+                cursor.close()
+
+        column_types = self._column_types_cache[cache_key]
+        pg_types = []
+        for column in columns:
+            pg_type = BINARY_TYPE_MAP.get(column_types.get(column))
+            if pg_type is None:
+                return None
+            pg_types.append(pg_type)
+        return pg_types
+
+    def _build_binary_payload(self, frame, pg_types):
+        """Serializa el DataFrame en el formato binario de COPY, por bloques de filas"""
+        buffer = io.BytesIO()
+        buffer.write(PGCOPY_HEADER)
+        for start in range(0, len(frame), self.chunk_rows):
+            chunk = frame.iloc[start:start + self.chunk_rows]
+            buffer.write(self._encode_binary_rows(chunk, pg_types))
+        buffer.write(PGCOPY_TRAILER)
+        buffer.seek(0)
+        return buffer
+
+    def _encode_binary_rows(self, chunk, pg_types):
+        """
+        Codifica un bloque de filas como matriz de bytes. Cada campo ocupa
+        4 bytes de longitud más su ancho máximo; una máscara descarta los bytes
+        de relleno y los datos de campos nulos antes de aplanar la matriz.
+        """
+        n_rows = len(chunk)
+        field_count = np.full(n_rows, len(pg_types), dtype='>i2').view(np.uint8).reshape(n_rows, 2)
+        blocks = [field_count]
+        keeps = [np.ones((n_rows, 2), dtype=bool)]
+
+        for column, pg_type in zip(chunk.columns, pg_types):
+            payload, lengths, null_mask = self._encode_binary_field(chunk[column], pg_type)
+            header = np.where(null_mask, -1, lengths).astype('>i4').view(np.uint8).reshape(n_rows, 4)
+            width = payload.shape[1]
+            keep_payload = (~null_mask)[:, None] & (np.arange(width)[None, :] < lengths[:, None])
+
+            blocks.extend([header, payload])
+            keeps.extend([np.ones((n_rows, 4), dtype=bool), keep_payload])
+
+        matrix = np.hstack(blocks)
+        keep = np.hstack(keeps)
+        return matrix[keep].tobytes()
+
+    @staticmethod
+    def _encode_binary_field(series, pg_type):
+        """
+        Codifica una columna a bytes en orden de red
+
+        Returns:
+            tuple: (matriz uint8 n x ancho, longitudes por fila, máscara de nulos)
+        """
+        n_rows = len(series)
+
+        if pg_type in NUMERIC_BINARY_DTYPES:
+            numeric = pd.to_numeric(series, errors='coerce')
+            null_mask = numeric.isna().to_numpy()
+            values = numeric.fillna(0).to_numpy().astype(NUMERIC_BINARY_DTYPES[pg_type])
+        elif pg_type in ('date', 'time') and pd.api.types.is_integer_dtype(series.dtype):
+            # Ya codificada por ColumnarBatch (días desde 2000-01-01 o microsegundos)
+            null_mask = series.isna().to_numpy()
+            values = series.to_numpy(dtype=np.int64, na_value=0).astype('>i4' if pg_type == 'date' else '>i8')
+        elif pg_type == 'date':
+            parsed = pd.to_datetime(series, errors='coerce')
+            null_mask = parsed.isna().to_numpy()
+            days = (parsed.dt.normalize() - PG_EPOCH).dt.days
+            values = days.fillna(0).to_numpy().astype('>i4')
+        elif pg_type == 'time':
+            valid = series.notna()
+            deltas = pd.to_timedelta(series.astype(str).where(valid), errors='coerce')
+            null_mask = deltas.isna().to_numpy()
+            microseconds = deltas.dt.total_seconds().fillna(0).mul(1000000).round()
+            values = microseconds.to_numpy().astype('>i8')
+        else:
+            null_mask = series.isna().to_numpy()
+            encoded = series.where(~null_mask, '').astype(str).str.encode('utf-8')
+            lengths = encoded.str.len().fillna(0).to_numpy().astype(np.int64)
+            width = max(int(lengths.max()) if n_rows else 0, 1)
+            payload = encoded.to_numpy().astype(f'S{width}').view(np.uint8).reshape(n_rows, width)
+            return payload, lengths, null_mask
+
+        payload = values.view(np.uint8).reshape(n_rows, -1)
+        lengths = np.full(n_rows, payload.shape[1], dtype=np.int64)
+        return payload, lengths, null_mask
@@ -0,0 +1,85 @@
+#sonel_extractor/database/codigo_cache.py
+import threading
+from collections import OrderedDict
+
+
+class CodigoCache:
+    """
+    Caché LRU en memoria (base de datos, codigo) -> (id, nombre_archivo), compartida
+    por el proceso. La clave incluye la base de datos para que dos conexiones a bases
+    distintas del mismo proceso no compartan IDs.
+    """
+
+    def __init__(self, max_size=2048):
+        """
+        Inicializa la caché
+
+        Args:
+            max_size: Número máximo de códigos almacenados
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, codigo, database=None):
+        """
+        Obtiene la entrada de un código
+
+        Args:
+            codigo: Código del cliente
+            database: Identificador de la base de datos destino
+
+        Returns:
+            tuple: (codigo_id, nombre_archivo) o None si no está en caché
+        """
+        key = (database, codigo)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, codigo, codigo_id, nombre_archivo=None, database=None):
+        """Guarda o actualiza la entrada de un código en la base de datos indicada"""
+        key = (database, codigo)
+        with self._lock:
+            self._entries[key] = (codigo_id, nombre_archivo)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_id(self, codigo_id, database=None):
+        """
+        Elimina las entradas que apuntan a un ID, p. ej. tras revertir una carga que lo
+        usaba: si el código se creó en una transacción revertida o se borró de la base,
+        la siguiente consulta lo vuelve a resolver.
+
+        Args:
+            codigo_id: ID del código
+            database: Identificador de la base de datos destino
+
+        Returns:
+            int: Número de entradas eliminadas
+        """
+        with self._lock:
+            stale = [key for key, (entry_id, _) in self._entries.items()
+                     if key[0] == database and entry_id == codigo_id]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self):
+        """Vacía la caché"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Caché compartida por cargas, exportaciones y GUI del mismo proceso
+codigo_cache = CodigoCache()
@@ -1,7 +1,10 @@
 #sonel_extractor/database/connection.py
 import os
+import time
 import psycopg2
 from config.logger import logger
+from core.database.pool import get_shared_pool, create_raw_connection
+from core.utils.config_options import get_config_bool, get_config_int, get_config_float
 
 class DatabaseConnection:
     """Clase para gestionar la conexión a la base de datos PostgreSQL"""
@@ -15,8 +18,14 @@ class DatabaseConnection:
         """
         self.config = config
         self.connection = None
+        self.pool = None
         self._connection_attempts = 0
         self._max_attempts = 3
+        self._last_used = 0.0
+
+        # Pool compartido: por defecto activo, validación solo tras inactividad
+        self._use_pool = get_config_bool(config, 'DATABASE', 'use_pool', True)
+        self._validate_after = get_config_float(config, 'DATABASE', 'pool_validate_after', 60.0)
         
     def connect(self):
         """
@@ -25,25 +34,28 @@ class DatabaseConnection:
         Returns:
             Connection: Objeto de conexión a la base de datos o None si hay error
         """
+        db_config = {}
         try:
             # MODIFICACIÓN: Manejo más robusto de configuración
             db_config = self._get_database_config()
+
+            # Liberar la conexión anterior si se vuelve a conectar
+            if self.connection is not None:
+                self._release_connection()
             
-            self.connection = psycopg2.connect(
-                host=db_config['host'],
-                port=int(db_config['port']),
-                database=db_config['database'],
-                user=db_config['user'],
-                password=db_config['password'],
-                connect_timeout=15,  # Timeout de 10 segundos
-                application_name="SonelExtractor_Portable"
-            )
+            if self._use_pool:
+                self.pool = get_shared_pool(db_config, **self._get_pool_options())
+                self.connection = self.pool.getconn()
+            else:
+                self.connection = create_raw_connection(db_config)
+                
+                # Verificar que la conexión funcione
+                cursor = self.connection.cursor()
+                cursor.execute("SELECT version()")
+                db_version = cursor.fetchone()
+                cursor.close()
             
-            # Verificar que la conexión funcione
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT version()")
-            db_version = cursor.fetchone()
-            cursor.close()
+            self._last_used = time.monotonic()
             
             logger.info("✅ Conexión exitosa a PostgreSQL")
             
@@ -161,23 +173,58 @@ class DatabaseConnection:
         
         return config
 
+    def database_key(self) -> tuple:
+        """
+        Identifica la base de datos destino para las cachés compartidas por el proceso
+        
+        Returns:
+            tuple: (host, puerto, base de datos)
+        """
+        db_config = self._get_database_config()
+        return (db_config['host'], str(db_config['port']), db_config['database'])
+
+    def _get_pool_options(self) -> dict:
+        """
+        Obtiene los parámetros del pool desde la sección DATABASE
+        
+        Returns:
+            dict: Parámetros para ConnectionPool
+        """
+        return {
+            'min_size': get_config_int(self.config, 'DATABASE', 'pool_min_size', 1),
+            'max_size': get_config_int(self.config, 'DATABASE', 'pool_max_size', 5),
+            'validate_after': self._validate_after,
+            'checkout_timeout': get_config_float(self.config, 'DATABASE', 'pool_checkout_timeout', 30.0),
+            'max_retries': self._max_attempts,
+            'backoff_base': get_config_float(self.config, 'DATABASE', 'pool_backoff_base', 0.5)
+        }
+
     def get_connection(self):
         """
-        Devuelve la conexión existente o crea una nueva si no existe
+        Devuelve la conexión existente o crea una nueva si no existe.
+        Solo se valida con SELECT 1 si la conexión estuvo inactiva más de
+        pool_validate_after segundos.
         
         Returns:
             Connection: Objeto de conexión a la base de datos
         """
         if self.connection:
-            try:
-                # Test rápido de la conexión existente
-                cursor = self.connection.cursor()
-                cursor.execute("SELECT 1")
-                cursor.close()
-                return self.connection
-            except Exception as e:
-                logger.warning(f"⚠️ Conexión existente inválida: {e}")
-                self.connection = None
+            if not self.connection.closed:
+                if time.monotonic() - self._last_used < self._validate_after:
+                    self._last_used = time.monotonic()
+                    return self.connection
+                
+                try:
+                    # Test rápido de la conexión inactiva
+                    cursor = self.connection.cursor()
+                    cursor.execute("SELECT 1")
+                    cursor.close()
+                    self._last_used = time.monotonic()
+                    return self.connection
+                except Exception as e:
+                    logger.warning(f"⚠️ Conexión existente inválida: {e}")
+            
+            self._release_connection(discard=True)
         
         # Si no hay conexión válida, intentar crear una nueva
         if not self.connection and self._connection_attempts < self._max_attempts:
@@ -185,6 +232,23 @@ class DatabaseConnection:
         
         return self.connection
 
+    def _release_connection(self, discard=False):
+        """
+        Devuelve la conexión actual al pool (o la cierra si no se usa pool)
+        
+        Args:
+            discard: Si es True, la conexión no se reutiliza
+        """
+        connection = self.connection
+        self.connection = None
+        if connection is None:
+            return
+        
+        if self.pool is not None:
+            self.pool.putconn(connection, discard=discard)
+        elif not connection.closed:
+            connection.close()
+
     def execute_query(self, query, params=None, commit=False):
         """
         Ejecuta una consulta SQL
@@ -257,13 +321,16 @@ class DatabaseConnection:
             return False
 
     def close(self):
-        """Cierra la conexión a la base de datos"""
+        """Devuelve la conexión al pool compartido o la cierra si no se usa pool"""
         if self.connection:
             try:
-                self.connection.close()
-                self.connection = None
-                logger.info("✅ Conexión a la base de datos cerrada")
+                pooled = self.pool is not None
+                self._release_connection()
+                if pooled:
+                    logger.debug("Conexión devuelta al pool")
+                else:
+                    logger.info("✅ Conexión a la base de datos cerrada")
             except Exception as e:
                 logger.warning(f"⚠️ Error cerrando conexión BD: {e}")
         else:
-            logger.debug("No hay conexión BD que cerrar")
\ No newline at end of file
+            logger.debug("No hay conexión BD que cerrar")
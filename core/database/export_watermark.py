@@ -0,0 +1,89 @@
+#sonel_extractor/database/export_watermark.py
+from config.logger import logger
+
+CREATE_EXPORT_WATERMARK_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS export_watermark (
+        destino VARCHAR(255) PRIMARY KEY,
+        ultimo_id BIGINT NOT NULL DEFAULT 0,
+        ultima_fecha_subida TIMESTAMP,
+        filas INTEGER DEFAULT 0,
+        archivo TEXT,
+        fecha_exportacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+# Espera máxima a que terminen las cargas en curso antes de fijar el horizonte de exportación
+HORIZON_LOCK_TIMEOUT = '30s'
+
+
+class ExportWatermark:
+    """Marca de agua (último mp.id exportado) por destino de exportación"""
+
+    def __init__(self, cursor):
+        """
+        Inicializa el gestor de marcas de agua
+
+        Args:
+            cursor: Cursor de la transacción en curso (no hace commit)
+        """
+        self.cursor = cursor
+
+    def get(self, destino):
+        """
+        Obtiene el último id exportado para un destino
+
+        Args:
+            destino: Identificador del destino de exportación
+
+        Returns:
+            int: Último mp.id exportado (0 si nunca se exportó)
+        """
+        self.cursor.execute("SELECT ultimo_id FROM export_watermark WHERE destino = %s", (destino,))
+        row = self.cursor.fetchone()
+        return row[0] if row else 0
+
+    def visibility_horizon(self):
+        """
+        Mayor mp.id hasta el cual todas las filas ya están confirmadas. Los ids se
+        asignan antes del commit, así que una carga en curso puede confirmar después
+        un id menor que el de filas ya visibles. El bloqueo SHARE espera a que terminen
+        las transacciones que escriben en mediciones_planas; las que empiecen después
+        reciben ids mayores. Debe usarse en una transacción corta: el bloqueo se
+        mantiene hasta su commit o rollback y detiene las cargas nuevas.
+
+        Returns:
+            int: Horizonte de mp.id (0 si la tabla está vacía)
+
+        Raises:
+            psycopg2.errors.LockNotAvailable: si las cargas en curso no terminan en
+                HORIZON_LOCK_TIMEOUT
+        """
+        self.cursor.execute(f"SET LOCAL lock_timeout = '{HORIZON_LOCK_TIMEOUT}'")
+        self.cursor.execute("LOCK TABLE mediciones_planas IN SHARE MODE")
+        self.cursor.execute("SELECT COALESCE(MAX(id), 0) FROM mediciones_planas")
+        return self.cursor.fetchone()[0]
+
+    def update(self, destino, ultimo_id, ultima_fecha_subida=None, filas=0, archivo=None):
+        """
+        Avanza la marca de agua de un destino; nunca retrocede
+
+        Args:
+            destino: Identificador del destino de exportación
+            ultimo_id: Mayor mp.id incluido en el archivo exportado
+            ultima_fecha_subida: Mayor fecha_subida exportada (informativo)
+            filas: Registros del archivo delta
+            archivo: Ruta del archivo delta generado
+        """
+        self.cursor.execute(
+            """
+                INSERT INTO export_watermark (destino, ultimo_id, ultima_fecha_subida, filas, archivo)
+                VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT (destino) DO UPDATE
+                SET ultimo_id = GREATEST(export_watermark.ultimo_id, EXCLUDED.ultimo_id),
+                    ultima_fecha_subida = COALESCE(EXCLUDED.ultima_fecha_subida, export_watermark.ultima_fecha_subida),
+                    filas = EXCLUDED.filas, archivo = EXCLUDED.archivo,
+                    fecha_exportacion = CURRENT_TIMESTAMP
+            """,
+            (destino, int(ultimo_id), ultima_fecha_subida, int(filas), archivo)
+        )
+        logger.info(f"Marca de agua de exportación '{destino}' en mp.id {ultimo_id}")
@@ -0,0 +1,99 @@
+#sonel_extractor/database/lineage.py
+import os
+from config.logger import logger
+from core.database.bulk_loader import RELATIONAL_TABLES, parse_insert_columns
+
+CREATE_ARCHIVO_FUENTE_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS archivo_fuente (
+        id SERIAL PRIMARY KEY,
+        ruta TEXT NOT NULL UNIQUE,
+        nombre_archivo VARCHAR(255),
+        hash VARCHAR(64),
+        codigo_id INTEGER,
+        filas INTEGER DEFAULT 0,
+        fecha_carga TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+# Columnas de linaje en las tablas de mediciones e índices para el borrado por archivo
+LINEAGE_MIGRATION_QUERIES = [
+    CREATE_ARCHIVO_FUENTE_TABLE_QUERY,
+    "ALTER TABLE mediciones_planas ADD COLUMN IF NOT EXISTS archivo_fuente_id INTEGER;",
+    "ALTER TABLE mediciones ADD COLUMN IF NOT EXISTS archivo_fuente_id INTEGER;",
+    "CREATE INDEX IF NOT EXISTS idx_mediciones_planas_archivo_fuente ON mediciones_planas (archivo_fuente_id);",
+    "CREATE INDEX IF NOT EXISTS idx_mediciones_archivo_fuente ON mediciones (archivo_fuente_id);"
+]
+
+
+class SourceFileLineage:
+    """Registro de archivos fuente y reemplazo idempotente de sus filas cargadas"""
+
+    def __init__(self, cursor):
+        """
+        Inicializa el gestor de linaje
+
+        Args:
+            cursor: Cursor dentro de la transacción de carga (no hace commit)
+        """
+        self.cursor = cursor
+
+    def register(self, file_path, file_hash, codigo_id):
+        """
+        Registra (o actualiza) el archivo fuente y bloquea su fila hasta el commit
+
+        Args:
+            file_path: Ruta del archivo cargado
+            file_hash: Hash del contenido del archivo
+            codigo_id: ID del código/cliente
+
+        Returns:
+            int: ID del archivo fuente
+        """
+        self.cursor.execute(
+            """
+                INSERT INTO archivo_fuente (ruta, nombre_archivo, hash, codigo_id)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (ruta) DO UPDATE
+                SET nombre_archivo = EXCLUDED.nombre_archivo, hash = EXCLUDED.hash,
+                    codigo_id = EXCLUDED.codigo_id, fecha_carga = CURRENT_TIMESTAMP
+                RETURNING id
+            """,
+            (os.path.abspath(file_path), os.path.basename(file_path), file_hash, codigo_id)
+        )
+        return self.cursor.fetchone()[0]
+
+    def delete_rows(self, archivo_fuente_id):
+        """
+        Elimina las filas cargadas previamente desde el archivo fuente
+
+        Args:
+            archivo_fuente_id: ID del archivo fuente
+
+        Returns:
+            int: Filas eliminadas de mediciones_planas
+        """
+        parent_table, _ = parse_insert_columns(RELATIONAL_TABLES[0][0])
+        parent_table = parent_table or 'mediciones'
+
+        # Tablas hijas primero: su última columna es la referencia a mediciones
+        for query, _ in RELATIONAL_TABLES[1:]:
+            table, columns = parse_insert_columns(query)
+            if not table or not columns:
+                continue
+            self.cursor.execute(
+                f'DELETE FROM {table} WHERE "{columns[-1]}" IN '
+                f'(SELECT id FROM {parent_table} WHERE archivo_fuente_id = %s)',
+                (archivo_fuente_id,)
+            )
+
+        self.cursor.execute(f"DELETE FROM {parent_table} WHERE archivo_fuente_id = %s", (archivo_fuente_id,))
+        self.cursor.execute("DELETE FROM mediciones_planas WHERE archivo_fuente_id = %s", (archivo_fuente_id,))
+        deleted = self.cursor.rowcount
+
+        if deleted:
+            logger.info(f"Reemplazo de archivo fuente {archivo_fuente_id}: {deleted} filas anteriores eliminadas")
+        return deleted
+
+    def set_row_count(self, archivo_fuente_id, rows):
+        """Guarda el número de filas cargadas desde el archivo fuente"""
+        self.cursor.execute("UPDATE archivo_fuente SET filas = %s WHERE id = %s", (int(rows), archivo_fuente_id))
@@ -3,8 +3,16 @@
 import re
 import os
 import pandas as pd
+from psycopg2.extras import execute_values
 from config.logger import logger
-from core.utils.validators import extract_client_code
+from core.database.schema import ensure_schema
+from core.database.bulk_loader import BulkLoader
+from core.transformers.columnar_batch import ColumnarBatch
+from core.database.lineage import SourceFileLineage
+from core.database.partitioning import PartitionManager
+from core.database.codigo_cache import codigo_cache
+from core.utils.validators import extract_client_code, compute_file_hash
+from core.utils.config_options import get_config_option, get_config_int, get_config_bool
 from config.settings import (
     CREATE_CODIGO_TABLE_QUERY, CREATE_MEDICIONES_TABLE_QUERY, 
     CREATE_VOLTAJE_MEDICIONES_TABLE_QUERY, CREATE_CORRIENTE_MEDICIONES_TABLE_QUERY, 
@@ -13,6 +21,9 @@ from config.settings import (
     CREATE_TABLA_UNICA_QUERY, INSERT_TABLA_UNICA_QUERY
 )
 
+# Formato válido de código de cliente (2 a 10 dígitos)
+CODIGO_PATTERN = re.compile(r'^\d{2,10}$')
+
 class DataHandler:
     """Clase para manejar operaciones de base de datos para la estructura relacional"""
     
@@ -24,11 +35,32 @@ class DataHandler:
             db_connection: Objeto de conexión a la base de datos
         """
         self.db_connection = db_connection
-        self.ensure_tables_exist()
+        self.last_load_stats = {}
+
+        # Modo de carga: 'copy' (COPY masivo para mediciones_planas) o 'rows' (INSERT fila a fila)
+        config = getattr(db_connection, 'config', None)
+        self.load_mode = get_config_option(config, 'DATABASE', 'load_mode', 'copy').lower()
+        self.copy_format = get_config_option(config, 'DATABASE', 'copy_format', 'text').lower()
+        self.copy_chunk_rows = get_config_int(config, 'DATABASE', 'copy_chunk_rows', 100000)
+        # Carga de tablas relacionales en modo copy: 'batch' (conjunto) o 'rows' (fila a fila)
+        self.relational_mode = get_config_option(config, 'DATABASE', 'relational_mode', 'batch').lower()
+        # Recarga idempotente: reemplazar las filas previas del mismo archivo fuente
+        self.replace_on_reload = get_config_bool(config, 'DATABASE', 'replace_on_reload', True)
+        # Fusión vía tabla temporal omitiendo mediciones ya cargadas por otros archivos
+        self.dedup_on_load = get_config_bool(config, 'DATABASE', 'dedup_on_load', False)
+        # Particiones mensuales de mediciones_planas creadas bajo demanda antes de cada carga
+        self.partition_by_month = get_config_bool(config, 'DATABASE', 'partition_by_month', False)
+        self._flat_partitioned = None
+        # Base de datos destino: clave de la caché de códigos compartida por el proceso
+        self.database_key = self.db_connection.database_key()
+
+        # El esquema se verifica una vez por proceso; las migraciones solo si cambia la versión
+        ensure_schema(self.db_connection)
 
     def ensure_tables_exist(self):
         """
-        Asegura que todas las tablas necesarias existan en la base de datos
+        Asegura que todas las tablas necesarias existan en la base de datos.
+        Ejecuta el DDL completo en cada llamada; el flujo normal usa ensure_schema.
         
         Returns:
             bool: True si todas las tablas existen o fueron creadas correctamente
@@ -112,18 +144,27 @@ class DataHandler:
         else:
             # Con la nueva implementación, el código puede tener entre 2 y 10 dígitos
             # Verificamos que sea numérico y tenga la longitud correcta
-            if not re.match(r'^\d{2,10}$', codigo):
+            if not CODIGO_PATTERN.match(codigo):
                 logger.warning(f"El código '{codigo}' no tiene el formato esperado de 2-10 dígitos.")
                 
                 if should_extract and file_path:
                     codigo = extract_client_code(file_path)
                     
-                    if not codigo or not re.match(r'^\d{2,10}$', codigo):
+                    if not codigo or not CODIGO_PATTERN.match(codigo):
                         logger.error(f"No se pudo obtener un código válido de 2-10 dígitos después de reintento.")
                         return None
                 else:
                     return None
 
+        # Consultar la caché LRU antes de ir a la base de datos
+        cached = codigo_cache.get(codigo, self.database_key)
+        if cached:
+            codigo_id, cached_nombre = cached
+            if nombre_archivo and should_extract and nombre_archivo != cached_nombre:
+                self._update_nombre_archivo(codigo_id, nombre_archivo, origen)
+                codigo_cache.put(codigo, codigo_id, nombre_archivo, self.database_key)
+            return codigo_id
+
         # Primero verificar si ya existe
         cursor = self.db_connection.execute_query(
             GET_CODIGO_ID_QUERY,
@@ -142,6 +183,7 @@ class DataHandler:
                 if nombre_archivo and should_extract:
                     self._update_nombre_archivo(codigo_id, nombre_archivo, origen)  # MODIFICADA
                 
+                codigo_cache.put(codigo, codigo_id, nombre_archivo if should_extract else None, self.database_key)
                 return codigo_id
 
         # Si no existe, intentar insertarlo con origen
@@ -157,11 +199,94 @@ class DataHandler:
             if row:
                 codigo_id = row[0]
                 logger.info(f"Nuevo código creado con ID: {codigo_id}, archivo: {nombre_archivo} y origen: {origen}")
+                codigo_cache.put(codigo, codigo_id, nombre_archivo, self.database_key)
                 return codigo_id
 
         logger.error(f"No se pudo obtener o crear el código: {codigo}")
         return None
     
+    def resolve_codigo_ids(self, file_paths):
+        """
+        Resuelve por adelantado los códigos de cliente de un lote de archivos:
+        una consulta con ANY para los existentes, una actualización de nombre/origen
+        y un único INSERT ... ON CONFLICT ... RETURNING para los faltantes.
+        Los resultados quedan en la caché LRU para las cargas posteriores.
+
+        Args:
+            file_paths: Lista de rutas de archivos
+
+        Returns:
+            dict: {codigo: codigo_id} de los códigos resueltos
+        """
+        # El último archivo de cada código define su nombre y origen (igual que la carga secuencial)
+        pending = {}
+        for file_path in file_paths:
+            codigo = extract_client_code(file_path)
+            if not codigo or not CODIGO_PATTERN.match(codigo):
+                continue
+            nombre_archivo = os.path.basename(file_path)
+            pending[codigo] = (nombre_archivo, self.determine_origen(nombre_archivo))
+
+        if not pending:
+            return {}
+
+        connection = self.db_connection.get_connection()
+        if not connection:
+            logger.error("No hay conexión a la base de datos para resolver códigos")
+            return {}
+
+        resolved = {}
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT codigo, id FROM codigo WHERE codigo = ANY(%s)", (list(pending.keys()),))
+            existing = dict(cursor.fetchall())
+
+            if existing:
+                execute_values(
+                    cursor,
+                    """
+                        UPDATE codigo AS c
+                        SET nombre_archivo = v.nombre_archivo, origen = v.origen, fecha_subida = CURRENT_TIMESTAMP
+                        FROM (VALUES %s) AS v(id, nombre_archivo, origen)
+                        WHERE c.id = v.id
+                    """,
+                    [(codigo_id, *pending[codigo]) for codigo, codigo_id in existing.items()],
+                    page_size=len(existing)
+                )
+                resolved.update(existing)
+
+            missing = [(codigo, *pending[codigo]) for codigo in pending if codigo not in existing]
+            if missing:
+                # ON CONFLICT evita la carrera cuando otro proceso crea el mismo código
+                created = execute_values(
+                    cursor,
+                    """
+                        INSERT INTO codigo (codigo, nombre_archivo, origen) VALUES %s
+                        ON CONFLICT (codigo) DO UPDATE
+                        SET nombre_archivo = EXCLUDED.nombre_archivo, origen = EXCLUDED.origen,
+                            fecha_subida = CURRENT_TIMESTAMP
+                        RETURNING codigo, id
+                    """,
+                    missing,
+                    page_size=len(missing),
+                    fetch=True
+                )
+                resolved.update(dict(created))
+
+            connection.commit()
+        except Exception as e:
+            connection.rollback()
+            logger.warning(f"No se pudieron resolver los códigos en lote, se resolverán por archivo: {e}")
+            return {}
+        finally:
+            cursor.close()
+
+        for codigo, codigo_id in resolved.items():
+            codigo_cache.put(codigo, codigo_id, pending[codigo][0], self.database_key)
+
+        logger.info(f"Códigos de cliente resueltos en lote: {len(resolved)} ({len(resolved) - len(existing)} nuevos)")
+        return resolved
+
     def _update_nombre_archivo(self, codigo_id, nombre_archivo, origen):
         """
         Actualiza el nombre de archivo para un código existente
@@ -210,15 +335,16 @@ class DataHandler:
             return False
             
         # Utilizar la función para insertar datos con el código ya obtenido
-        return self.insert_data_direct(data, codigo_id)
+        return self.insert_data_direct(data, codigo_id, file_path=file_path)
     
-    def insert_data_direct(self, data, codigo_id):
+    def insert_data_direct(self, data, codigo_id, file_path=None):
         """
         Inserta datos utilizando un ID de código ya obtenido
         
         Args:
             data: DataFrame con los datos transformados
             codigo_id: ID del código/cliente ya obtenido
+            file_path: Archivo fuente; en modo copy sus filas previas se reemplazan (opcional)
             
         Returns:
             bool: True si la inserción fue exitosa
@@ -226,7 +352,178 @@ class DataHandler:
         if data is None or data.empty:
             logger.error("No hay datos para cargar en la base de datos")
             return False
-                  
+
+        self.last_load_stats = {}
+
+        if self.load_mode == 'copy':
+            return self._insert_data_bulk(data, codigo_id, file_path)
+
+        return self._insert_data_rows(data, codigo_id, include_flat=True)
+
+    @property
+    def supports_streaming(self):
+        """Indica si la configuración permite cargar un archivo por bloques en una sola transacción"""
+        return self.load_mode == 'copy' and self.relational_mode == 'batch'
+
+    def insert_data_stream(self, chunks, codigo, file_path, should_extract=True):
+        """
+        Carga un archivo bloque a bloque con COPY dentro de una única transacción,
+        de modo que la memoria depende del tamaño del bloque y no del archivo.
+        Requiere load_mode = copy y relational_mode = batch.
+        
+        Args:
+            chunks: Iterable de DataFrames transformados
+            codigo: Código del cliente
+            file_path: Ruta del archivo fuente
+            should_extract: Indica si se debe intentar extraer el código del archivo
+            
+        Returns:
+            bool: True si la carga fue exitosa
+        """
+        self.last_load_stats = {}
+        if not self.supports_streaming:
+            logger.error("La carga por bloques requiere load_mode = copy y relational_mode = batch")
+            return False
+
+        codigo_id = self.get_or_create_codigo_id(codigo, file_path, should_extract)
+        if codigo_id is None:
+            logger.error("No se pudo obtener un ID válido para el código. Datos no insertados.")
+            return False
+
+        return self._insert_frames_bulk(chunks, codigo_id, file_path)
+
+    def _insert_data_bulk(self, data, codigo_id, file_path=None):
+        """
+        Carga el archivo completo con COPY: las tablas relacionales (con IDs reservados
+        en bloque o fila a fila según relational_mode) y mediciones_planas, todo en una
+        sola transacción. Si se indica el archivo fuente, las filas cargadas antes desde
+        ese archivo se eliminan en la misma transacción, de modo que recargar un archivo
+        no duplica datos.
+
+        Args:
+            data: DataFrame con los datos transformados
+            codigo_id: ID del código/cliente ya obtenido
+            file_path: Ruta del archivo fuente (opcional)
+
+        Returns:
+            bool: True si la inserción fue exitosa
+        """
+        return self._insert_frames_bulk([data], codigo_id, file_path)
+
+    def _insert_frames_bulk(self, frames, codigo_id, file_path=None):
+        """
+        Carga uno o varios DataFrames con COPY en una sola transacción: linaje del
+        archivo fuente, particiones, tablas relacionales y mediciones_planas. Si algún
+        bloque falla, se revierte el archivo completo.
+
+        Args:
+            frames: Iterable de DataFrames transformados
+            codigo_id: ID del código/cliente ya obtenido
+            file_path: Ruta del archivo fuente (opcional)
+
+        Returns:
+            bool: True si se cargó al menos una fila
+        """
+        connection = self.db_connection.get_connection()
+        if not connection:
+            logger.error("No hay conexión a la base de datos para la carga masiva")
+            return False
+
+        loader = BulkLoader(self.db_connection, self.copy_format, self.copy_chunk_rows)
+        cursor = connection.cursor()
+        try:
+            archivo_fuente_id = None
+            lineage = SourceFileLineage(cursor)
+            if file_path and self.replace_on_reload:
+                archivo_fuente_id = lineage.register(file_path, compute_file_hash(file_path), codigo_id)
+                replaced = lineage.delete_rows(archivo_fuente_id)
+                if replaced:
+                    self.last_load_stats['replaced_rows'] = replaced
+
+            staged_rows = flat_rows = total_rows = chunk_count = 0
+            created_partitions = []
+            for data in frames:
+                if data is None or data.empty:
+                    continue
+                chunk_count += 1
+                total_rows += len(data)
+                created_partitions += self._ensure_partitions(cursor, data)
+
+                if self.relational_mode == 'batch':
+                    for table, rows in loader.copy_relational_measurements(data, codigo_id, archivo_fuente_id).items():
+                        self.last_load_stats[table] = self.last_load_stats.get(table, 0) + rows
+                else:
+                    rows = loader.insert_relational_rows(data, codigo_id, archivo_fuente_id)
+                    self.last_load_stats['mediciones'] = self.last_load_stats.get('mediciones', 0) + rows
+                if self.dedup_on_load:
+                    staged, inserted = loader.merge_flat_measurements(data, codigo_id, archivo_fuente_id)
+                    self.last_load_stats['overlap_rows'] = self.last_load_stats.get('overlap_rows', 0) + staged - inserted
+                else:
+                    staged = inserted = loader.copy_flat_measurements(data, codigo_id, archivo_fuente_id)
+                staged_rows += staged
+                flat_rows += inserted
+
+            if archivo_fuente_id is not None:
+                lineage.set_row_count(archivo_fuente_id, flat_rows)
+                self.last_load_stats['archivo_fuente_id'] = archivo_fuente_id
+            connection.commit()
+            PartitionManager(self.db_connection).mark_known(created_partitions)
+        except Exception as e:
+            logger.error(f"Error en carga masiva (COPY): {e}")
+            connection.rollback()
+            codigo_cache.invalidate_id(codigo_id, self.database_key)
+            self.last_load_stats = {}
+            return False
+        finally:
+            cursor.close()
+
+        self.last_load_stats['mediciones_planas'] = flat_rows
+        if chunk_count > 1:
+            self.last_load_stats['chunks'] = chunk_count
+        logger.info(f"COPY {loader.copy_format}: {flat_rows}/{total_rows} filas cargadas | Tablas: {self.last_load_stats}")
+        # Un archivo totalmente solapado con cargas previas también es una carga válida
+        return staged_rows > 0
+
+    def _ensure_partitions(self, cursor, data):
+        """
+        Crea las particiones mensuales que necesita el DataFrame si mediciones_planas
+        está particionada y partition_by_month está activo. No hace commit.
+
+        Args:
+            cursor: Cursor dentro de la transacción de carga
+            data: DataFrame con los datos transformados
+
+        Returns:
+            list: Particiones creadas, a registrar con mark_known tras el commit
+        """
+        if not self.partition_by_month:
+            return []
+
+        manager = PartitionManager(self.db_connection)
+        if self._flat_partitioned is None:
+            self._flat_partitioned = manager.is_partitioned(cursor)
+            if not self._flat_partitioned:
+                logger.warning("⚠️ partition_by_month activo pero mediciones_planas no está particionada "
+                               "(ejecutar: python -m core.database.partitioning convert)")
+        if self._flat_partitioned:
+            return manager.ensure_for_frame(cursor, data)
+        return []
+
+    def _insert_data_rows(self, data, codigo_id, include_flat=True):
+        """
+        Inserta los datos fila a fila en las tablas relacionales y, opcionalmente, en mediciones_planas
+
+        Args:
+            data: DataFrame o ColumnarBatch con los datos transformados
+            codigo_id: ID del código/cliente ya obtenido
+            include_flat: Si es True, también inserta cada fila en mediciones_planas
+
+        Returns:
+            bool: True si se insertó al menos una fila
+        """
+        if isinstance(data, ColumnarBatch):
+            data = data.to_frame()
+
         # Contador de filas procesadas exitosamente
         successful_rows = 0
 
@@ -247,6 +544,20 @@ class DataHandler:
                 # Si ya es un objeto date, devolverlo tal como está
                 return value
             return value
+
+        if include_flat and self.partition_by_month:
+            connection = self.db_connection.get_connection()
+            if connection:
+                cursor = connection.cursor()
+                try:
+                    created_partitions = self._ensure_partitions(cursor, data)
+                    connection.commit()
+                    PartitionManager(self.db_connection).mark_known(created_partitions)
+                except Exception as e:
+                    connection.rollback()
+                    logger.warning(f"⚠️ No se pudieron crear las particiones mensuales: {e}")
+                finally:
+                    cursor.close()
         
         # Procesar cada fila e insertarla en las tablas correspondientes
         for index, row in data.iterrows():
@@ -333,42 +644,43 @@ class DataHandler:
                 potencia_cursor.close()
 
                 # 5. Insertar en tabla única (mediciones_planas) con campos modificados
-                cursor = self.db_connection.execute_query(
-                    INSERT_TABLA_UNICA_QUERY,
-                    params=(
-                        codigo_id,
-                        clean_value(row.get('tiempo_utc')),
-                        clean_value(row.get('time')),
-                        clean_value(row.get('utc_zone')),
-                        clean_value(row.get('u_l1_avg')),
-                        clean_value(row.get('u_l2_avg')),
-                        clean_value(row.get('u_l3_avg')),
-                        clean_value(row.get('u_l12_avg')),
-                        clean_value(row.get('i_l1_avg')),
-                        clean_value(row.get('i_l2_avg')),
-                        clean_value(row.get('p_l1_avg')),
-                        clean_value(row.get('p_l2_avg')),
-                        clean_value(row.get('p_l3_avg')),
-                        clean_value(row.get('p_e_avg')),
-                        clean_value(row.get('q1_l1_avg')),
-                        clean_value(row.get('q1_l2_avg')),
-                        clean_value(row.get('q1_e_avg')),
-                        clean_value(row.get('sn_l1_avg')),
-                        clean_value(row.get('sn_l2_avg')),
-                        clean_value(row.get('sn_e_avg')),
-                        clean_value(row.get('s_l1_avg')),
-                        clean_value(row.get('s_l2_avg')),
-                        clean_value(row.get('s_e_avg'))
-                    ),
-                    commit=True
-                )
+                if include_flat:
+                    cursor = self.db_connection.execute_query(
+                        INSERT_TABLA_UNICA_QUERY,
+                        params=(
+                            codigo_id,
+                            clean_value(row.get('tiempo_utc')),
+                            clean_value(row.get('time')),
+                            clean_value(row.get('utc_zone')),
+                            clean_value(row.get('u_l1_avg')),
+                            clean_value(row.get('u_l2_avg')),
+                            clean_value(row.get('u_l3_avg')),
+                            clean_value(row.get('u_l12_avg')),
+                            clean_value(row.get('i_l1_avg')),
+                            clean_value(row.get('i_l2_avg')),
+                            clean_value(row.get('p_l1_avg')),
+                            clean_value(row.get('p_l2_avg')),
+                            clean_value(row.get('p_l3_avg')),
+                            clean_value(row.get('p_e_avg')),
+                            clean_value(row.get('q1_l1_avg')),
+                            clean_value(row.get('q1_l2_avg')),
+                            clean_value(row.get('q1_e_avg')),
+                            clean_value(row.get('sn_l1_avg')),
+                            clean_value(row.get('sn_l2_avg')),
+                            clean_value(row.get('sn_e_avg')),
+                            clean_value(row.get('s_l1_avg')),
+                            clean_value(row.get('s_l2_avg')),
+                            clean_value(row.get('s_e_avg'))
+                        ),
+                        commit=True
+                    )
 
-                if not cursor:
-                    logger.error(f"Fallo al insertar fila {index} en tabla única")
-                    self.db_connection.connection.rollback()
-                    continue
+                    if not cursor:
+                        logger.error(f"Fallo al insertar fila {index} en tabla única")
+                        self.db_connection.connection.rollback()
+                        continue
                 
-                cursor.close()
+                    cursor.close()
 
                 # Hacer commit de toda la transacción para esta fila
                 self.db_connection.connection.commit()
@@ -378,6 +690,14 @@ class DataHandler:
                 logger.error(f"Error al procesar la fila {index}: {e}")
                 self.db_connection.connection.rollback()
         
+        if successful_rows == 0 and len(data):
+            # Ninguna fila confirmada: el ID del código se vuelve a consultar en la próxima carga
+            codigo_cache.invalidate_id(codigo_id, self.database_key)
+
+        self.last_load_stats['mediciones'] = successful_rows
+        if include_flat:
+            self.last_load_stats['mediciones_planas'] = successful_rows
+
         logger.info(f"Datos cargados exitosamente en la BD: {successful_rows}/{len(data)} filas")
         return successful_rows > 0
     
@@ -0,0 +1,373 @@
+#sonel_extractor/database/partitioning.py
+import os
+import re
+import argparse
+import threading
+from datetime import date
+import pandas as pd
+from config.logger import logger
+from core.database.advisory_locks import PARTITION_LOCK_KEY
+from core.database.schema import NATURAL_KEY_INDEX_QUERY
+
+FLAT_TABLE = 'mediciones_planas'
+DEFAULT_PARTITION = f'{FLAT_TABLE}_default'
+
+# Particiones mensuales: mediciones_planas_pAAAAMM
+PARTITION_NAME_PATTERN = re.compile(rf'^{FLAT_TABLE}_p(\d{{4}})(\d{{2}})$')
+
+
+def month_start(value):
+    """Primer día del mes de una fecha"""
+    return date(value.year, value.month, 1)
+
+
+def next_month(value):
+    """Primer día del mes siguiente"""
+    return date(value.year + 1, 1, 1) if value.month == 12 else date(value.year, value.month + 1, 1)
+
+
+def partition_name(month):
+    """Nombre de la partición mensual que contiene la fecha indicada"""
+    return f'{FLAT_TABLE}_p{month.year:04d}{month.month:02d}'
+
+
+class PartitionManager:
+    """Particionado mensual por rango de fecha de mediciones_planas"""
+
+    # Particiones conocidas en este proceso, por base de datos
+    _known = {}
+    _lock = threading.Lock()
+
+    def __init__(self, db_connection):
+        """
+        Inicializa el gestor de particiones
+
+        Args:
+            db_connection: Objeto DatabaseConnection
+        """
+        self.db_connection = db_connection
+
+    @staticmethod
+    def is_partitioned(cursor):
+        """
+        Indica si mediciones_planas es una tabla particionada
+
+        Returns:
+            bool: True si está particionada
+        """
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))",
+            (FLAT_TABLE,)
+        )
+        return bool(cursor.fetchone()[0])
+
+    @staticmethod
+    def list_partitions(cursor):
+        """
+        Lista las particiones mensuales adjuntas a mediciones_planas
+
+        Returns:
+            list: Tuplas (nombre, primer día del mes) ordenadas por fecha
+        """
+        cursor.execute(
+            """
+                SELECT c.relname FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = to_regclass(%s)
+            """,
+            (FLAT_TABLE,)
+        )
+        partitions = []
+        for (name,) in cursor.fetchall():
+            match = PARTITION_NAME_PATTERN.match(name)
+            if match:
+                partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+        return sorted(partitions, key=lambda item: item[1])
+
+    def ensure_for_frame(self, cursor, data, date_column='tiempo_utc'):
+        """
+        Crea las particiones mensuales que cubren las fechas del DataFrame.
+        No hace commit; el llamador controla la transacción y, tras confirmarla,
+        registra las particiones creadas con mark_known.
+
+        Args:
+            cursor: Cursor dentro de la transacción de carga
+            data: DataFrame con los datos transformados
+            date_column: Columna con la fecha de la medición
+
+        Returns:
+            list: Particiones creadas
+        """
+        if data is None or date_column not in data.columns:
+            return []
+        dates = pd.to_datetime(data[date_column], errors='coerce').dropna()
+        if dates.empty:
+            return []
+        return self.ensure_partitions(cursor, dates.min().date(), dates.max().date())
+
+    def ensure_partitions(self, cursor, start, end):
+        """
+        Crea bajo demanda las particiones mensuales entre dos fechas (inclusive).
+        No hace commit; el llamador controla la transacción. Solo las particiones ya
+        confirmadas quedan en la caché del proceso: las creadas aquí se registran con
+        mark_known después del commit, para que un rollback no las deje como existentes.
+
+        Args:
+            cursor: Cursor dentro de la transacción de carga
+            start: Fecha inicial
+            end: Fecha final
+
+        Returns:
+            list: Particiones creadas
+        """
+        months = []
+        month = month_start(start)
+        while month <= end:
+            months.append(month)
+            month = next_month(month)
+
+        cache_key = self.db_connection.database_key()
+        with PartitionManager._lock:
+            known = PartitionManager._known.setdefault(cache_key, set())
+            missing = [m for m in months if partition_name(m) not in known]
+        if not missing:
+            return []
+
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", (PARTITION_LOCK_KEY,))
+        existing = {name for name, _ in self.list_partitions(cursor)}
+
+        created = []
+        for month in missing:
+            name = partition_name(month)
+            if name not in existing:
+                self._create_partition(cursor, name, month, next_month(month))
+                created.append(name)
+
+        with PartitionManager._lock:
+            known.update(existing)
+
+        if created:
+            logger.info(f"📅 Particiones creadas: {', '.join(created)}")
+        return created
+
+    def mark_known(self, names):
+        """
+        Registra en la caché del proceso particiones cuya creación ya se confirmó
+
+        Args:
+            names: Nombres devueltos por ensure_partitions o ensure_for_frame
+        """
+        if not names:
+            return
+        with PartitionManager._lock:
+            PartitionManager._known.setdefault(self.db_connection.database_key(), set()).update(names)
+
+    @staticmethod
+    def _create_partition(cursor, name, lower, upper):
+        """
+        Crea y adjunta una partición mensual. Las filas de ese rango que hubieran
+        caído en la partición por defecto se mueven antes de adjuntarla.
+        """
+        cursor.execute(f"CREATE TABLE {name} (LIKE {FLAT_TABLE} INCLUDING DEFAULTS)")
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (DEFAULT_PARTITION,))
+        if cursor.fetchone()[0]:
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE fecha >= %s AND fecha < %s RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved",
+                (lower, upper)
+            )
+        cursor.execute(
+            f"ALTER TABLE {FLAT_TABLE} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)",
+            (lower, upper)
+        )
+
+    def convert_table(self):
+        """
+        Convierte mediciones_planas en una tabla particionada por mes de fecha.
+        Reescribe toda la tabla en una sola transacción; es una operación de
+        mantenimiento que debe ejecutarse sin cargas en curso.
+
+        Returns:
+            bool: True si la tabla quedó particionada
+        """
+        connection = self.db_connection.get_connection()
+        if not connection:
+            logger.error("No hay conexión a la base de datos para particionar mediciones_planas")
+            return False
+
+        legacy = f'{FLAT_TABLE}_legacy'
+        cursor = connection.cursor()
+        try:
+            if self.is_partitioned(cursor):
+                connection.rollback()
+                logger.info("mediciones_planas ya está particionada")
+                return True
+
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (PARTITION_LOCK_KEY,))
+            cursor.execute(f"LOCK TABLE {FLAT_TABLE} IN ACCESS EXCLUSIVE MODE")
+            cursor.execute(f"ALTER TABLE {FLAT_TABLE} RENAME TO {legacy}")
+            cursor.execute(
+                f"CREATE TABLE {FLAT_TABLE} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE (fecha)"
+            )
+            # Filas sin fecha o fuera de las particiones creadas
+            cursor.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {FLAT_TABLE} DEFAULT")
+
+            cursor.execute(f"SELECT MIN(fecha), MAX(fecha) FROM {legacy}")
+            first, last = cursor.fetchone()
+            if first is not None:
+                month = month_start(first)
+                while month <= last:
+                    cursor.execute(
+                        f"CREATE TABLE {partition_name(month)} PARTITION OF {FLAT_TABLE} "
+                        f"FOR VALUES FROM (%s) TO (%s)",
+                        (month, next_month(month))
+                    )
+                    month = next_month(month)
+
+            cursor.execute(f"INSERT INTO {FLAT_TABLE} SELECT * FROM {legacy}")
+            moved = cursor.rowcount
+
+            # La secuencia del id pasa a la nueva tabla antes de eliminar la anterior
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", (legacy,))
+            sequence = cursor.fetchone()[0]
+            if sequence:
+                cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {FLAT_TABLE}.id")
+            cursor.execute(f"DROP TABLE {legacy}")
+
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_mediciones_planas_id ON {FLAT_TABLE} (id)")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_mediciones_planas_archivo_fuente ON {FLAT_TABLE} (archivo_fuente_id)"
+            )
+            cursor.execute(NATURAL_KEY_INDEX_QUERY)
+
+            connection.commit()
+            logger.info(f"✅ mediciones_planas particionada por mes: {moved} filas migradas")
+            with PartitionManager._lock:
+                PartitionManager._known.pop(self.db_connection.database_key(), None)
+            return True
+
+        except Exception as e:
+            connection.rollback()
+            logger.error(f"Error al particionar mediciones_planas: {e}")
+            return False
+        finally:
+            cursor.close()
+
+    def detach_before(self, cutoff, archive_dir=None, drop=False):
+        """
+        Desadjunta las particiones de meses anteriores a la fecha de corte.
+        Opcionalmente las archiva a CSV y las elimina.
+
+        Args:
+            cutoff: Fecha de corte; se desadjuntan los meses que terminan antes de ella
+            archive_dir: Directorio donde exportar cada partición a CSV (opcional)
+            drop: Si es True, elimina la partición tras desadjuntarla (y archivarla)
+
+        Returns:
+            list: Nombres de las particiones procesadas
+        """
+        connection = self.db_connection.get_connection()
+        if not connection:
+            logger.error("No hay conexión a la base de datos para el mantenimiento de particiones")
+            return []
+
+        cursor = connection.cursor()
+        processed = []
+        try:
+            if not self.is_partitioned(cursor):
+                logger.warning("⚠️ mediciones_planas no está particionada; nada que desadjuntar")
+                connection.rollback()
+                return []
+
+            if archive_dir:
+                os.makedirs(archive_dir, exist_ok=True)
+
+            for name, month in self.list_partitions(cursor):
+                if next_month(month) > cutoff:
+                    continue
+
+                cursor.execute(f"ALTER TABLE {FLAT_TABLE} DETACH PARTITION {name}")
+                if archive_dir:
+                    archive_path = os.path.join(archive_dir, f"{name}.csv")
+                    with open(archive_path, 'w', encoding='utf-8', newline='') as archive_file:
+                        cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER true)", archive_file)
+                    logger.info(f"📦 Partición {name} archivada en {archive_path}")
+                if drop:
+                    cursor.execute(f"DROP TABLE {name}")
+                # Confirmar partición por partición para no retener bloqueos largos
+                connection.commit()
+                processed.append(name)
+                logger.info(f"Partición {name} {'eliminada' if drop else 'desadjuntada'}")
+
+            with PartitionManager._lock:
+                PartitionManager._known.pop(self.db_connection.database_key(), None)
+            return processed
+
+        except Exception as e:
+            connection.rollback()
+            logger.error(f"Error en el mantenimiento de particiones: {e}")
+            return processed
+        finally:
+            cursor.close()
+
+
+def main(argv=None):
+    """Comando de mantenimiento de particiones de mediciones_planas"""
+    from config.settings import load_config
+    from core.database.connection import DatabaseConnection
+
+    parser = argparse.ArgumentParser(description="Mantenimiento de particiones mensuales de mediciones_planas")
+    parser.add_argument('--config', default='config.ini', help="Ruta del archivo config.ini")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('convert', help="Convertir mediciones_planas en tabla particionada por mes")
+
+    ensure_parser = subparsers.add_parser('ensure', help="Crear particiones para un rango de meses")
+    ensure_parser.add_argument('--start', required=True, help="Mes inicial (AAAA-MM)")
+    ensure_parser.add_argument('--end', required=True, help="Mes final (AAAA-MM)")
+
+    detach_parser = subparsers.add_parser('detach', help="Desadjuntar particiones anteriores a un mes")
+    detach_parser.add_argument('--before', required=True, help="Mes de corte (AAAA-MM), no incluido")
+    detach_parser.add_argument('--archive-dir', help="Directorio donde archivar cada partición en CSV")
+    detach_parser.add_argument('--drop', action='store_true', help="Eliminar las particiones tras desadjuntarlas")
+
+    args = parser.parse_args(argv)
+
+    def parse_month(value):
+        year, month = value.split('-')[:2]
+        return date(int(year), int(month), 1)
+
+    db_connection = DatabaseConnection(load_config(args.config))
+    if not db_connection.connect():
+        logger.error("No se pudo establecer conexión con la base de datos")
+        return 1
+
+    manager = PartitionManager(db_connection)
+    try:
+        if args.command == 'convert':
+            return 0 if manager.convert_table() else 1
+
+        if args.command == 'ensure':
+            connection = db_connection.get_connection()
+            cursor = connection.cursor()
+            try:
+                end = parse_month(args.end)
+                created = manager.ensure_partitions(cursor, parse_month(args.start), end)
+                connection.commit()
+                manager.mark_known(created)
+            except Exception as e:
+                connection.rollback()
+                logger.error(f"Error al crear particiones: {e}")
+                return 1
+            finally:
+                cursor.close()
+            return 0
+
+        manager.detach_before(parse_month(args.before), args.archive_dir, args.drop)
+        return 0
+    finally:
+        db_connection.close()
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
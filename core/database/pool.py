@@ -0,0 +1,274 @@
+#sonel_extractor/database/pool.py
+import time
+import threading
+from collections import deque
+import psycopg2
+from psycopg2 import extensions
+from config.logger import logger
+
+
+class PoolTimeoutError(Exception):
+    """Se agotó el tiempo de espera para obtener una conexión del pool"""
+
+
+class ConnectionPool:
+    """Pool de conexiones PostgreSQL seguro para hilos con validación por inactividad"""
+
+    def __init__(self, db_config, min_size=1, max_size=5, validate_after=60.0,
+                 checkout_timeout=30.0, max_retries=3, backoff_base=0.5):
+        """
+        Inicializa el pool de conexiones
+
+        Args:
+            db_config: Diccionario con host, port, database, user y password
+            min_size: Conexiones que se abren al crear el pool
+            max_size: Máximo de conexiones simultáneas
+            validate_after: Segundos de inactividad a partir de los cuales se valida la conexión
+            checkout_timeout: Segundos máximos de espera cuando el pool está lleno
+            max_retries: Intentos de conexión antes de fallar
+            backoff_base: Espera inicial (segundos) entre reintentos, se duplica en cada intento
+        """
+        self.db_config = dict(db_config)
+        self.min_size = max(int(min_size), 0)
+        self.max_size = max(int(max_size), 1, self.min_size)
+        self.validate_after = float(validate_after)
+        self.checkout_timeout = float(checkout_timeout)
+        self.max_retries = max(int(max_retries), 1)
+        self.backoff_base = float(backoff_base)
+
+        self._idle = deque()  # (conexión, instante del último uso)
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition(threading.Lock())
+
+        for _ in range(self.min_size):
+            try:
+                connection = self._connect_with_backoff()
+            except Exception as e:
+                logger.warning(f"⚠️ No se pudo precargar conexión del pool: {e}")
+                break
+            with self._condition:
+                self._size += 1
+                self._idle.append((connection, time.monotonic()))
+
+    def getconn(self):
+        """
+        Obtiene una conexión del pool. Solo se valida con SELECT 1 si estuvo
+        inactiva más de validate_after segundos.
+
+        Returns:
+            Connection: Conexión psycopg2 lista para usar
+        """
+        deadline = time.monotonic() + self.checkout_timeout
+
+        while True:
+            candidate = None
+            create_new = False
+
+            with self._condition:
+                while candidate is None and not create_new:
+                    if self._closed:
+                        raise RuntimeError("El pool de conexiones está cerrado")
+                    if self._idle:
+                        candidate = self._idle.pop()
+                    elif self._size < self.max_size:
+                        self._size += 1
+                        create_new = True
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise PoolTimeoutError(
+                                f"Pool de conexiones agotado ({self.max_size} en uso) tras {self.checkout_timeout:.0f}s")
+                        self._condition.wait(remaining)
+
+            if create_new:
+                try:
+                    return self._connect_with_backoff()
+                except Exception:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+
+            connection, last_used = candidate
+            if connection.closed:
+                self._discard(connection)
+                continue
+
+            if time.monotonic() - last_used >= self.validate_after and not self._is_alive(connection):
+                logger.warning("⚠️ Conexión inactiva del pool inválida, se descarta")
+                self._discard(connection)
+                continue
+
+            return connection
+
+    def putconn(self, connection, discard=False):
+        """
+        Devuelve una conexión al pool
+
+        Args:
+            connection: Conexión obtenida con getconn
+            discard: Si es True, la conexión se cierra en lugar de reutilizarse
+        """
+        if connection is None:
+            return
+
+        if not discard and not connection.closed:
+            try:
+                # No dejar transacciones abiertas en conexiones reutilizables
+                if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            except Exception:
+                discard = True
+
+        if discard or connection.closed or self._closed:
+            self._discard(connection)
+            return
+
+        with self._condition:
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def closeall(self):
+        """Cierra todas las conexiones inactivas y marca el pool como cerrado"""
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._condition.notify_all()
+
+        for connection, _ in idle:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def stats(self):
+        """
+        Devuelve el estado actual del pool
+
+        Returns:
+            dict: Conexiones totales, inactivas y en uso
+        """
+        with self._condition:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'max_size': self.max_size
+            }
+
+    def _discard(self, connection):
+        """Cierra una conexión y libera su lugar en el pool"""
+        try:
+            if not connection.closed:
+                connection.close()
+        except Exception:
+            pass
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    @staticmethod
+    def _is_alive(connection):
+        """Comprueba con una consulta mínima que la conexión responde"""
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _connect_with_backoff(self):
+        """
+        Abre una conexión nueva reintentando con espera exponencial
+
+        Returns:
+            Connection: Conexión psycopg2
+        """
+        last_error = None
+        for attempt in range(self.max_retries):
+            try:
+                return create_raw_connection(self.db_config)
+            except psycopg2.Error as e:
+                last_error = e
+                error_msg = str(e).lower()
+                # Errores de credenciales o base inexistente no se resuelven reintentando
+                if "authentication failed" in error_msg or "does not exist" in error_msg:
+                    break
+                if attempt < self.max_retries - 1:
+                    delay = self.backoff_base * (2 ** attempt)
+                    logger.info(f"Reintentando conexión en {delay:.1f}s... ({attempt + 1}/{self.max_retries})")
+                    time.sleep(delay)
+        raise last_error
+
+
+def create_raw_connection(db_config):
+    """
+    Abre una conexión psycopg2 con la configuración indicada
+
+    Args:
+        db_config: Diccionario con host, port, database, user y password
+
+    Returns:
+        Connection: Conexión psycopg2
+    """
+    return psycopg2.connect(
+        host=db_config['host'],
+        port=int(db_config['port']),
+        database=db_config['database'],
+        user=db_config['user'],
+        password=db_config['password'],
+        connect_timeout=15,
+        application_name="SonelExtractor_Portable"
+    )
+
+
+_shared_pools = {}
+_shared_pools_lock = threading.Lock()
+
+
+def get_shared_pool(db_config, **pool_options):
+    """
+    Obtiene el pool compartido del proceso para una configuración de base de datos.
+    ETL, exportación y GUI reutilizan así las mismas conexiones. El pool se crea
+    (con sus reintentos) fuera del candado global, para que una base que no responde
+    no bloquee a los hilos que usan otras; si dos hilos lo crean a la vez, se conserva
+    el primero publicado y se cierra el otro.
+
+    Args:
+        db_config: Diccionario con host, port, database, user y password
+        pool_options: Parámetros de ConnectionPool (solo se usan al crearlo)
+
+    Returns:
+        ConnectionPool: Pool compartido
+    """
+    key = (db_config['host'], str(db_config['port']), db_config['database'], db_config['user'])
+    with _shared_pools_lock:
+        pool = _shared_pools.get(key)
+    if pool is not None and not pool._closed:
+        return pool
+
+    created = ConnectionPool(db_config, **pool_options)
+    with _shared_pools_lock:
+        pool = _shared_pools.get(key)
+        if pool is None or pool._closed:
+            _shared_pools[key] = created
+            logger.info(f"Pool de conexiones creado (min={created.min_size}, max={created.max_size})")
+            return created
+
+    # Otro hilo publicó su pool mientras se creaba este
+    created.closeall()
+    return pool
+
+
+def close_all_pools():
+    """Cierra todos los pools compartidos del proceso"""
+    with _shared_pools_lock:
+        pools = list(_shared_pools.values())
+        _shared_pools.clear()
+    for pool in pools:
+        pool.closeall()
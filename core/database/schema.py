@@ -0,0 +1,176 @@
+#sonel_extractor/database/schema.py
+import threading
+from config.logger import logger
+from core.database.advisory_locks import SCHEMA_LOCK_KEY
+from core.database.lineage import LINEAGE_MIGRATION_QUERIES
+from core.database.export_watermark import CREATE_EXPORT_WATERMARK_TABLE_QUERY
+from config.settings import (
+    CREATE_CODIGO_TABLE_QUERY, CREATE_MEDICIONES_TABLE_QUERY,
+    CREATE_VOLTAJE_MEDICIONES_TABLE_QUERY, CREATE_CORRIENTE_MEDICIONES_TABLE_QUERY,
+    CREATE_POTENCIA_MEDICIONES_TABLE_QUERY, CREATE_TABLA_UNICA_QUERY
+)
+
+CREATE_SCHEMA_VERSION_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        descripcion TEXT,
+        fecha_aplicacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+# Índice de la clave natural de mediciones_planas para la fusión por anti-join. No es
+# único: con dedup_on_load = false las exportaciones solapadas se cargan completas
+NATURAL_KEY_INDEX_QUERY = """
+    CREATE INDEX IF NOT EXISTS idx_mediciones_planas_clave
+        ON mediciones_planas (codigo_id, fecha, time);
+"""
+
+# Migraciones en orden: (versión, descripción, lista de sentencias)
+SCHEMA_MIGRATIONS = [
+    (1, "Tablas base de códigos y mediciones", [
+        CREATE_CODIGO_TABLE_QUERY,
+        CREATE_MEDICIONES_TABLE_QUERY,
+        CREATE_VOLTAJE_MEDICIONES_TABLE_QUERY,
+        CREATE_CORRIENTE_MEDICIONES_TABLE_QUERY,
+        CREATE_POTENCIA_MEDICIONES_TABLE_QUERY,
+        CREATE_TABLA_UNICA_QUERY
+    ]),
+    (2, "Índice único de código de cliente para resolución en lote", [
+        """
+        DO $$
+        BEGIN
+            -- Solo si no hay códigos duplicados previos; si los hay, la resolución
+            -- en lote recurre a la búsqueda por archivo
+            IF NOT EXISTS (SELECT 1 FROM codigo GROUP BY codigo HAVING COUNT(*) > 1) THEN
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_codigo_codigo_unico ON codigo (codigo);
+            END IF;
+        END $$;
+        """
+    ]),
+    (3, "Linaje de archivo fuente (archivo_fuente y archivo_fuente_id)", LINEAGE_MIGRATION_QUERIES),
+    (4, "Índice de clave natural (codigo_id, fecha, time) en mediciones_planas", [NATURAL_KEY_INDEX_QUERY]),
+    (5, "Marcas de agua de exportación incremental", [CREATE_EXPORT_WATERMARK_TABLE_QUERY]),
+]
+
+
+class SchemaManager:
+    """Inicialización única del esquema con control de versiones"""
+
+    # Bases de datos cuyo esquema ya está al día en este proceso
+    _ready = set()
+    _lock = threading.Lock()
+
+    def __init__(self, db_connection):
+        """
+        Inicializa el gestor de esquema
+
+        Args:
+            db_connection: Objeto DatabaseConnection
+        """
+        self.db_connection = db_connection
+
+    @property
+    def latest_version(self):
+        """Versión más reciente definida en SCHEMA_MIGRATIONS"""
+        return SCHEMA_MIGRATIONS[-1][0] if SCHEMA_MIGRATIONS else 0
+
+    def ensure_schema(self):
+        """
+        Verifica el esquema una sola vez por proceso y base de datos. Solo se
+        ejecuta DDL si la versión registrada es menor que la última migración.
+
+        Returns:
+            bool: True si el esquema está listo
+        """
+        cache_key = self.db_connection.database_key()
+        if cache_key in SchemaManager._ready:
+            return True
+
+        with SchemaManager._lock:
+            if cache_key in SchemaManager._ready:
+                return True
+
+            if self._bootstrap():
+                SchemaManager._ready.add(cache_key)
+                return True
+            return False
+
+    def _bootstrap(self):
+        """
+        Aplica las migraciones pendientes en una sola transacción
+
+        Returns:
+            bool: True si el esquema quedó en la última versión
+        """
+        connection = self.db_connection.get_connection()
+        if not connection:
+            logger.error("No hay conexión a la base de datos para verificar el esquema")
+            return False
+
+        cursor = connection.cursor()
+        try:
+            current = self._get_current_version(cursor)
+            if current >= self.latest_version:
+                connection.rollback()
+                logger.debug(f"Esquema de base de datos al día (versión {current})")
+                return True
+
+            # Serializar migraciones entre procesos y volver a leer la versión
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (SCHEMA_LOCK_KEY,))
+            cursor.execute(CREATE_SCHEMA_VERSION_TABLE_QUERY)
+            current = self._get_current_version(cursor)
+
+            for version, description, statements in SCHEMA_MIGRATIONS:
+                if version <= current:
+                    continue
+                logger.info(f"Aplicando migración de esquema {version}: {description}")
+                for statement in statements:
+                    cursor.execute(statement)
+                cursor.execute(
+                    "INSERT INTO schema_version (version, descripcion) VALUES (%s, %s) ON CONFLICT (version) DO NOTHING",
+                    (version, description)
+                )
+
+            connection.commit()
+            logger.info(f"Esquema de base de datos en versión {self.latest_version}")
+            return True
+
+        except Exception as e:
+            connection.rollback()
+            logger.error(f"Error al inicializar el esquema de base de datos: {e}")
+            return False
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _get_current_version(cursor):
+        """
+        Lee la versión registrada del esquema
+
+        Returns:
+            int: Versión actual (0 si la tabla schema_version no existe)
+        """
+        cursor.execute("SELECT to_regclass('schema_version') IS NOT NULL")
+        if not cursor.fetchone()[0]:
+            return 0
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        return cursor.fetchone()[0]
+
+    @classmethod
+    def reset_cache(cls):
+        """Olvida el estado 'esquema listo' (p. ej. tras restaurar la base de datos)"""
+        with cls._lock:
+            cls._ready.clear()
+
+
+def ensure_schema(db_connection):
+    """
+    Atajo para verificar el esquema una sola vez por proceso
+
+    Args:
+        db_connection: Objeto DatabaseConnection
+
+    Returns:
+        bool: True si el esquema está listo
+    """
+    return SchemaManager(db_connection).ensure_schema()
@@ -9,6 +9,23 @@ class DataLoader:
     
     def __init__(self, db_connection):
         self.db_connection = db_connection
+        self.last_load_stats = {}
+    
+    def prefetch_client_codes(self, file_paths):
+        """
+        Resuelve en lote los códigos de cliente de los archivos a procesar
+        
+        Args:
+            file_paths: Lista de rutas de archivos
+            
+        Returns:
+            dict: {codigo: codigo_id} resueltos (vacío si no hay conexión o falla)
+        """
+        if not file_paths or not self.db_connection.get_connection():
+            return {}
+        
+        handler = DataHandler(self.db_connection)
+        return handler.resolve_codigo_ids(file_paths)
     
     def load_data(self, data, codigo, file_path):
         """
@@ -22,6 +39,7 @@ class DataLoader:
         Returns:
             bool: True si la carga fue exitosa
         """
+        self.last_load_stats = {}
         connection = self.db_connection.get_connection()
         if not connection:
             return False
@@ -30,7 +48,39 @@ class DataLoader:
         
         # Determinar si debemos intentar extraer el código del archivo
         should_extract = file_path is not None
-        return handler.insert_data(data, codigo, file_path, should_extract=should_extract)
+        success = handler.insert_data(data, codigo, file_path, should_extract=should_extract)
+        self.last_load_stats = dict(handler.last_load_stats)
+        return success
+    
+    def supports_streaming(self):
+        """
+        Indica si la configuración de carga admite archivos por bloques
+        
+        Returns:
+            bool: True con load_mode = copy y relational_mode = batch
+        """
+        return DataHandler(self.db_connection).supports_streaming
+    
+    def load_data_stream(self, chunks, codigo, file_path):
+        """
+        Carga un archivo por bloques dentro de una única transacción
+        
+        Args:
+            chunks: Iterable de DataFrames transformados
+            codigo: Código del cliente
+            file_path: Ruta al archivo original
+            
+        Returns:
+            bool: True si la carga fue exitosa
+        """
+        self.last_load_stats = {}
+        if not self.db_connection.get_connection():
+            return False
+        
+        handler = DataHandler(self.db_connection)
+        success = handler.insert_data_stream(chunks, codigo, file_path, should_extract=file_path is not None)
+        self.last_load_stats = dict(handler.last_load_stats)
+        return success
     
     def load_data_standard(self, data, codigo, nombre_archivo="ETL_STANDARD"):
         """
@@ -44,6 +94,7 @@ class DataLoader:
         Returns:
             bool: True si la carga fue exitosa
         """
+        self.last_load_stats = {}
         handler = DataHandler(self.db_connection)
         
         # Para el modo estándar, pasar un file_path simulado para el nombre
@@ -54,4 +105,6 @@ class DataLoader:
             logger.error("No se pudo obtener/crear el ID del cliente")
             return False
             
-        return handler.insert_data_direct(data, cliente_id)
+        success = handler.insert_data_direct(data, cliente_id)
+        self.last_load_stats = dict(handler.last_load_stats)
+        return success
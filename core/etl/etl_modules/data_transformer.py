@@ -2,10 +2,20 @@
 # core/etl/transformers/data_transformer.py
 # ============================================
 from core.transformers.voltage_transformer import VoltageTransformer
+from core.utils.config_options import get_config_bool
 
 class DataTransformer:
     """Transformador de datos especializado"""
     
+    def __init__(self, config=None):
+        """
+        Inicializa el transformador
+        
+        Args:
+            config: Configuración (opcional); [ETL] columnar_output activa la salida columnar
+        """
+        self.columnar_output = get_config_bool(config, 'ETL', 'columnar_output', False)
+    
     def transform_data(self, data):
         """
         Ejecuta el paso de transformación de datos
@@ -14,6 +24,6 @@ class DataTransformer:
             data: DataFrame con los datos extraídos
             
         Returns:
-            DataFrame transformado o None si hay error
+            DataFrame transformado (o ColumnarBatch con columnar_output) o None si hay error
         """
-        return VoltageTransformer.transform(data)
\ No newline at end of file
+        return VoltageTransformer.transform(data, columnar=self.columnar_output)
\ No newline at end of file
@@ -5,6 +5,9 @@ import os
 from datetime import datetime
 from config.logger import logger
 from core.extractors.file_extractor import FileExtractor
+from core.etl.etl_modules.parallel_processor import ParallelFileProcessor, resolve_worker_count
+from core.etl.etl_modules.pipeline_processor import PipelineFileProcessor
+from core.utils.config_options import get_config_bool
 from core.utils.processing_registry import ProcessingStatus
 
 class DirectoryProcessor:
@@ -15,6 +18,14 @@ class DirectoryProcessor:
         self.registry = registry
         self.file_processor = file_processor
         self.failed_files = None
+
+        # Lectura y transformación en varios procesos con [ETL] workers > 1, o por
+        # etapas en hilos (la carga de un archivo solapa la lectura del siguiente) con [ETL] pipeline
+        self.concurrent_processor = None
+        if resolve_worker_count(config) > 1:
+            self.concurrent_processor = ParallelFileProcessor(config, registry, file_processor)
+        elif get_config_bool(config, 'ETL', 'pipeline', False):
+            self.concurrent_processor = PipelineFileProcessor(config, registry, file_processor)
     
     def process_directory(self, directory, force_reprocess, data_transformer, data_loader):
         """
@@ -48,8 +59,9 @@ class DirectoryProcessor:
         # Procesar archivos
         success_count, failed_files = self._process_files(files, force_reprocess, data_transformer, data_loader)
         
-        # Registrar tiempo total del batch
+        # Registrar tiempo total del batch y uso de la caché de formatos
         self._register_batch_time(start_time)
+        self.file_processor.flush_layout_cache()
         
         # Log resultado final
         total_files = len(files)
@@ -90,43 +102,60 @@ class DirectoryProcessor:
         success_count = 0
         failed_files = []
 
+        # Resolver todos los códigos de cliente con pocas consultas antes de cargar
+        data_loader.prefetch_client_codes(files)
+
+        if self.concurrent_processor is not None and total_files > 1:
+            def on_file_finished(file_path, success, processing_time):
+                if not success:
+                    self._register_failure(file_path)
+
+            success_count, failed_files = self.concurrent_processor.process_files(
+                files, force_reprocess, data_loader, on_file_finished=on_file_finished)
+            self.failed_files = failed_files
+            return success_count, failed_files
+
         for i, file_path in enumerate(files, start=1):
             logger.info(f"📂 ({i}/{total_files}) Procesando: {os.path.basename(file_path)}")
             if self.file_processor.process_file(file_path, force_reprocess, data_transformer, data_loader):
                 success_count += 1
             else:
                 failed_files.append(file_path)
-                logger.warning(f"❌ Error al procesar: {os.path.basename(file_path)}")
-                
-                # NUEVA LÓGICA: Registrar el archivo como fallido en el registry
-                # Solo si no está ya registrado con estado ERROR
-                if not self.registry.is_file_registered_with_status(file_path, ProcessingStatus.ERROR):
-                    # Registrar inicio si no existe
-                    if os.path.abspath(file_path) not in self.registry.registry_data.get("files", {}):
-                        self.registry.register_processing_start(file_path)
-                    
-                    # Registrar el error
-                    error_message = f"Error en procesamiento de directorio - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                    additional_info = {
-                        "processing_time_seconds": 0,
-                        "file_size_bytes": 0,
-                        "error_type": "directory_processing_failure"
-                    }
-                    
-                    try:
-                        # Intentar obtener tamaño del archivo
-                        if os.path.exists(file_path):
-                            additional_info["file_size_bytes"] = os.path.getsize(file_path)
-                    except:
-                        pass
-                    
-                    self.registry.register_processing_error(file_path, error_message, additional_info)
+                self._register_failure(file_path)
 
         # Guardar o exponer lista de fallos si lo deseas externamente
         self.failed_files = failed_files
         
         return success_count, failed_files
     
+    def _register_failure(self, file_path):
+        """Registra en el registry un archivo que no se pudo procesar"""
+        logger.warning(f"❌ Error al procesar: {os.path.basename(file_path)}")
+        
+        # NUEVA LÓGICA: Registrar el archivo como fallido en el registry
+        # Solo si no está ya registrado con estado ERROR
+        if not self.registry.is_file_registered_with_status(file_path, ProcessingStatus.ERROR):
+            # Registrar inicio si no existe
+            if os.path.abspath(file_path) not in self.registry.registry_data.get("files", {}):
+                self.registry.register_processing_start(file_path)
+            
+            # Registrar el error
+            error_message = f"Error en procesamiento de directorio - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            additional_info = {
+                "processing_time_seconds": 0,
+                "file_size_bytes": 0,
+                "error_type": "directory_processing_failure"
+            }
+            
+            try:
+                # Intentar obtener tamaño del archivo
+                if os.path.exists(file_path):
+                    additional_info["file_size_bytes"] = os.path.getsize(file_path)
+            except:
+                pass
+            
+            self.registry.register_processing_error(file_path, error_message, additional_info)
+    
     def _register_batch_time(self, start_time):
         """Registra el tiempo total del batch"""
         end_time = datetime.now()
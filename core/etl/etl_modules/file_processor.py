@@ -6,15 +6,33 @@ from datetime import datetime
 from config.logger import logger
 from core.parser.csv_parser import CSVParser
 from core.parser.excel_parser import ExcelParser
+from core.parser.xml_parser import XMLParser
+from core.parser.layout_cache import LayoutCache, LAYOUT_CACHE_FILENAME
+from core.utils.config_options import get_config_bool, get_config_int
 from core.utils.validators import extract_client_code
 from core.utils.processing_registry import ProcessingStatus
 
+# Formatos que admiten lectura, transformación y carga por bloques
+STREAMABLE_EXTENSIONS = ('.csv', '.xml')
+
+# Formatos con parser
+SUPPORTED_EXTENSIONS = ('.xlsx', '.csv', '.xml')
+
 class FileProcessor:
     """Procesador especializado para archivos individuales"""
     
     def __init__(self, config, registry):
         self.config = config
         self.registry = registry
+
+        # Caché de formatos CSV junto al registro de procesamiento
+        self.layout_cache = None
+        if get_config_bool(config, 'PARSER', 'layout_cache', True):
+            registry_dir = os.path.dirname(os.path.abspath(registry.registry_file))
+            self.layout_cache = LayoutCache(os.path.join(registry_dir, LAYOUT_CACHE_FILENAME))
+
+        # Filas por bloque en la carga por bloques de CSV y XML (0 = archivo completo en memoria)
+        self.stream_chunk_rows = get_config_int(config, 'ETL', 'stream_chunk_rows', 0)
     
     def process_file(self, file_path, force_reprocess, data_transformer, data_loader):
         """
@@ -45,10 +63,15 @@ class FileProcessor:
             cliente_codigo = extract_client_code(file_path)
             self.registry.register_processing_start(file_path, cliente_codigo)
             
+            if self._should_stream(file_path, data_loader):
+                return self._process_file_streaming(file_path, cliente_codigo, start_time,
+                                                    data_transformer, data_loader)
+            
             # Extraer datos del archivo
             df = self._extract_file_data(file_path, start_time)
             if df is None:
                 return False
+            parse_info = df.attrs.get('parse_info')
                 
             # Transformar datos
             transformed_data = data_transformer.transform_data(df)
@@ -61,13 +84,72 @@ class FileProcessor:
             
             # Cargar datos
             success = data_loader.load_data(transformed_data, cliente_codigo, file_path)
+            load_stats = getattr(data_loader, 'last_load_stats', None)
             
             return self._finalize_processing(success, file_path, cliente_codigo, 
-                                           transformed_data, start_time)
+                                           transformed_data, start_time, load_stats, parse_info)
                 
         except Exception as e:
             return self._handle_processing_error(e, file_path, start_time)
     
+    def _should_stream(self, file_path, data_loader):
+        """Determina si el archivo se procesa por bloques con memoria acotada"""
+        file_ext = os.path.splitext(file_path)[1].lower()
+        if file_ext not in STREAMABLE_EXTENSIONS:
+            return False
+        if self.stream_chunk_rows <= 0:
+            # Los XML siempre se leen de forma incremental; sin carga por bloques se concatenan
+            return False
+        if not hasattr(data_loader, 'load_data_stream') or not data_loader.supports_streaming():
+            logger.debug("Carga por bloques no disponible con la configuración de carga actual")
+            return False
+        return True
+    
+    def _process_file_streaming(self, file_path, cliente_codigo, start_time, data_transformer, data_loader):
+        """
+        Lee, transforma y carga el CSV o XML por bloques de stream_chunk_rows filas. La carga
+        de todos los bloques ocurre en una sola transacción: si un bloque falla, el
+        archivo no queda cargado a medias.
+        
+        Returns:
+            bool: True si el procesamiento fue exitoso
+        """
+        if not self._validate_client_code(cliente_codigo, file_path, start_time):
+            return False
+        
+        if os.path.splitext(file_path)[1].lower() == '.xml':
+            chunks = XMLParser.iter_chunks(file_path, self.config, self.stream_chunk_rows)
+        else:
+            chunks = CSVParser.iter_chunks(file_path, self.config, self.layout_cache, self.stream_chunk_rows)
+        if chunks is None:
+            self._register_error(file_path, f"No se reconoció el formato del archivo: {file_path}", start_time)
+            return False
+        
+        stream_stats = {"rows": 0, "chunks": 0, "columns": 0, "parse_info": None, "error": None}
+        
+        def transformed_chunks():
+            for chunk in chunks:
+                stream_stats["parse_info"] = chunk.attrs.get('parse_info')
+                transformed = data_transformer.transform_data(chunk)
+                if transformed is None or transformed.empty:
+                    stream_stats["error"] = f"Transformación de datos fallida en el bloque {stream_stats['chunks'] + 1} del archivo: {file_path}"
+                    raise ValueError(stream_stats["error"])
+                stream_stats["rows"] += len(transformed)
+                stream_stats["chunks"] += 1
+                stream_stats["columns"] = len(transformed.columns)
+                yield transformed
+        
+        success = data_loader.load_data_stream(transformed_chunks(), cliente_codigo, file_path)
+        load_stats = getattr(data_loader, 'last_load_stats', None)
+        if stream_stats["error"]:
+            self._register_error(file_path, stream_stats["error"], start_time, cliente_codigo)
+            logger.error(f"⚠️ {stream_stats['error']}")
+            return False
+        
+        logger.info(f"Archivo cargado por bloques: {stream_stats['chunks']} bloques, {stream_stats['rows']} filas")
+        return self._finalize_processing(success, file_path, cliente_codigo, None, start_time,
+                                         load_stats, stream_stats["parse_info"], stream_stats)
+    
     def _should_process_file(self, file_path, force_reprocess):
         """Determina si un archivo debe ser procesado"""
         if not force_reprocess:
@@ -78,20 +160,42 @@ class FileProcessor:
                 return False
         return True
     
+    @staticmethod
+    def read_file(file_path, config, layout_cache=None):
+        """
+        Lee un archivo con el parser de su extensión, sin tocar el registro
+        
+        Args:
+            file_path: Ruta al archivo
+            config: Configuración
+            layout_cache: Caché de formatos CSV (opcional)
+            
+        Returns:
+            DataFrame o None si el parser no reconoció el contenido
+            
+        Raises:
+            ValueError: si la extensión no está soportada
+        """
+        file_ext = os.path.splitext(file_path)[1].lower()
+        if file_ext == '.xlsx':
+            return ExcelParser.parse(file_path, config)
+        if file_ext == '.csv':
+            return CSVParser.parse(file_path, config, layout_cache)
+        if file_ext == '.xml':
+            return XMLParser.parse(file_path, config)
+        raise ValueError(f"Formato de archivo no soportado: {file_path}")
+    
     def _extract_file_data(self, file_path, start_time):
         """Extrae datos del archivo según su tipo"""
         file_ext = os.path.splitext(file_path)[1].lower()
         
         try:
-            if file_ext == '.xlsx':
-                return ExcelParser.parse(file_path)
-            elif file_ext == '.csv':
-                return CSVParser.parse(file_path)
-            else:
+            if file_ext not in SUPPORTED_EXTENSIONS:
                 error_msg = f"Formato de archivo no soportado: {file_path}"
                 self._register_error(file_path, error_msg, start_time)
                 logger.error(f"⚠️ {error_msg}")
                 return None
+            return self.read_file(file_path, self.config, self.layout_cache)
         except Exception as e:
             error_msg = f"Error extrayendo datos de {file_path}: {e}"
             self._register_error(file_path, error_msg, start_time)
@@ -116,21 +220,37 @@ class FileProcessor:
             return False
         return True
     
-    def _finalize_processing(self, success, file_path, cliente_codigo, transformed_data, start_time):
-        """Finaliza el procesamiento registrando el resultado"""
+    def _finalize_processing(self, success, file_path, cliente_codigo, transformed_data, start_time,
+                             load_stats=None, parse_info=None, stream_stats=None):
+        """Finaliza el procesamiento registrando el resultado, las filas cargadas por tabla y la detección del formato"""
         end_time = datetime.now()
         processing_time = (end_time - start_time).total_seconds()
         
         if success:
+            if stream_stats:
+                rows_processed = stream_stats["rows"]
+                columns_processed = stream_stats["columns"]
+            else:
+                rows_processed = len(transformed_data)
+                columns_processed = len(transformed_data.columns) if hasattr(transformed_data, 'columns') else 0
             additional_info = {
-                "rows_processed": len(transformed_data),
-                "columns_processed": len(transformed_data.columns) if hasattr(transformed_data, 'columns') else 0,
+                "rows_processed": rows_processed,
+                "columns_processed": columns_processed,
                 "client_code": cliente_codigo,
                 "processing_time_seconds": processing_time,
                 "file_size_bytes": os.path.getsize(file_path) if os.path.exists(file_path) else 0
             }
+            if load_stats:
+                additional_info["rows_loaded"] = dict(load_stats)
+                if "overlap_rows" in load_stats:
+                    additional_info["overlap_rows"] = load_stats["overlap_rows"]
+            if parse_info:
+                additional_info["parse_info"] = dict(parse_info)
+                additional_info["parse_engine"] = parse_info.get("engine")
+            if stream_stats:
+                additional_info["chunks_processed"] = stream_stats["chunks"]
             self.registry.register_processing_success(file_path, additional_info)
-            logger.info(f"✅ Archivo procesado exitosamente: {file_path} | Cliente: {cliente_codigo} | Tiempo: {processing_time:.2f}s | Registros: {len(transformed_data)}")
+            logger.info(f"✅ Archivo procesado exitosamente: {file_path} | Cliente: {cliente_codigo} | Tiempo: {processing_time:.2f}s | Registros: {rows_processed}")
             return True
         else:
             error_msg = f"Error al cargar datos desde archivo: {file_path}"
@@ -160,6 +280,13 @@ class FileProcessor:
             
         self.registry.register_processing_error(file_path, error_msg, error_info)
     
+    def flush_layout_cache(self):
+        """Guarda la caché de formatos y registra sus aciertos y fallos para el resumen"""
+        if self.layout_cache is None:
+            return
+        self.layout_cache.save()
+        self.registry.register_layout_cache_stats(self.layout_cache.stats())
+    
     def reset_file_processing(self, file_path):
         """Reinicia el estado de procesamiento de un archivo específico"""
         from core.extractors.file_extractor import FileExtractor
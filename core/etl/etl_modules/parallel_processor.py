@@ -0,0 +1,363 @@
+# ============================================
+# core/etl/processors/parallel_processor.py
+# ============================================
+import os
+import time
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from config.logger import logger
+from core.etl.etl_modules.data_transformer import DataTransformer
+from core.etl.etl_modules.file_processor import FileProcessor
+from core.parser.layout_cache import LayoutCache
+from core.utils.config_options import get_config_int
+from core.utils.validators import extract_client_code
+
+# Secciones de configuración que necesitan los procesos de lectura y transformación
+WORKER_CONFIG_SECTIONS = ('PARSER', 'ETL')
+
+# Archivos en vuelo (leyéndose o esperando carga) por proceso de trabajo
+FILES_IN_FLIGHT_PER_WORKER = 2
+
+# Estado de cada proceso de trabajo, creado por _init_worker
+_worker_state = {}
+
+
+def resolve_worker_count(config):
+    """
+    Procesos de lectura y transformación configurados en [ETL] workers
+
+    Args:
+        config: Configuración
+
+    Returns:
+        int: Número de procesos (0 en la configuración = núcleos disponibles)
+    """
+    workers = get_config_int(config, 'ETL', 'workers', 1)
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def _config_snapshot(config):
+    """Copia en diccionarios de las secciones que usan los procesos de trabajo (se envía por pickle)"""
+    if config is None:
+        return None
+    return {section: dict(config[section]) for section in WORKER_CONFIG_SECTIONS if section in config}
+
+
+def _init_worker(config_snapshot, layout_cache_file):
+    """Inicializa un proceso de trabajo con su propia caché de formatos y transformador"""
+    _worker_state['config'] = config_snapshot
+    _worker_state['layout_cache'] = LayoutCache(layout_cache_file) if layout_cache_file else None
+    _worker_state['transformer'] = DataTransformer(config_snapshot)
+
+
+def _parse_and_transform(file_path):
+    """
+    Lee y transforma un archivo dentro de un proceso de trabajo
+
+    Args:
+        file_path: Ruta al archivo
+
+    Returns:
+        dict: transformed (DataFrame o ColumnarBatch), extracted, parse_info, error de
+              lectura, búsquedas en la caché de formatos y segundos empleados
+    """
+    started = time.perf_counter()
+    layout_cache = _worker_state['layout_cache']
+    before = layout_cache.stats() if layout_cache else None
+    result = {'transformed': None, 'extracted': False, 'parse_info': None, 'error': None,
+              'layout_hits': 0, 'layout_misses': 0}
+
+    try:
+        df = FileProcessor.read_file(file_path, _worker_state['config'], layout_cache)
+    except Exception as e:
+        df = None
+        result['error'] = f"Error extrayendo datos de {file_path}: {e}"
+
+    if df is not None:
+        result['extracted'] = True
+        result['parse_info'] = df.attrs.get('parse_info')
+        result['transformed'] = _worker_state['transformer'].transform_data(df)
+
+    if layout_cache is not None:
+        # Los formatos nuevos quedan disponibles para los demás procesos y la siguiente ejecución
+        layout_cache.save()
+        after = layout_cache.stats()
+        result['layout_hits'] = after['hits'] - before['hits']
+        result['layout_misses'] = after['misses'] - before['misses']
+
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+class ParallelFileProcessor:
+    """
+    Procesamiento de varios archivos a la vez: la lectura y transformación ocurren en
+    procesos de trabajo y la carga en hilos con su propia conexión. El registro y los
+    eventos se actualizan solo desde el hilo que llama a process_files.
+    """
+
+    def __init__(self, config, registry, file_processor, workers=None, db_writers=None):
+        """
+        Inicializa el procesador
+
+        Args:
+            config: Configuración
+            registry: Registro de procesamiento
+            file_processor: FileProcessor que registra el inicio, los errores y el resultado
+            workers: Procesos de lectura y transformación ([ETL] workers si es None)
+            db_writers: Hilos de carga ([ETL] db_writers si es None)
+        """
+        self.config = config
+        self.registry = registry
+        self.file_processor = file_processor
+        self.workers = workers or resolve_worker_count(config)
+        self.db_writers = max(1, db_writers or get_config_int(config, 'ETL', 'db_writers', 1))
+        self.stage_stats = {}
+        self._success_count = 0
+        self._failed_files = []
+        self._writers_lock = threading.Lock()
+        self._writer_state = threading.local()
+        self._writer_loaders = []
+
+    def process_files(self, files, force_reprocess, data_loader, on_file_started=None, on_file_finished=None,
+                      on_stage_update=None):
+        """
+        Procesa los archivos en paralelo. Como mucho workers × FILES_IN_FLIGHT_PER_WORKER
+        archivos están leídos y sin cargar a la vez, lo que acota la memoria.
+
+        Args:
+            files: Lista de rutas de archivos
+            force_reprocess: Si True, ignora el registro y procesa los archivos
+            data_loader: Cargador del primer hilo de carga; los demás abren su propia conexión
+            on_file_started: Función (file_path, índice) llamada al empezar cada archivo
+            on_file_finished: Función (file_path, éxito, segundos) llamada al terminar cada archivo
+            on_stage_update: Función (dict) llamada cuando una etapa termina un archivo, con
+                             los archivos en cola por etapa y los tiempos acumulados
+
+        Returns:
+            tuple: (archivos exitosos, lista de archivos fallidos)
+        """
+        total_files = len(files)
+        max_in_flight = self.workers * FILES_IN_FLIGHT_PER_WORKER
+        logger.info(f"⚙️ Procesamiento paralelo: {self.workers} procesos de lectura, {self.db_writers} conexiones de carga")
+        self._reset_run(('parse', 'load'))
+
+        layout_cache = self.file_processor.layout_cache
+        pending = deque(enumerate(files, start=1))
+        in_flight = {}
+
+        def queue_depths():
+            stages = [stage for stage, _ in in_flight.values()]
+            return {'parse': stages.count('parse'), 'load': stages.count('load')}
+
+        # spawn en todas las plataformas: los hilos de carga no se heredan a medio usar
+        parse_pool = ProcessPoolExecutor(max_workers=self.workers,
+                                         mp_context=multiprocessing.get_context('spawn'),
+                                         initializer=_init_worker,
+                                         initargs=(_config_snapshot(self.config),
+                                                   layout_cache.cache_file if layout_cache else None))
+        load_pool = ThreadPoolExecutor(max_workers=self.db_writers, thread_name_prefix="sonel-writer")
+        try:
+            while pending or in_flight:
+                while pending and len(in_flight) < max_in_flight:
+                    index, file_path = pending.popleft()
+                    context = self._start_file(index, total_files, file_path, force_reprocess,
+                                               on_file_started, on_file_finished)
+                    if context is None:
+                        continue
+                    try:
+                        in_flight[parse_pool.submit(_parse_and_transform, file_path)] = ('parse', context)
+                    except Exception as e:
+                        self.file_processor._handle_processing_error(e, file_path, context['start_time'])
+                        self._finish_file(context, False, on_file_finished)
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, context = in_flight.pop(future)
+                    result = self._future_result(future)
+                    self._record_stage(stage, context['file_path'], result, queue_depths(), on_stage_update)
+                    if stage == 'parse':
+                        if self._accept_parsed(result, context):
+                            load_future = load_pool.submit(self._load, data_loader, context)
+                            in_flight[load_future] = ('load', context)
+                            continue
+                        self._finish_file(context, False, on_file_finished)
+                    else:
+                        self._finish_file(context, self._finalize(result, context), on_file_finished)
+        finally:
+            parse_pool.shutdown(wait=True, cancel_futures=True)
+            load_pool.shutdown(wait=True)
+            self._close_writers()
+            if layout_cache is not None:
+                layout_cache.reload()
+
+        self._log_stage_stats()
+        return self._success_count, self._failed_files
+
+    def _reset_run(self, stages):
+        """Reinicia los contadores de una ejecución de process_files"""
+        self.stage_stats = {stage: {'files': 0, 'busy_seconds': 0.0, 'max_queue_depth': 0} for stage in stages}
+        self._success_count = 0
+        self._failed_files = []
+
+    def _start_file(self, index, total_files, file_path, force_reprocess, on_file_started, on_file_finished):
+        """
+        Anuncia el archivo y ejecuta los pasos previos a la lectura
+
+        Returns:
+            dict con el contexto del archivo o None si ya terminó (omitido o fallido)
+        """
+        logger.info(f"📂 ({index}/{total_files}) Procesando: {os.path.basename(file_path)}")
+        if on_file_started:
+            on_file_started(file_path, index)
+        started = time.perf_counter()
+        context = self._begin_file(file_path, force_reprocess)
+        if context is None or context is True:
+            self._finish_file({'file_path': file_path, 'started': started}, context is True, on_file_finished)
+            return None
+        context['started'] = started
+        return context
+
+    def _finish_file(self, context, success, on_file_finished):
+        """Cuenta el resultado del archivo y llama a on_file_finished"""
+        if success:
+            self._success_count += 1
+        else:
+            self._failed_files.append(context['file_path'])
+        if on_file_finished:
+            on_file_finished(context['file_path'], success, time.perf_counter() - context['started'])
+
+    def _begin_file(self, file_path, force_reprocess):
+        """
+        Pasos previos a la lectura, en el hilo principal
+
+        Returns:
+            dict con el contexto del archivo, True si se omite o None si falla
+        """
+        start_time = datetime.now()
+        if not os.path.exists(file_path):
+            logger.error(f"❌ El archivo {file_path} no existe")
+            return None
+        if not self.file_processor._should_process_file(file_path, force_reprocess):
+            return True
+
+        cliente_codigo = extract_client_code(file_path)
+        self.registry.register_processing_start(file_path, cliente_codigo)
+        if not self.file_processor._validate_client_code(cliente_codigo, file_path, start_time):
+            return None
+        return {'file_path': file_path, 'cliente_codigo': cliente_codigo, 'start_time': start_time}
+
+    @staticmethod
+    def _future_result(future):
+        """Resultado de una etapa; una excepción se devuelve en la clave exception"""
+        try:
+            return future.result()
+        except Exception as e:
+            return {'exception': e, 'seconds': 0.0}
+
+    def _record_stage(self, stage, file_path, result, queue_depths, on_stage_update):
+        """Acumula el tiempo de la etapa y las colas observadas, y llama a on_stage_update"""
+        stats = self.stage_stats[stage]
+        stats['files'] += 1
+        stats['busy_seconds'] += result.get('seconds', 0.0)
+        for name, depth in queue_depths.items():
+            self.stage_stats[name]['max_queue_depth'] = max(self.stage_stats[name]['max_queue_depth'], depth)
+        if on_stage_update:
+            on_stage_update({
+                'stage': stage,
+                'file_path': file_path,
+                'seconds': result.get('seconds', 0.0),
+                'queue_depths': dict(queue_depths),
+                'stages': {name: dict(values) for name, values in self.stage_stats.items()}
+            })
+
+    def _accept_parsed(self, result, context):
+        """
+        Registra los errores de lectura y transformación en el hilo principal
+
+        Returns:
+            bool: True si el archivo está listo para cargarse
+        """
+        file_path = context['file_path']
+        start_time = context['start_time']
+        if result.get('exception') is not None:
+            self.file_processor._handle_processing_error(result['exception'], file_path, start_time)
+            return False
+
+        if self.file_processor.layout_cache is not None and (result.get('layout_hits') or result.get('layout_misses')):
+            self.file_processor.layout_cache.add_stats(result['layout_hits'], result['layout_misses'])
+        if result['error']:
+            self.file_processor._register_error(file_path, result['error'], start_time)
+            logger.error(f"⚠️ {result['error']}")
+            return False
+        if not result['extracted']:
+            return False
+
+        transformed = result['transformed']
+        if not self.file_processor._validate_transformed_data(transformed, file_path, start_time):
+            return False
+
+        context['transformed'] = transformed
+        context['parse_info'] = result['parse_info']
+        return True
+
+    def _finalize(self, result, context):
+        """Registra el resultado de la carga en el hilo principal"""
+        file_path = context['file_path']
+        try:
+            if result.get('exception') is not None:
+                raise result['exception']
+            return self.file_processor._finalize_processing(result['success'], file_path, context['cliente_codigo'],
+                                                            context.pop('transformed'), context['start_time'],
+                                                            result['load_stats'], context['parse_info'])
+        except Exception as e:
+            return self.file_processor._handle_processing_error(e, file_path, context['start_time'])
+
+    def _load(self, data_loader, context):
+        """
+        Carga un archivo desde un hilo de carga con el cargador de ese hilo
+
+        Returns:
+            dict: success, load_stats y segundos empleados
+        """
+        started = time.perf_counter()
+        loader = self._writer_loader(data_loader)
+        success = loader.load_data(context['transformed'], context['cliente_codigo'], context['file_path'])
+        return {'success': success,
+                'load_stats': dict(getattr(loader, 'last_load_stats', None) or {}),
+                'seconds': time.perf_counter() - started}
+
+    def _log_stage_stats(self):
+        """Registra en el log el tiempo ocupado y la cola máxima de cada etapa"""
+        summary = ", ".join(f"{stage} {stats['busy_seconds']:.2f}s (cola máx. {stats['max_queue_depth']})"
+                            for stage, stats in self.stage_stats.items())
+        logger.info(f"⏱️ Etapas: {summary}")
+
+    def _writer_loader(self, data_loader):
+        """Cargador del hilo actual: el primero usa data_loader y los demás una conexión propia"""
+        loader = getattr(self._writer_state, 'loader', None)
+        if loader is None:
+            with self._writers_lock:
+                if data_loader not in self._writer_loaders:
+                    loader = data_loader
+                else:
+                    # Importación local: los procesos de trabajo importan este módulo y no usan la base de datos
+                    from core.database.connection import DatabaseConnection
+                    from core.etl.etl_modules.data_loader import DataLoader
+                    loader = DataLoader(DatabaseConnection(self.config))
+                self._writer_loaders.append(loader)
+            self._writer_state.loader = loader
+        return loader
+
+    def _close_writers(self):
+        """Cierra las conexiones abiertas por los hilos de carga adicionales"""
+        with self._writers_lock:
+            for loader in self._writer_loaders[1:]:
+                loader.db_connection.close()
+            self._writer_loaders = []
+        self._writer_state = threading.local()
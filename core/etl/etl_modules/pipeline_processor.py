@@ -0,0 +1,187 @@
+# ============================================
+# core/etl/processors/pipeline_processor.py
+# ============================================
+import time
+import queue
+import threading
+from collections import deque
+from config.logger import logger
+from core.etl.etl_modules.data_transformer import DataTransformer
+from core.etl.etl_modules.file_processor import FileProcessor
+from core.etl.etl_modules.parallel_processor import ParallelFileProcessor
+from core.utils.config_options import get_config_int
+
+# Archivos que esperan en cada cola entre etapas por defecto
+DEFAULT_PIPELINE_QUEUE_SIZE = 2
+
+# Intervalo con el que las etapas bloqueadas comprueban si deben detenerse
+STAGE_POLL_SECONDS = 0.1
+
+
+class PipelineFileProcessor(ParallelFileProcessor):
+    """
+    Procesamiento por etapas dentro del proceso: un hilo lector, un hilo transformador
+    y db_writers hilos de carga unidos por colas acotadas. Mientras se carga un archivo
+    ya se lee y transforma el siguiente, y una cola llena detiene a la etapa anterior.
+    El registro y los eventos se actualizan solo desde el hilo que llama a process_files.
+    """
+
+    def __init__(self, config, registry, file_processor, queue_size=None, db_writers=None):
+        """
+        Inicializa el procesador
+
+        Args:
+            config: Configuración
+            registry: Registro de procesamiento
+            file_processor: FileProcessor que registra el inicio, los errores y el resultado
+            queue_size: Archivos por cola entre etapas ([ETL] pipeline_queue_size si es None)
+            db_writers: Hilos de carga ([ETL] db_writers si es None)
+        """
+        super().__init__(config, registry, file_processor, workers=1, db_writers=db_writers)
+        self.queue_size = max(1, queue_size or get_config_int(config, 'ETL', 'pipeline_queue_size',
+                                                              DEFAULT_PIPELINE_QUEUE_SIZE))
+        self.data_transformer = DataTransformer(config)
+        self._stop = threading.Event()
+
+    def process_files(self, files, force_reprocess, data_loader, on_file_started=None, on_file_finished=None,
+                      on_stage_update=None):
+        """
+        Procesa los archivos por etapas. Cada archivo pasa por las colas read, transform
+        y load; el hilo principal registra el inicio, los errores y el resultado.
+
+        Args:
+            files: Lista de rutas de archivos
+            force_reprocess: Si True, ignora el registro y procesa los archivos
+            data_loader: Cargador del primer hilo de carga; los demás abren su propia conexión
+            on_file_started: Función (file_path, índice) llamada al empezar cada archivo
+            on_file_finished: Función (file_path, éxito, segundos) llamada al terminar cada archivo
+            on_stage_update: Función (dict) llamada cuando una etapa termina un archivo, con
+                             los archivos en cola por etapa y los tiempos acumulados
+
+        Returns:
+            tuple: (archivos exitosos, lista de archivos fallidos)
+        """
+        total_files = len(files)
+        logger.info(f"⚙️ Procesamiento por etapas: colas de {self.queue_size} archivos, "
+                    f"{self.db_writers} conexiones de carga")
+        self._reset_run(('read', 'transform', 'load'))
+
+        queues = {stage: queue.Queue(self.queue_size) for stage in ('read', 'transform', 'load')}
+        results = queue.Queue()
+
+        def queue_depths():
+            return {stage: stage_queue.qsize() for stage, stage_queue in queues.items()}
+
+        self._stop.clear()
+        threads = [
+            threading.Thread(target=self._read_stage, args=(queues['read'], queues['transform'], results),
+                             name="sonel-reader", daemon=True),
+            threading.Thread(target=self._transform_stage, args=(queues['transform'], results),
+                             name="sonel-transformer", daemon=True)
+        ]
+        threads += [threading.Thread(target=self._load_stage, args=(queues['load'], results, data_loader),
+                                     name=f"sonel-writer-{number}", daemon=True)
+                    for number in range(self.db_writers)]
+        for thread in threads:
+            thread.start()
+
+        pending = deque(enumerate(files, start=1))
+        outstanding = 0
+        try:
+            while pending or outstanding:
+                # Solo el hilo principal agrega a la cola de lectura: si no está llena, no bloquea
+                while pending and not queues['read'].full():
+                    index, file_path = pending.popleft()
+                    context = self._start_file(index, total_files, file_path, force_reprocess,
+                                               on_file_started, on_file_finished)
+                    if context is not None:
+                        queues['read'].put_nowait(context)
+                        outstanding += 1
+                if not outstanding:
+                    continue
+
+                stage, context, result = results.get()
+                self._record_stage(stage, context['file_path'], result, queue_depths(), on_stage_update)
+                if stage == 'read':
+                    continue
+                if stage == 'transform' and self._accept_parsed(result, context):
+                    if self._put(queues['load'], context):
+                        continue
+                outstanding -= 1
+                success = stage == 'load' and self._finalize(result, context)
+                self._finish_file(context, success, on_file_finished)
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            self._close_writers()
+
+        self._log_stage_stats()
+        return self._success_count, self._failed_files
+
+    def _get(self, stage_queue):
+        """Toma el siguiente elemento de la cola; None si el procesamiento se detuvo"""
+        while not self._stop.is_set():
+            try:
+                return stage_queue.get(timeout=STAGE_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return None
+
+    def _put(self, stage_queue, item):
+        """Agrega a la cola esperando mientras esté llena; False si el procesamiento se detuvo"""
+        while not self._stop.is_set():
+            try:
+                stage_queue.put(item, timeout=STAGE_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read_stage(self, read_queue, transform_queue, results):
+        """Hilo lector: lee cada archivo con su parser"""
+        while True:
+            context = self._get(read_queue)
+            if context is None:
+                return
+            started = time.perf_counter()
+            parsed = {'transformed': None, 'extracted': False, 'parse_info': None, 'error': None}
+            frame = None
+            try:
+                frame = FileProcessor.read_file(context['file_path'], self.config, self.file_processor.layout_cache)
+            except Exception as e:
+                parsed['error'] = f"Error extrayendo datos de {context['file_path']}: {e}"
+            results.put(('read', context, {'seconds': time.perf_counter() - started}))
+            if not self._put(transform_queue, (context, frame, parsed)):
+                return
+
+    def _transform_stage(self, transform_queue, results):
+        """Hilo transformador: convierte cada archivo leído al formato de carga"""
+        while True:
+            item = self._get(transform_queue)
+            if item is None:
+                return
+            context, frame, parsed = item
+            started = time.perf_counter()
+            if frame is not None:
+                parsed['extracted'] = True
+                parsed['parse_info'] = frame.attrs.get('parse_info')
+                try:
+                    parsed['transformed'] = self.data_transformer.transform_data(frame)
+                except Exception as e:
+                    parsed['exception'] = e
+            del frame, item
+            parsed['seconds'] = time.perf_counter() - started
+            results.put(('transform', context, parsed))
+
+    def _load_stage(self, load_queue, results, data_loader):
+        """Hilo de carga: inserta cada archivo transformado con la conexión del hilo"""
+        while True:
+            context = self._get(load_queue)
+            if context is None:
+                return
+            try:
+                loaded = self._load(data_loader, context)
+            except Exception as e:
+                loaded = {'exception': e, 'seconds': 0.0}
+            results.put(('load', context, loaded))
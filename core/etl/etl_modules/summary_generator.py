@@ -23,6 +23,11 @@ class SummaryGenerator:
         logger.info(f"Procesados exitosamente: {stats['successful']}")
         logger.info(f"Con errores: {stats['errors']}")
         logger.info(f"Pendientes: {stats['pending']}")
+
+        layout_stats = self.registry.get_layout_cache_stats()
+        if layout_stats:
+            logger.info(f"Caché de formatos CSV: {layout_stats.get('hits', 0)} aciertos, "
+                        f"{layout_stats.get('misses', 0)} fallos, {layout_stats.get('known_layouts', 0)} formatos conocidos")
         
         # Mostrar archivos con errores recientes si los hay
         if stats['errors'] > 0:
@@ -266,7 +271,8 @@ class SummaryGenerator:
                 "processing_statistics": stats,
                 "files_processed": [],
                 "failed_files_count": len(error_files),
-                "failed_files_list": [os.path.basename(f) for f in error_files]
+                "failed_files_list": [os.path.basename(f) for f in error_files],
+                "layout_cache": self.registry.get_layout_cache_stats()
             }
             
             # Agregar detalle de archivos si se solicita
@@ -43,7 +43,7 @@ class SonelETL:
     def _initialize_components(self):
         """Inicializa los componentes especializados del ETL"""
         self.data_extractor = DataExtractor(self.config, self.registry_file)
-        self.data_transformer = DataTransformer()
+        self.data_transformer = DataTransformer(self.config)
         self.data_loader = DataLoader(self.db_connection)
         self.file_processor = FileProcessor(self.config, self.registry)
         self.directory_processor = DirectoryProcessor(self.config, self.registry, self.file_processor)
@@ -72,7 +72,9 @@ class SonelETL:
         # Si se proporciona un archivo específico, procesarlo directamente
         if file_path:
             logger.info(f"Procesando archivo específico: {file_path}")
-            return self.process_file(file_path, force_reprocess=force_reprocess)
+            result = self.process_file(file_path, force_reprocess=force_reprocess)
+            self.file_processor.flush_layout_cache()
+            return result
             
         # Si se proporciona directorio, procesarlo directamente
         if directory or extraction_method == 'file':
@@ -78,70 +78,49 @@ class SonelETLEnhanced(SonelETL):
                 })
             return True
         
+        # Resolver todos los códigos de cliente con pocas consultas antes de cargar
+        self.data_loader.prefetch_client_codes(files)
+        
         # Procesar cada archivo
         total_files = len(files)
         success_count = 0
         
-        for i, file_path in enumerate(files, start=1):
-            filename = os.path.basename(file_path)
-            
-            # Emitir evento de inicio de archivo
-            if self.callback_manager:
-                self.callback_manager.emit_event(ProcessingEventType.FILE_STARTED, {
-                    'filename': filename,
-                    'file_path': file_path,
-                    'current_index': i,
-                    'total_files': total_files
-                })
+        concurrent_processor = self.directory_processor.concurrent_processor
+        stage_stats = None
+        if concurrent_processor is not None and total_files > 1:
+            # Los archivos terminan en cualquier orden: el progreso cuenta los terminados
+            processed = 0
             
-            # Procesar archivo
-            file_start_time = time.time()
-            success = self.process_file(file_path, force_reprocess=force_reprocess)
-            processing_time = time.time() - file_start_time
+            def on_file_started(file_path, index):
+                self._emit_file_started(file_path, index, total_files)
             
-            if success:
-                success_count += 1
-                # Emitir evento de éxito
-                if self.callback_manager:
-                    # Obtener información adicional del archivo
-                    file_data = self.registry.registry_data.get("files", {}).get(file_path, {})
-                    additional_info = file_data.get("additional_info", {})
-                    
-                    self.callback_manager.emit_event(ProcessingEventType.FILE_COMPLETED, {
-                        'filename': filename,
-                        'file_path': file_path,
-                        'processing_time': processing_time,
-                        'records_processed': additional_info.get('rows_processed', 0),
-                        'current_index': i,
-                        'total_files': total_files,
-                        'success_count': success_count
-                    })
-            else:
-                # Emitir evento de error
-                if self.callback_manager:
-                    file_data = self.registry.registry_data.get("files", {}).get(file_path, {})
-                    error_message = file_data.get("error_message", "Error desconocido")
-                    
-                    self.callback_manager.emit_event(ProcessingEventType.FILE_FAILED, {
-                        'filename': filename,
-                        'file_path': file_path,
-                        'processing_time': processing_time,
-                        'error_message': error_message,
-                        'current_index': i,
-                        'total_files': total_files
-                    })
+            def on_file_finished(file_path, success, processing_time):
+                nonlocal processed, success_count
+                processed += 1
+                if success:
+                    success_count += 1
+                self._emit_file_finished(file_path, success, processing_time, processed, total_files, success_count)
             
-            # Emitir evento de progreso
-            if self.callback_manager:
-                progress_percentage = (i / total_files) * 100
-                self.callback_manager.emit_event(ProcessingEventType.PROGRESS_UPDATE, {
-                    'processed_files': i,
-                    'total_files': total_files,
-                    'success_count': success_count,
-                    'failed_count': i - success_count,
-                    'progress_percentage': progress_percentage
-                })
+            concurrent_processor.process_files(files, force_reprocess, self.data_loader,
+                                               on_file_started=on_file_started, on_file_finished=on_file_finished,
+                                               on_stage_update=self._emit_stage_update)
+            stage_stats = concurrent_processor.stage_stats
+        else:
+            for i, file_path in enumerate(files, start=1):
+                # Emitir evento de inicio de archivo
+                self._emit_file_started(file_path, i, total_files)
+                
+                # Procesar archivo
+                file_start_time = time.time()
+                success = self.process_file(file_path, force_reprocess=force_reprocess)
+                processing_time = time.time() - file_start_time
+                
+                if success:
+                    success_count += 1
+                self._emit_file_finished(file_path, success, processing_time, i, total_files, success_count)
         
+        self.file_processor.flush_layout_cache()
+
         # Evento de proceso completado
         total_time = (datetime.now() - start_time).total_seconds()
         if self.callback_manager:
@@ -149,7 +128,71 @@ class SonelETLEnhanced(SonelETL):
                 'files_processed': total_files,
                 'success_count': success_count,
                 'failed_count': total_files - success_count,
-                'total_time': total_time
+                'total_time': total_time,
+                'layout_cache': self.registry.get_layout_cache_stats(),
+                'stages': stage_stats
             })
         
         return success_count > 0
+    
+    def _emit_file_started(self, file_path, index, total_files):
+        """Emite el evento de inicio de archivo"""
+        if self.callback_manager:
+            self.callback_manager.emit_event(ProcessingEventType.FILE_STARTED, {
+                'filename': os.path.basename(file_path),
+                'file_path': file_path,
+                'current_index': index,
+                'total_files': total_files
+            })
+    
+    def _emit_stage_update(self, stage_update):
+        """Emite el tiempo de una etapa y los archivos en cola por etapa"""
+        if self.callback_manager:
+            self.callback_manager.emit_event(ProcessingEventType.STAGE_UPDATE, {
+                'filename': os.path.basename(stage_update['file_path']),
+                **stage_update
+            })
+    
+    def _emit_file_finished(self, file_path, success, processing_time, index, total_files, success_count):
+        """Emite el evento de éxito o error del archivo y el de progreso"""
+        if not self.callback_manager:
+            return
+        filename = os.path.basename(file_path)
+        
+        if success:
+            # Obtener información adicional del archivo
+            file_data = self.registry.registry_data.get("files", {}).get(file_path, {})
+            additional_info = file_data.get("additional_info", {})
+            
+            self.callback_manager.emit_event(ProcessingEventType.FILE_COMPLETED, {
+                'filename': filename,
+                'file_path': file_path,
+                'processing_time': processing_time,
+                'records_processed': additional_info.get('rows_processed', 0),
+                'current_index': index,
+                'total_files': total_files,
+                'success_count': success_count
+            })
+        else:
+            # Emitir evento de error
+            file_data = self.registry.registry_data.get("files", {}).get(file_path, {})
+            error_message = file_data.get("error_message", "Error desconocido")
+            
+            self.callback_manager.emit_event(ProcessingEventType.FILE_FAILED, {
+                'filename': filename,
+                'file_path': file_path,
+                'processing_time': processing_time,
+                'error_message': error_message,
+                'current_index': index,
+                'total_files': total_files
+            })
+        
+        # Emitir evento de progreso
+        progress_percentage = (index / total_files) * 100
+        self.callback_manager.emit_event(ProcessingEventType.PROGRESS_UPDATE, {
+            'processed_files': index,
+            'total_files': total_files,
+            'success_count': success_count,
+            'failed_count': index - success_count,
+            'progress_percentage': progress_percentage
+        })
@@ -2,13 +2,12 @@
 
 import os
 import glob
-import pandas as pd
 from config.logger import logger
 from core.parser.csv_parser import CSVParser
 from core.extractors.base import BaseExtractor
 from core.parser.excel_parser import ExcelParser
+from core.parser.xml_parser import XMLParser
 from config.settings import FILE_SEARCH_PATTERNS
-from core.utils.validators import validate_voltage_columns
 from core.utils.processing_registry import ProcessingRegistry
 
 class FileExtractor(BaseExtractor):
@@ -68,25 +67,20 @@ class FileExtractor(BaseExtractor):
         # Determinar el parser adecuado según la extensión
         try:
             if file_ext == '.csv':
-                df = CSVParser.parse(file_path)
+                df = CSVParser.parse(file_path, self.config)
                 if df is not None:
                     return df
                     
             elif file_ext == '.xlsx':
-                df = ExcelParser.parse(file_path)
+                df = ExcelParser.parse(file_path, self.config)
                 if df is not None:
                     return df
                 
             elif file_ext == '.xml':
-                # La lectura de XML depende de la estructura exacta
-                logger.warning("Extracción de archivos XML no implementada completamente")
-                try:
-                    df = pd.read_xml(file_path)
-                    valid, _ = validate_voltage_columns(df)
-                    if valid:
-                        return df
-                except Exception as e:
-                    logger.error(f"Error al procesar archivo XML: {e}")
+                # Lectura incremental (iterparse) con las mismas columnas canónicas
+                df = XMLParser.parse(file_path, self.config)
+                if df is not None:
+                    return df
                 
             elif file_ext == '.mdb':
                 # Para MDB se requiere pyodbc y conexión ODBC
@@ -0,0 +1,105 @@
+#sonel_extractor/parser/arrow_reader.py
+import os
+from config.logger import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pa_csv = None
+    PYARROW_AVAILABLE = False
+
+# Motores de lectura aceptados en [PARSER] engine
+PARSER_ENGINES = ('c', 'pyarrow', 'auto')
+
+# Tamaño mínimo (MB) a partir del cual engine = auto usa PyArrow
+DEFAULT_PYARROW_MIN_MB = 100
+
+# Codificaciones que PyArrow lee sin transcodificar
+ARROW_NATIVE_ENCODINGS = {'utf-8': 'utf8', 'utf-8-sig': 'utf8'}
+
+
+class ArrowCSVReader:
+    """Lectura de CSV con el tokenizador multihilo de PyArrow"""
+
+    @staticmethod
+    def select_engine(file_path, engine='c', min_mb=DEFAULT_PYARROW_MIN_MB):
+        """
+        Decide el motor de lectura para un archivo
+
+        Args:
+            file_path: Ruta al archivo CSV
+            engine: Motor configurado (c, pyarrow o auto)
+            min_mb: Tamaño mínimo para que auto elija PyArrow
+
+        Returns:
+            tuple: (motor elegido, motivo si no se usa PyArrow o None)
+        """
+        if engine not in PARSER_ENGINES:
+            logger.warning(f"⚠️ Motor de lectura '{engine}' no soportado, se usa el motor C")
+            return 'c', f"motor '{engine}' no soportado"
+        if engine == 'c':
+            return 'c', None
+        if not PYARROW_AVAILABLE:
+            return 'c', "pyarrow no instalado"
+        if engine == 'auto':
+            try:
+                size_mb = os.path.getsize(file_path) / (1024 * 1024)
+            except OSError:
+                size_mb = 0
+            if size_mb < min_mb:
+                return 'c', None
+        return 'pyarrow', None
+
+    @staticmethod
+    def read(file_path, trace, read_plan, float_dtype='float64'):
+        """
+        Lee las columnas del plan con PyArrow. Las columnas se nombran por posición
+        porque el encabezado ya se conoce; los campos de tiempo quedan como texto y
+        las mediciones como flotantes.
+
+        Args:
+            file_path: Ruta al archivo CSV
+            trace: Traza de detección (encoding, separator, decimal, header_line)
+            read_plan: Plan con usecols, text_columns, names y width
+            float_dtype: float64 o float32 para las mediciones
+
+        Returns:
+            DataFrame con columnas de NumPy (los textos como object)
+
+        Raises:
+            pyarrow.ArrowInvalid: si el archivo no encaja en el plan (filas irregulares,
+                                  mediciones no numéricas); el llamador recurre al motor C
+        """
+        width = read_plan['width']
+        usecols = list(read_plan['usecols'])
+        text_columns = set(read_plan['text_columns'])
+        positional = [f"c{index}" for index in range(width)]
+        measurement_type = pa.float32() if float_dtype == 'float32' else pa.float64()
+
+        encoding = trace['encoding'] or 'utf-8'
+        read_options = pa_csv.ReadOptions(
+            skip_rows=(trace['header_line'] or 0) + 1,
+            column_names=positional,
+            encoding=ARROW_NATIVE_ENCODINGS.get(encoding, encoding),
+            use_threads=True
+        )
+        parse_options = pa_csv.ParseOptions(delimiter=trace['separator'])
+        convert_options = pa_csv.ConvertOptions(
+            include_columns=[positional[index] for index in usecols],
+            column_types={
+                positional[index]: (pa.string() if index in text_columns else measurement_type)
+                for index in usecols
+            },
+            decimal_point=trace['decimal'] or '.',
+            strings_can_be_null=True
+        )
+
+        trace['reads'] = trace.get('reads', 0) + 1
+        table = pa_csv.read_csv(file_path, read_options=read_options,
+                                parse_options=parse_options, convert_options=convert_options)
+        df = table.to_pandas(use_threads=True)
+        df.columns = list(read_plan['names'])
+        return df
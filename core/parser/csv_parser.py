@@ -3,58 +3,62 @@ import re
 import pandas as pd
 from config.logger import logger
 from config.settings import SUPPORTED_ENCODINGS
+from core.parser.csv_sniffer import CSVSniffer
+from core.parser.layout_cache import LayoutCache
+from core.parser.arrow_reader import ArrowCSVReader, DEFAULT_PYARROW_MIN_MB
 from core.utils.validators import validate_voltage_columns
+from core.utils.column_matcher import column_matcher
+from core.utils.config_options import get_config_bool, get_config_option, get_config_float
+
+# Campos del mapeo de columnas que se leen como texto; el resto son mediciones numéricas
+TEXT_FIELDS = ('time', 'date', 'time_utc', 'time_utc5', 'utc_zone')
+
+# Columnas de fecha que el transformador puede combinar con la hora aunque no estén en el mapeo
+DATE_COLUMN_PATTERN = re.compile(r'(?i)fecha|date')
+
+FLOAT_DTYPES = ('float64', 'float32')
 
 class CSVParser:
     """Clase para procesar archivos CSV con datos de voltaje"""
 
     @staticmethod
-    def parse(file_path):
+    def parse(file_path, config=None, layout_cache=None):
         """
-        Procesa un archivo CSV con diferentes estructuras posibles
+        Procesa un archivo CSV con diferentes estructuras posibles. El formato se
+        detecta leyendo una sola vez un prefijo acotado y el archivo se lee completo
+        una única vez; la traza de detección queda en df.attrs['parse_info'].
         
         Args:
             file_path: Ruta al archivo CSV
+            config: Configuración (opcional); [PARSER] legacy_fallback = true reactiva
+                    la búsqueda por prueba y error si la detección falla y
+                    [PARSER] prune_columns / float_dtype / engine controlan la lectura tipada
+            layout_cache: LayoutCache con formatos conocidos (opcional); si el encabezado
+                          es conocido se omiten la detección y la búsqueda de columnas
             
         Returns:
             DataFrame con los datos o None si hay errores
         """
         try:
-            # Probar diferentes combinaciones de separador y encoding
-            for sep in [';', ',', '\t', '|']:
-                for encoding in ['utf-8', 'utf-8-sig', 'latin1', 'iso-8859-1', 'cp1252', 'utf-16', 'utf-16le', 'utf-16be', 'windows-1252', 'iso-8859-15']:
-                    try:
-                        df = pd.read_csv(file_path, sep=sep, encoding=encoding)
-                        
-                        # Verificar si las primeras filas contienen datos numéricos en lugar de encabezados
-                        if df.shape[1] > 0 and all(isinstance(col, (int, float)) for col in df.columns):
-                            # Posible archivo sin encabezados o con encabezados en la primera fila
-                            df = pd.read_csv(file_path, sep=sep, encoding=encoding, header=None)
-                            # Intentar usar primera fila como encabezados
-                            if not df.empty:
-                                df.columns = df.iloc[0].astype(str)
-                                df = df.iloc[1:].reset_index(drop=True)
-                        
-                        # Convertir todos los nombres de columnas a string para evitar problemas
-                        df.columns = df.columns.astype(str)
+            df = None
+            raw_lines = LayoutCache.read_header_lines(file_path) if layout_cache is not None else None
+            if raw_lines is not None:
+                df = CSVParser._parse_cached(file_path, layout_cache, raw_lines, config)
+            if df is None:
+                df = CSVParser._parse_sniffed(file_path, layout_cache, raw_lines, config)
+            if df is not None:
+                return df
 
-                        # Limpiar problemas de codificación y nombres de columnas
-                        df = CSVParser._detect_and_fix_encoding_issues(df)
-                        df = CSVParser._clean_column_names(df)
-                        
-                        # Imprimir las columnas para debug
-                        valid, column_map = validate_voltage_columns(df)
-                        if valid:
-                            logger.info(f"Datos extraídos correctamente de {file_path}")
-                            return df
-                            
-                    except Exception as e:
-                        logger.debug(f"Error con sep='{sep}', encoding='{encoding}': {e}")
-                        continue
-            
-            # Si no funciona, probar métodos alternativos
-            df = CSVParser._try_alternative_methods(file_path)
+            if not get_config_bool(config, 'PARSER', 'legacy_fallback', False):
+                logger.error(f"No se reconoció el formato del archivo CSV: {file_path}")
+                return None
+
+            logger.warning(f"⚠️ Formato no reconocido por el detector, usando búsqueda por prueba y error: {file_path}")
+            df = CSVParser._try_legacy_combinations(file_path)
+            if df is None:
+                df = CSVParser._try_alternative_methods(file_path)
             if df is not None:
+                df.attrs['parse_info'] = {'method': 'legacy'}
                 return df
                 
         except Exception as e:
@@ -62,6 +66,395 @@ class CSVParser:
         
         logger.error(f"No se pudo extraer datos del archivo CSV: {file_path}")
         return None
+
+    @staticmethod
+    def iter_chunks(file_path, config=None, layout_cache=None, chunk_rows=100000):
+        """
+        Lectura por bloques de N filas con memoria acotada. El formato y las columnas
+        se resuelven antes de devolver el iterador (caché de formatos o detector),
+        así que un archivo no reconocido se informa sin leer datos.
+
+        Args:
+            file_path: Ruta al archivo CSV
+            config: Configuración (opcional), igual que en parse
+            layout_cache: LayoutCache con formatos conocidos (opcional)
+            chunk_rows: Filas por bloque
+
+        Returns:
+            Iterador de DataFrames (con column_map y parse_info en attrs) o None si
+            no se reconoció el formato
+        """
+        try:
+            layout = CSVParser._resolve_stream_layout(file_path, config, layout_cache)
+        except Exception as e:
+            logger.error(f"Error al detectar el formato de {file_path}: {e}")
+            return None
+        if layout is None:
+            logger.error(f"No se reconoció el formato del archivo CSV para lectura por bloques: {file_path}")
+            return None
+
+        trace, read_plan, column_map = layout
+        trace['stream_chunk_rows'] = int(chunk_rows)
+        trace['chunks'] = 0
+        return CSVParser._stream_chunks(file_path, trace, read_plan, column_map, int(chunk_rows), config)
+
+    @staticmethod
+    def _resolve_stream_layout(file_path, config=None, layout_cache=None):
+        """
+        Resuelve formato, plan de lectura y mapeo de columnas solo a partir del encabezado
+
+        Returns:
+            tuple: (traza, plan de lectura o None, mapeo de columnas) o None si no se reconoció
+        """
+        raw_lines = None
+        if layout_cache is not None:
+            raw_lines = LayoutCache.read_header_lines(file_path)
+            signature, layout = layout_cache.lookup(raw_lines)
+            if layout is not None and (layout.get('read_plan') or {}).get('names'):
+                trace = {
+                    'method': 'layout_cache',
+                    'layout_signature': signature,
+                    'encoding': layout['encoding'],
+                    'separator': layout['separator'],
+                    'decimal': layout['decimal'],
+                    'header_line': layout['skiprows']
+                }
+                return trace, layout['read_plan'], dict(layout['column_map'])
+
+        trace = CSVSniffer.sniff(file_path, header_validator=CSVParser._is_valid_header)
+        if trace['separator'] is None or not trace['header_validated']:
+            return None
+
+        header = CSVParser._normalize_column_names(trace.pop('columns'))
+        valid, column_map = column_matcher.match(header)
+        if not valid:
+            return None
+
+        read_plan = CSVParser._build_read_plan(header, column_map)
+        if read_plan is None:
+            # Nombres repetidos: se leen todas las columnas por posición
+            read_plan = {'usecols': None, 'text_columns': [], 'names': header, 'width': len(header)}
+        elif layout_cache is not None:
+            trace['layout_signature'] = layout_cache.store(raw_lines, trace, column_map, read_plan)
+        return trace, read_plan, column_map
+
+    @staticmethod
+    def _stream_chunks(file_path, trace, read_plan, column_map, chunk_rows, config=None):
+        """
+        Genera los bloques del archivo. Si un bloque revela mediciones no numéricas o
+        bytes que no son UTF-8, la lectura se reanuda desde la primera fila no
+        entregada con tipos de texto o con cp1252.
+
+        Yields:
+            DataFrame con hasta chunk_rows filas
+        """
+        float_dtype = get_config_option(config, 'PARSER', 'float_dtype', 'float64')
+        if float_dtype not in FLOAT_DTYPES:
+            float_dtype = 'float64'
+
+        usecols = read_plan['usecols']
+        text_columns = set(read_plan['text_columns'])
+        if usecols is None:
+            dtypes = text_dtypes = None
+        else:
+            text_dtypes = {index: object for index in usecols}
+            dtypes = {index: (object if index in text_columns else float_dtype) for index in usecols}
+        trace['float_dtype'] = float_dtype if dtypes is not None else None
+
+        header_line = trace['header_line'] or 0
+        delivered = 0
+        while True:
+            if delivered:
+                # Saltar el preámbulo y las filas ya entregadas; el encabezado se conserva
+                skiprows = lambda i, h=header_line, n=delivered: i < h or h < i <= h + n
+            else:
+                skiprows = header_line
+            reader = CSVSniffer.read(file_path, trace, skiprows=skiprows, usecols=usecols,
+                                     dtype=dtypes, chunksize=chunk_rows)
+            try:
+                with reader:
+                    for chunk in reader:
+                        chunk.columns = list(read_plan['names'])
+                        chunk.attrs['column_map'] = dict(column_map)
+                        chunk.attrs['parse_info'] = trace
+                        delivered += len(chunk)
+                        trace['chunks'] += 1
+                        trace['rows'] = delivered
+                        yield chunk
+                return
+            except UnicodeDecodeError:
+                if trace['encoding'] != 'utf-8':
+                    raise
+                logger.debug(f"UTF-8 inválido en {file_path} tras {delivered} filas, se continúa con cp1252")
+                trace['encoding'] = 'cp1252'
+            except ValueError as e:
+                if dtypes is None or dtypes == text_dtypes:
+                    raise
+                logger.debug(f"Mediciones no numéricas en {file_path} tras {delivered} filas, se leen como texto: {e}")
+                dtypes = text_dtypes
+                trace['float_dtype'] = None
+
+    @staticmethod
+    def _parse_cached(file_path, layout_cache, raw_lines, config=None):
+        """
+        Lee el archivo con un formato guardado en la caché, sin detección ni búsqueda de columnas
+        
+        Args:
+            file_path: Ruta al archivo CSV
+            layout_cache: LayoutCache con formatos conocidos
+            raw_lines: Primeras líneas del archivo en bytes
+            config: Configuración (opcional) para la lectura tipada
+            
+        Returns:
+            DataFrame con los datos o None si el encabezado no está en la caché
+        """
+        signature, layout = layout_cache.lookup(raw_lines)
+        if layout is None:
+            return None
+
+        trace = {
+            'method': 'layout_cache',
+            'layout_signature': signature,
+            'encoding': layout['encoding'],
+            'separator': layout['separator'],
+            'decimal': layout['decimal'],
+            'header_line': layout['skiprows']
+        }
+        read_plan = layout.get('read_plan')
+        if read_plan and get_config_bool(config, 'PARSER', 'prune_columns', True):
+            df = CSVParser._read_typed(file_path, trace, read_plan, config)
+        else:
+            df = CSVSniffer.read(file_path, trace)
+        df.columns = CSVParser._normalize_column_names(df.columns)
+
+        column_map = layout['column_map']
+        if not all(col in df.columns for col in column_map.values()):
+            logger.warning(f"⚠️ Formato en caché no coincide con {file_path}, se vuelve a detectar")
+            layout_cache.invalidate(signature)
+            return None
+
+        df.attrs['column_map'] = dict(column_map)
+        trace['column_count'] = len(df.columns)
+        df.attrs['parse_info'] = trace
+        logger.info(f"Datos extraídos de {file_path} con formato en caché {signature[:12]}")
+        return df
+
+    @staticmethod
+    def _parse_sniffed(file_path, layout_cache=None, raw_lines=None, config=None):
+        """
+        Detecta el formato con CSVSniffer y lee el archivo completo una sola vez. Si el
+        encabezado detectado ya resuelve las columnas necesarias, solo se leen esas
+        columnas y con tipos explícitos.
+        
+        Args:
+            file_path: Ruta al archivo CSV
+            layout_cache: LayoutCache donde guardar el formato detectado (opcional)
+            raw_lines: Primeras líneas del archivo en bytes (requeridas con layout_cache)
+            config: Configuración (opcional) para la lectura tipada
+            
+        Returns:
+            DataFrame con los datos o None si no se reconoció el formato
+        """
+        trace = CSVSniffer.sniff(file_path, header_validator=CSVParser._is_valid_header)
+        if trace['separator'] is None or trace['header_line'] is None:
+            logger.debug(f"Detección incompleta para {file_path}: {trace}")
+            return None
+
+        read_plan = None
+        if trace['header_validated'] and get_config_bool(config, 'PARSER', 'prune_columns', True):
+            header = CSVParser._normalize_column_names(trace['columns'])
+            _, header_map = column_matcher.match(header)
+            read_plan = CSVParser._build_read_plan(header, header_map)
+
+        if read_plan is not None:
+            df = CSVParser._read_typed(file_path, trace, read_plan, config)
+        else:
+            df = CSVSniffer.read(file_path, trace)
+        df.columns = CSVParser._normalize_column_names(df.columns)
+
+        valid, column_map = validate_voltage_columns(df)
+        if not valid:
+            logger.debug(f"Columnas no válidas tras la detección en {file_path}")
+            return None
+
+        parse_info = {key: value for key, value in trace.items() if key != 'columns'}
+        parse_info['column_count'] = len(df.columns)
+        if layout_cache is not None:
+            parse_info['layout_signature'] = layout_cache.store(raw_lines, trace, column_map, read_plan)
+        df.attrs['column_map'] = dict(column_map)
+        df.attrs['parse_info'] = parse_info
+        logger.info(f"Datos extraídos correctamente de {file_path} "
+                    f"(sep='{trace['separator']}', encoding={trace['encoding']}, "
+                    f"encabezado en línea {trace['header_line'] + 1}, lecturas: {trace['reads']})")
+        return df
+
+    @staticmethod
+    def _build_read_plan(header, column_map):
+        """
+        Calcula las columnas a leer y su tipo a partir del encabezado normalizado
+        
+        Args:
+            header: Nombres de columnas normalizados del encabezado completo
+            column_map: Mapeo de columnas estándar resuelto sobre el encabezado
+            
+        Returns:
+            dict: {'usecols': posiciones, 'text_columns': posiciones leídas como texto,
+                   'names': nombres de las columnas leídas, 'width': columnas del encabezado}
+                  o None si el encabezado tiene nombres repetidos o no hay columnas
+        """
+        if not column_map or len(set(header)) != len(header):
+            return None
+
+        position = {name: index for index, name in enumerate(header)}
+        text_columns = {position[col] for key, col in column_map.items()
+                        if key in TEXT_FIELDS and col in position}
+        text_columns.update(index for index, name in enumerate(header) if DATE_COLUMN_PATTERN.search(name))
+        usecols = {position[col] for col in column_map.values() if col in position} | text_columns
+
+        usecols = sorted(usecols)
+        return {
+            'usecols': usecols,
+            'text_columns': sorted(text_columns),
+            'names': [header[index] for index in usecols],
+            'width': len(header)
+        }
+
+    @staticmethod
+    def _read_typed(file_path, trace, read_plan, config=None):
+        """
+        Lectura única de las columnas del plan con tipos explícitos: texto para los
+        campos de tiempo y flotante para las mediciones. Si alguna medición trae
+        valores no numéricos se repite la lectura dejándolas como texto para que el
+        transformador las limpie. Con [PARSER] engine = pyarrow (o auto en archivos
+        grandes) se usa el tokenizador multihilo de PyArrow y, si el archivo no encaja,
+        se vuelve al motor C de pandas.
+        
+        Args:
+            file_path: Ruta al archivo CSV
+            trace: Traza de detección (encoding, separator, decimal, header_line)
+            read_plan: Plan devuelto por _build_read_plan
+            config: Configuración (opcional); [PARSER] float_dtype = float64 | float32,
+                    engine = c | pyarrow | auto y pyarrow_min_mb
+            
+        Returns:
+            DataFrame con las columnas necesarias
+        """
+        float_dtype = get_config_option(config, 'PARSER', 'float_dtype', 'float64')
+        if float_dtype not in FLOAT_DTYPES:
+            logger.warning(f"⚠️ float_dtype '{float_dtype}' no soportado, se usa float64")
+            float_dtype = 'float64'
+
+        usecols = list(read_plan['usecols'])
+        text_columns = set(read_plan['text_columns'])
+        text_dtypes = {index: object for index in text_columns}
+        dtypes = {index: (object if index in text_columns else float_dtype) for index in usecols}
+
+        trace['usecols'] = len(usecols)
+        trace['float_dtype'] = float_dtype
+
+        engine, reason = ArrowCSVReader.select_engine(
+            file_path,
+            get_config_option(config, 'PARSER', 'engine', 'c').lower(),
+            get_config_float(config, 'PARSER', 'pyarrow_min_mb', DEFAULT_PYARROW_MIN_MB)
+        )
+        if engine == 'pyarrow' and 'width' not in read_plan:
+            engine, reason = 'c', "plan de lectura sin ancho de encabezado"
+        if engine == 'pyarrow':
+            try:
+                df = ArrowCSVReader.read(file_path, trace, read_plan, float_dtype)
+                trace['engine'] = 'pyarrow'
+                return df
+            except Exception as e:
+                reason = str(e).splitlines()[0] if str(e) else type(e).__name__
+                logger.warning(f"⚠️ PyArrow no pudo leer {file_path}, se usa el motor C: {reason}")
+
+        trace['engine'] = 'c'
+        if reason:
+            trace['engine_fallback'] = reason
+        try:
+            return CSVSniffer.read(file_path, trace, usecols=usecols, dtype=dtypes)
+        except (ValueError, TypeError) as e:
+            logger.debug(f"Mediciones no numéricas en {file_path}, se leen como texto: {e}")
+            trace['float_dtype'] = None
+            return CSVSniffer.read(file_path, trace, usecols=usecols, dtype=text_dtypes)
+
+    @staticmethod
+    def _normalize_column_names(columns):
+        """
+        Aplica la corrección de codificación y la limpieza de nombres sin copiar los datos
+        
+        Args:
+            columns: Nombres de columnas originales
+            
+        Returns:
+            list: Nombres de columnas normalizados
+        """
+        names = [str(col) for col in columns]
+        # Una fila vacía: los limpiadores no tocan DataFrames sin filas
+        header = pd.DataFrame([[None] * len(names)], columns=names)
+        header = CSVParser._detect_and_fix_encoding_issues(header)
+        header = CSVParser._clean_column_names(header)
+        return list(header.columns)
+
+    @staticmethod
+    def _is_valid_header(columns):
+        """
+        Indica si una fila candidata contiene las columnas mínimas de una exportación Sonel
+        
+        Args:
+            columns: Valores de la fila candidata
+            
+        Returns:
+            bool: True si la fila sirve como encabezado
+        """
+        valid, _ = column_matcher.match(CSVParser._normalize_column_names(columns))
+        return valid
+
+    @staticmethod
+    def _try_legacy_combinations(file_path):
+        """
+        Búsqueda por prueba y error de separador y encoding con lecturas completas.
+        Solo se usa si la detección falla y legacy_fallback está activo.
+        
+        Args:
+            file_path: Ruta al archivo CSV
+            
+        Returns:
+            DataFrame con los datos o None si hay errores
+        """
+        # Probar diferentes combinaciones de separador y encoding
+        for sep in [';', ',', '\t', '|']:
+            for encoding in ['utf-8', 'utf-8-sig', 'latin1', 'iso-8859-1', 'cp1252', 'utf-16', 'utf-16le', 'utf-16be', 'windows-1252', 'iso-8859-15']:
+                try:
+                    df = pd.read_csv(file_path, sep=sep, encoding=encoding)
+                    
+                    # Verificar si las primeras filas contienen datos numéricos en lugar de encabezados
+                    if df.shape[1] > 0 and all(isinstance(col, (int, float)) for col in df.columns):
+                        # Posible archivo sin encabezados o con encabezados en la primera fila
+                        df = pd.read_csv(file_path, sep=sep, encoding=encoding, header=None)
+                        # Intentar usar primera fila como encabezados
+                        if not df.empty:
+                            df.columns = df.iloc[0].astype(str)
+                            df = df.iloc[1:].reset_index(drop=True)
+                    
+                    # Convertir todos los nombres de columnas a string para evitar problemas
+                    df.columns = df.columns.astype(str)
+
+                    # Limpiar problemas de codificación y nombres de columnas
+                    df = CSVParser._detect_and_fix_encoding_issues(df)
+                    df = CSVParser._clean_column_names(df)
+                    
+                    # Imprimir las columnas para debug
+                    valid, column_map = validate_voltage_columns(df)
+                    if valid:
+                        logger.info(f"Datos extraídos correctamente de {file_path}")
+                        return df
+                        
+                except Exception as e:
+                    logger.debug(f"Error con sep='{sep}', encoding='{encoding}': {e}")
+                    continue
+
+        return None
     
     @staticmethod
     def _try_alternative_methods(file_path):
@@ -0,0 +1,239 @@
+#sonel_extractor/parser/csv_sniffer.py
+import re
+import csv
+import codecs
+from collections import Counter
+import pandas as pd
+from config.logger import logger
+
+# Bytes leídos una sola vez desde el inicio del archivo para la detección
+SNIFF_SAMPLE_BYTES = 256 * 1024
+
+# Líneas iniciales donde se busca la fila de encabezados
+SNIFF_MAX_HEADER_LINES = 60
+
+# Separadores candidatos; la coma va al final porque choca con la coma decimal
+CANDIDATE_SEPARATORS = [';', '\t', '|', ',']
+
+# Marcas de orden de bytes (BOM): (bom, encoding para pandas, encoding del prefijo sin BOM)
+BOM_ENCODINGS = [
+    (codecs.BOM_UTF8, 'utf-8-sig', 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16', 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16', 'utf-16-be'),
+]
+
+# Palabras que delatan una fila de encabezados de exportación Sonel
+HEADER_KEYWORDS = re.compile(r'(?i)fecha|hora|date|time|tiempo|utc')
+
+DECIMAL_COMMA = re.compile(r'^[-+]?\d+,\d+(?:[eE][-+]?\d+)?$')
+DECIMAL_POINT = re.compile(r'^[-+]?\d+\.\d+(?:[eE][-+]?\d+)?$')
+
+
+class CSVSniffer:
+    """Detección en una sola lectura de codificación, separador, decimal y fila de encabezados"""
+
+    @staticmethod
+    def sniff(file_path, header_validator=None, sample_bytes=SNIFF_SAMPLE_BYTES):
+        """
+        Lee un prefijo acotado del archivo y detecta su formato
+
+        Args:
+            file_path: Ruta al archivo CSV
+            header_validator: Función (lista de columnas) -> bool que confirma la fila de encabezados (opcional)
+            sample_bytes: Bytes máximos a leer
+
+        Returns:
+            dict: Traza de detección (encoding, bom, separator, decimal, header_line,
+                  columns, header_validated, sample_bytes). separator y header_line
+                  son None si no se pudo detectar el formato.
+        """
+        trace = {
+            'method': 'sniffer',
+            'encoding': None,
+            'bom': False,
+            'separator': None,
+            'decimal': '.',
+            'header_line': None,
+            'columns': [],
+            'header_validated': False,
+            'sample_bytes': 0,
+            'separator_scores': {}
+        }
+
+        with open(file_path, 'rb') as f:
+            raw = f.read(sample_bytes)
+            truncated = bool(f.read(1))
+        trace['sample_bytes'] = len(raw)
+
+        text, encoding, bom = CSVSniffer._decode_sample(raw)
+        trace['encoding'] = encoding
+        trace['bom'] = bom
+
+        lines = text.split('\n')
+        # La última línea de un prefijo truncado puede estar incompleta
+        if truncated and len(lines) > 1:
+            lines = lines[:-1]
+        lines = [line.rstrip('\r') for line in lines]
+
+        separator, scores = CSVSniffer._detect_separator(lines)
+        trace['separator_scores'] = scores
+        if separator is None:
+            logger.debug(f"Sniffer: no se detectó separador en {file_path}")
+            return trace
+        trace['separator'] = separator
+
+        header_line, columns, validated = CSVSniffer._detect_header(lines, separator, header_validator)
+        trace['header_line'] = header_line
+        trace['columns'] = columns
+        trace['header_validated'] = validated
+
+        if header_line is not None:
+            trace['decimal'] = CSVSniffer._detect_decimal(lines[header_line + 1:], separator)
+
+        logger.debug(f"Sniffer {file_path}: encoding={encoding}, sep='{separator}', "
+                     f"decimal='{trace['decimal']}', encabezado en línea {header_line}")
+        return trace
+
+    @staticmethod
+    def _decode_sample(raw):
+        """
+        Detecta la codificación por BOM o por contenido y decodifica el prefijo
+
+        Returns:
+            tuple: (texto, codificación para pandas, si tenía BOM)
+        """
+        for bom, encoding, sample_encoding in BOM_ENCODINGS:
+            if raw.startswith(bom):
+                return raw[len(bom):].decode(sample_encoding, errors='ignore'), encoding, True
+
+        # UTF-16 sin BOM: bytes nulos alternados en texto mayormente ASCII
+        sample = raw[:4096]
+        if len(sample) >= 4:
+            even_nulls = sample[0::2].count(0)
+            odd_nulls = sample[1::2].count(0)
+            half = len(sample) // 2
+            if odd_nulls > half * 0.6 and even_nulls < half * 0.1:
+                return raw.decode('utf-16-le', errors='ignore'), 'utf-16-le', False
+            if even_nulls > half * 0.6 and odd_nulls < half * 0.1:
+                return raw.decode('utf-16-be', errors='ignore'), 'utf-16-be', False
+
+        try:
+            return raw.decode('utf-8'), 'utf-8', False
+        except UnicodeDecodeError as e:
+            # Un carácter multibyte cortado al final del prefijo no descarta UTF-8
+            if e.start >= len(raw) - 3 and 'unexpected end' in e.reason:
+                return raw[:e.start].decode('utf-8'), 'utf-8', False
+
+        try:
+            return raw.decode('cp1252'), 'cp1252', False
+        except UnicodeDecodeError:
+            return raw.decode('latin1'), 'latin1', False
+
+    @staticmethod
+    def _detect_separator(lines):
+        """
+        Elige el separador cuyo número de campos es más constante en las líneas de datos
+
+        Returns:
+            tuple: (separador o None, puntuaciones por separador)
+        """
+        # Las líneas finales del prefijo son datos; el preámbulo queda fuera
+        sample = [line for line in lines if line.strip()][-200:]
+        scores = {}
+        best, best_score = None, (0.0, 0)
+
+        for sep in CANDIDATE_SEPARATORS:
+            counts = [len(row) for row in csv.reader(sample, delimiter=sep)]
+            if not counts:
+                continue
+            mode_count, frequency = Counter(counts).most_common(1)[0]
+            if mode_count < 3:
+                continue
+            consistency = frequency / len(counts)
+            scores[sep] = {'fields': mode_count, 'consistency': round(consistency, 3)}
+            # Empate en constancia: gana el que aparece antes en CANDIDATE_SEPARATORS
+            if consistency > best_score[0] + 1e-9:
+                best, best_score = sep, (consistency, mode_count)
+
+        return best, scores
+
+    @staticmethod
+    def _detect_header(lines, separator, header_validator=None):
+        """
+        Busca la fila de encabezados: la primera con palabras clave de tiempo y al menos
+        tantos campos como las filas de datos; si hay validador, la primera que lo supera
+
+        Returns:
+            tuple: (índice de línea o None, columnas, validada por el validador)
+        """
+        head = lines[:SNIFF_MAX_HEADER_LINES]
+        rows = list(csv.reader(head, delimiter=separator))
+        data_rows = [len(row) for row in csv.reader([l for l in lines[-200:] if l.strip()], delimiter=separator)]
+        data_fields = Counter(data_rows).most_common(1)[0][0] if data_rows else 0
+
+        fallback = None
+        for index, row in enumerate(rows):
+            if len(row) < max(3, data_fields) or not any(HEADER_KEYWORDS.search(value) for value in row):
+                continue
+            columns = [value.strip() for value in row]
+            if header_validator is None:
+                return index, columns, False
+            if header_validator(columns):
+                return index, columns, True
+            if fallback is None:
+                fallback = (index, columns)
+
+        if fallback is not None:
+            return fallback[0], fallback[1], False
+        return None, [], False
+
+    @staticmethod
+    def _detect_decimal(data_lines, separator):
+        """
+        Detecta la marca decimal contando valores tipo 1,5 frente a 1.5
+
+        Returns:
+            str: ',' o '.'
+        """
+        if separator == ',':
+            return '.'
+
+        comma = point = 0
+        for row in csv.reader([line for line in data_lines[:200] if line.strip()], delimiter=separator):
+            for value in row:
+                value = value.strip()
+                if DECIMAL_COMMA.match(value):
+                    comma += 1
+                elif DECIMAL_POINT.match(value):
+                    point += 1
+        return ',' if comma > point else '.'
+
+    @staticmethod
+    def read(file_path, trace, **read_options):
+        """
+        Lectura completa única con el formato detectado. Si el archivo resulta no ser
+        UTF-8 más allá del prefijo, se repite una vez con cp1252.
+
+        Args:
+            file_path: Ruta al archivo CSV
+            trace: Traza devuelta por sniff (se actualiza con las lecturas realizadas)
+            read_options: Opciones adicionales para pd.read_csv
+
+        Returns:
+            DataFrame con los datos
+        """
+        options = dict(sep=trace['separator'], encoding=trace['encoding'],
+                       skiprows=trace['header_line'] or 0, decimal=trace['decimal'])
+        options.update(read_options)
+
+        trace['reads'] = trace.get('reads', 0) + 1
+        trace.setdefault('engine', 'c')
+        try:
+            return pd.read_csv(file_path, **options)
+        except UnicodeDecodeError:
+            if options['encoding'] != 'utf-8':
+                raise
+            logger.debug(f"UTF-8 inválido más allá del prefijo en {file_path}, se usa cp1252")
+            trace['encoding'] = options['encoding'] = 'cp1252'
+            trace['reads'] += 1
+            return pd.read_csv(file_path, **options)
@@ -1,45 +1,62 @@
 #sonel_extractor/parser/excel_parser.py
 import re
+import itertools
 import pandas as pd
 from config.logger import logger
 from core.utils.validators import validate_voltage_columns
+from core.utils.column_matcher import column_matcher
+from core.utils.config_options import get_config_bool, get_config_option
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+try:
+    from python_calamine import CalamineWorkbook
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CalamineWorkbook = None
+    CALAMINE_AVAILABLE = False
+
+# Filas iniciales de cada hoja donde se busca el encabezado
+EXCEL_MAX_HEADER_ROWS = 20
+
+# Motores de lectura aceptados en [PARSER] excel_engine
+EXCEL_ENGINES = ('auto', 'openpyxl', 'calamine')
+
 
 class ExcelParser:
     """Clase para procesar archivos Excel con datos de voltaje"""
 
     @staticmethod
-    def parse(file_path):
+    def parse(file_path, config=None):
         """
-        Procesa un archivo Excel con diferentes estructuras posibles
+        Procesa un archivo Excel con diferentes estructuras posibles. El libro se abre
+        una sola vez en modo de solo lectura; el encabezado se busca en las primeras
+        filas de cada hoja y los datos se materializan una vez desde esa fila.
         
         Args:
             file_path: Ruta al archivo Excel
+            config: Configuración (opcional); [PARSER] excel_engine = auto | openpyxl | calamine
+                    y legacy_fallback = true reactiva la búsqueda con pd.read_excel
             
         Returns:
             DataFrame con los datos o None si hay errores
         """
         try:
-            df = pd.read_excel(file_path)
-            
-            # Verificar si las primeras filas contienen datos numéricos en lugar de encabezados
-            if df.shape[1] > 0 and all(isinstance(col, (int, float)) for col in df.columns):
-                # Posible archivo sin encabezados o con encabezados en la primera fila
-                df = pd.read_excel(file_path, header=None)
-                # Intentar usar primera fila como encabezados
-                df.columns = df.iloc[0].astype(str)
-                df = df.iloc[1:].reset_index(drop=True)
-                
-            # Convertir todos los nombres de columnas a string para evitar problemas
-            df.columns = df.columns.astype(str)
-            
-            valid, column_map = validate_voltage_columns(df)
-            if valid:
-                logger.info(f"Datos extraídos correctamente de {file_path}")
+            df = ExcelParser._parse_streaming(file_path, config)
+            if df is not None:
                 return df
-            
-            # Si no funciona, probar métodos alternativos
-            df = ExcelParser._try_alternative_methods(file_path)
+
+            if not get_config_bool(config, 'PARSER', 'legacy_fallback', False):
+                logger.error(f"No se encontró un encabezado válido en el archivo Excel: {file_path}")
+                return None
+
+            logger.warning(f"⚠️ Encabezado no encontrado en lectura única, usando búsqueda por prueba y error: {file_path}")
+            df = ExcelParser._parse_legacy(file_path)
             if df is not None:
+                df.attrs['parse_info'] = {'method': 'legacy'}
                 return df
                 
         except Exception as e:
@@ -47,6 +64,183 @@ class ExcelParser:
         
         logger.error(f"No se pudo extraer datos del archivo Excel: {file_path}")
         return None
+
+    @staticmethod
+    def select_engine(config=None):
+        """
+        Decide el motor de lectura de Excel
+
+        Args:
+            config: Configuración (opcional)
+
+        Returns:
+            str: 'calamine' u 'openpyxl'
+        """
+        engine = get_config_option(config, 'PARSER', 'excel_engine', 'auto').lower()
+        if engine not in EXCEL_ENGINES:
+            logger.warning(f"⚠️ Motor de Excel '{engine}' no soportado, se usa auto")
+            engine = 'auto'
+        if engine in ('auto', 'calamine'):
+            if CALAMINE_AVAILABLE:
+                return 'calamine'
+            if engine == 'calamine':
+                logger.warning("⚠️ python-calamine no instalado, se usa openpyxl")
+        return 'openpyxl'
+
+    @staticmethod
+    def _iter_sheets(file_path, engine):
+        """
+        Abre el libro una sola vez y recorre sus hojas como iteradores de filas
+
+        Args:
+            file_path: Ruta al archivo Excel
+            engine: 'calamine' u 'openpyxl'
+
+        Yields:
+            tuple: (nombre de hoja, iterador de filas como tuplas de valores)
+        """
+        if engine == 'calamine':
+            workbook = CalamineWorkbook.from_path(file_path)
+            try:
+                for sheet_name in workbook.sheet_names:
+                    sheet = workbook.get_sheet_by_name(sheet_name)
+                    # Calamine devuelve '' en celdas vacías; openpyxl y pandas usan None
+                    yield sheet_name, (tuple(None if value == '' else value for value in row)
+                                       for row in sheet.iter_rows())
+            finally:
+                workbook.close()
+        else:
+            workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+            try:
+                for worksheet in workbook.worksheets:
+                    yield worksheet.title, worksheet.iter_rows(values_only=True)
+            finally:
+                workbook.close()
+
+    @staticmethod
+    def _parse_streaming(file_path, config=None):
+        """
+        Lectura única del libro: encabezado detectado en memoria por hoja y datos
+        construidos una sola vez a partir de la fila siguiente
+
+        Args:
+            file_path: Ruta al archivo Excel
+            config: Configuración (opcional)
+
+        Returns:
+            DataFrame con los datos o None si ninguna hoja tiene encabezado válido
+        """
+        engine = ExcelParser.select_engine(config)
+        for sheet_name, rows in ExcelParser._iter_sheets(file_path, engine):
+            head = list(itertools.islice(rows, EXCEL_MAX_HEADER_ROWS))
+            header_row, columns, column_map = ExcelParser._detect_header(head)
+            if header_row is None:
+                logger.debug(f"Hoja '{sheet_name}' sin encabezado reconocible en {file_path}")
+                continue
+
+            width = len(columns)
+            data_rows = itertools.chain(head[header_row + 1:], rows)
+            records = [
+                tuple(row[:width]) + (None,) * (width - len(row))
+                for row in data_rows
+                if any(value is not None for value in row)
+            ]
+            df = pd.DataFrame.from_records(records, columns=columns)
+
+            df.attrs['column_map'] = dict(column_map)
+            df.attrs['parse_info'] = {
+                'method': 'excel_stream',
+                'engine': engine,
+                'sheet': sheet_name,
+                'header_line': header_row,
+                'column_count': width
+            }
+            logger.info(f"Datos extraídos correctamente de la hoja '{sheet_name}' de {file_path} "
+                        f"(motor {engine}, encabezado en fila {header_row + 1})")
+            return df
+        return None
+
+    @staticmethod
+    def _detect_header(head):
+        """
+        Busca la fila de encabezados entre las primeras filas de una hoja
+
+        Args:
+            head: Primeras filas de la hoja
+
+        Returns:
+            tuple: (índice de fila o None, nombres de columnas, mapeo de columnas)
+        """
+        for index, row in enumerate(head):
+            if not row or sum(value is not None for value in row) < 3:
+                continue
+            columns = ExcelParser._header_names(row)
+            valid, column_map = column_matcher.match(columns)
+            if valid:
+                return index, columns, column_map
+        return None, [], {}
+
+    @staticmethod
+    def _header_names(row):
+        """
+        Nombres de columnas de una fila de encabezado, con el mismo criterio que
+        pandas para celdas vacías y nombres repetidos
+
+        Args:
+            row: Valores de la fila
+
+        Returns:
+            list: Nombres de columnas como texto
+        """
+        # Recortar celdas vacías finales (ancho del rango usado mayor que la tabla)
+        values = list(row)
+        while values and values[-1] is None:
+            values.pop()
+
+        names = []
+        seen = {}
+        for index, value in enumerate(values):
+            name = f"Unnamed: {index}" if value is None else str(value).strip()
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            names.append(name)
+        return names
+
+    @staticmethod
+    def _parse_legacy(file_path):
+        """
+        Búsqueda anterior con pd.read_excel (una lectura completa por intento).
+        Solo se usa si la lectura única falla y legacy_fallback está activo.
+        
+        Args:
+            file_path: Ruta al archivo Excel
+            
+        Returns:
+            DataFrame con los datos o None si hay errores
+        """
+        df = pd.read_excel(file_path)
+        
+        # Verificar si las primeras filas contienen datos numéricos en lugar de encabezados
+        if df.shape[1] > 0 and all(isinstance(col, (int, float)) for col in df.columns):
+            # Posible archivo sin encabezados o con encabezados en la primera fila
+            df = pd.read_excel(file_path, header=None)
+            # Intentar usar primera fila como encabezados
+            df.columns = df.iloc[0].astype(str)
+            df = df.iloc[1:].reset_index(drop=True)
+            
+        # Convertir todos los nombres de columnas a string para evitar problemas
+        df.columns = df.columns.astype(str)
+        
+        valid, column_map = validate_voltage_columns(df)
+        if valid:
+            logger.info(f"Datos extraídos correctamente de {file_path}")
+            return df
+        
+        # Si no funciona, probar métodos alternativos
+        return ExcelParser._try_alternative_methods(file_path)
     
     @staticmethod
     def _try_alternative_methods(file_path):
@@ -0,0 +1,186 @@
+#sonel_extractor/parser/layout_cache.py
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from config.logger import logger
+
+LAYOUT_CACHE_FILENAME = "layout_cache.json"
+
+# Bytes iniciales donde se buscan filas de encabezado conocidas
+LAYOUT_PREFIX_BYTES = 64 * 1024
+
+# Filas iniciales candidatas a encabezado
+LAYOUT_MAX_HEADER_LINES = 60
+
+
+class LayoutCache:
+    """Caché persistente de formatos de exportación CSV por firma de la fila de encabezados"""
+
+    def __init__(self, cache_file):
+        """
+        Inicializa la caché y carga los formatos conocidos
+
+        Args:
+            cache_file: Ruta del archivo JSON de la caché
+        """
+        self.cache_file = cache_file
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        # Firmas invalidadas que no deben volver desde la versión en disco
+        self._removed = set()
+        self._lock = threading.Lock()
+        self.layouts = self._load()
+
+    def _load(self):
+        """Carga los formatos guardados; un archivo dañado se ignora"""
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get("layouts", {})
+        except (json.JSONDecodeError, IOError, OSError) as e:
+            logger.warning(f"⚠️ Caché de formatos ilegible, se reconstruirá: {e}")
+            return {}
+
+    @staticmethod
+    def read_header_lines(file_path):
+        """
+        Lee las primeras líneas del archivo sin decodificar
+
+        Returns:
+            list: Líneas en bytes (sin fin de línea)
+        """
+        with open(file_path, 'rb') as f:
+            raw = f.read(LAYOUT_PREFIX_BYTES)
+        return [line.rstrip(b'\r\x00') for line in raw.split(b'\n')[:LAYOUT_MAX_HEADER_LINES]]
+
+    @staticmethod
+    def signature(raw_line):
+        """Firma de una fila de encabezados en bytes"""
+        return hashlib.sha1(raw_line.lstrip(b'\x00')).hexdigest()
+
+    def lookup(self, raw_lines):
+        """
+        Busca un formato conocido entre las primeras líneas del archivo
+
+        Args:
+            raw_lines: Líneas devueltas por read_header_lines
+
+        Returns:
+            tuple: (firma, formato) o (None, None) si no hay coincidencia
+        """
+        with self._lock:
+            for index, raw_line in enumerate(raw_lines):
+                if not raw_line.strip():
+                    continue
+                signature = self.signature(raw_line)
+                layout = self.layouts.get(signature)
+                if layout is not None and layout.get('skiprows') == index:
+                    self.hits += 1
+                    layout['uses'] = layout.get('uses', 0) + 1
+                    layout['last_used'] = datetime.now().isoformat()
+                    self._dirty = True
+                    return signature, layout
+            self.misses += 1
+            return None, None
+
+    def store(self, raw_lines, trace, column_map, read_plan=None):
+        """
+        Guarda el formato detectado para la fila de encabezados del archivo
+
+        Args:
+            raw_lines: Líneas devueltas por read_header_lines
+            trace: Traza del detector (encoding, separator, decimal, header_line)
+            column_map: Mapeo de columnas estándar resuelto para el encabezado
+            read_plan: Columnas y tipos de la lectura podada (opcional)
+
+        Returns:
+            str: Firma guardada o None si la fila no está en el prefijo
+        """
+        header_line = trace.get('header_line')
+        if header_line is None or header_line >= len(raw_lines):
+            return None
+
+        signature = self.signature(raw_lines[header_line])
+        with self._lock:
+            self._removed.discard(signature)
+            self.layouts[signature] = {
+                'encoding': trace['encoding'],
+                'separator': trace['separator'],
+                'decimal': trace['decimal'],
+                'skiprows': header_line,
+                'column_map': dict(column_map),
+                'read_plan': read_plan,
+                'uses': 1,
+                'first_seen': datetime.now().isoformat(),
+                'last_used': datetime.now().isoformat()
+            }
+            self._dirty = True
+        logger.debug(f"Formato CSV nuevo en caché: {signature[:12]} (sep='{trace['separator']}', "
+                     f"encoding={trace['encoding']}, skiprows={header_line})")
+        return signature
+
+    def invalidate(self, signature):
+        """Elimina un formato que ya no corresponde a los archivos"""
+        with self._lock:
+            self._removed.add(signature)
+            if self.layouts.pop(signature, None) is not None:
+                self._dirty = True
+
+    def _merge_disk(self):
+        """Combina la versión en disco con la memoria, sin recuperar formatos invalidados"""
+        layouts = self._load()
+        for signature in self._removed:
+            layouts.pop(signature, None)
+        layouts.update(self.layouts)
+        self.layouts = layouts
+        return layouts
+
+    def save(self):
+        """Guarda la caché en disco si cambió, combinándola con la versión en disco"""
+        with self._lock:
+            if not self._dirty:
+                return
+            layouts = self._merge_disk()
+            try:
+                directory = os.path.dirname(self.cache_file)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # Temporal por proceso: los procesos de trabajo guardan la misma caché
+                temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump({"version": 1, "layouts": layouts}, f, indent=2, ensure_ascii=False)
+                os.replace(temp_file, self.cache_file)
+                self._dirty = False
+            except (IOError, OSError) as e:
+                logger.warning(f"⚠️ No se pudo guardar la caché de formatos: {e}")
+
+    def reload(self):
+        """Incorpora los formatos que otros procesos guardaron en disco"""
+        with self._lock:
+            self._merge_disk()
+
+    def add_stats(self, hits=0, misses=0):
+        """Suma las búsquedas hechas por otros procesos con su propia copia de la caché"""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def stats(self):
+        """
+        Estadísticas de uso de la caché
+
+        Returns:
+            dict: Aciertos, fallos y formatos conocidos
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total * 100, 1) if total else 0,
+            'known_layouts': len(self.layouts),
+            'cache_file': self.cache_file
+        }
@@ -0,0 +1,219 @@
+#sonel_extractor/parser/xml_parser.py
+import re
+import itertools
+import xml.etree.ElementTree as ET
+import pandas as pd
+from config.logger import logger
+from core.utils.column_matcher import column_matcher
+
+# Registros leídos para descubrir los campos antes de resolver las columnas
+XML_SAMPLE_RECORDS = 50
+
+# Filas por bloque por defecto
+DEFAULT_XML_CHUNK_ROWS = 50000
+
+# Columnas de fecha que el transformador puede combinar con la hora aunque no estén en el mapeo
+DATE_FIELD_PATTERN = re.compile(r'(?i)fecha|date')
+
+
+def _local_name(tag):
+    """Nombre de etiqueta sin espacio de nombres ({uri}Nombre -> Nombre)"""
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else str(tag)
+
+
+class XMLParser:
+    """Lectura incremental de exportaciones XML con memoria acotada"""
+
+    @staticmethod
+    def parse(file_path, config=None, chunk_rows=DEFAULT_XML_CHUNK_ROWS):
+        """
+        Lee el XML completo en un DataFrame (concatenando los bloques)
+
+        Args:
+            file_path: Ruta al archivo XML
+            config: Configuración (opcional)
+            chunk_rows: Filas por bloque durante la lectura
+
+        Returns:
+            DataFrame con los datos o None si no se reconocieron las columnas
+        """
+        chunks = XMLParser.iter_chunks(file_path, config, chunk_rows)
+        if chunks is None:
+            return None
+
+        frames = list(chunks)
+        if not frames:
+            logger.error(f"El archivo XML no contiene registros: {file_path}")
+            return None
+
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        df.attrs['column_map'] = dict(frames[-1].attrs['column_map'])
+        df.attrs['parse_info'] = frames[-1].attrs['parse_info']
+        logger.info(f"Datos extraídos correctamente de {file_path} ({len(df)} registros XML)")
+        return df
+
+    @staticmethod
+    def iter_chunks(file_path, config=None, chunk_rows=DEFAULT_XML_CHUNK_ROWS):
+        """
+        Lectura por bloques con iterparse. Los primeros registros se usan para
+        descubrir los campos y resolver el mapeo de columnas antes de devolver
+        el iterador, así que un XML no reconocido se informa de inmediato.
+
+        Args:
+            file_path: Ruta al archivo XML
+            config: Configuración (opcional)
+            chunk_rows: Filas por bloque
+
+        Returns:
+            Iterador de DataFrames (con column_map y parse_info en attrs) o None si
+            no se reconocieron las columnas
+        """
+        try:
+            records = XMLParser._iter_records(file_path)
+            sample = list(itertools.islice(records, XML_SAMPLE_RECORDS))
+        except ET.ParseError as e:
+            logger.error(f"XML mal formado en {file_path}: {e}")
+            return None
+
+        if not sample:
+            logger.error(f"No se encontraron registros en el archivo XML: {file_path}")
+            return None
+
+        fields = []
+        for _, record in sample:
+            fields.extend(name for name in record if name not in fields)
+
+        columns, column_map = XMLParser._resolve_columns(fields)
+        if column_map is None:
+            logger.error(f"Los campos del XML no coinciden con las columnas esperadas: {file_path}")
+            return None
+
+        trace = {
+            'method': 'xml_iterparse',
+            'record_tag': sample[0][0],
+            'fields': len(fields),
+            'stream_chunk_rows': int(chunk_rows),
+            'chunks': 0,
+            'rows': 0
+        }
+        return XMLParser._stream_chunks(itertools.chain(sample, records), columns, column_map,
+                                        trace, int(chunk_rows))
+
+    @staticmethod
+    def _iter_records(file_path):
+        """
+        Recorre el documento con iterparse y entrega cada registro como diccionario.
+        Un registro es un elemento repetido cuyos hijos son hojas; sus campos son los
+        textos de los hijos y sus atributos. Los elementos de este tipo que aparecen
+        una sola vez (cabeceras con datos del equipo) no se toman como registros.
+        Cada elemento procesado se elimina del árbol para acotar la memoria.
+
+        Yields:
+            tuple: (etiqueta del registro, {campo: valor})
+        """
+        record_tag = None
+        first_seen = {}
+        # Pila de [elemento, ya se le quitaron hijos]
+        stack = []
+        for event, element in ET.iterparse(file_path, events=('start', 'end')):
+            if event == 'start':
+                stack.append([element, False])
+                continue
+
+            _, emptied = stack.pop()
+            children = list(element)
+            if not children and not emptied:
+                # Hoja: se libera junto con su registro
+                continue
+            if emptied or any(len(child) for child in children):
+                # Contenedor: se quita del padre para que este no parezca un registro
+                if not children and stack:
+                    stack[-1][0].remove(element)
+                    stack[-1][1] = True
+                continue
+
+            tag = _local_name(element.tag)
+            if record_tag is None or tag == record_tag:
+                record = {_local_name(name): value for name, value in element.attrib.items()}
+                for child in children:
+                    text = child.text.strip() if child.text else None
+                    record[_local_name(child.tag)] = text or None
+
+                if record_tag is None:
+                    if tag in first_seen:
+                        # Segunda aparición: esta etiqueta es la de los registros
+                        record_tag = tag
+                        yield tag, first_seen.pop(tag)
+                        yield tag, record
+                    else:
+                        first_seen[tag] = record
+                else:
+                    yield tag, record
+
+            element.clear()
+            if stack:
+                stack[-1][0].remove(element)
+                stack[-1][1] = True
+
+        if record_tag is None and first_seen:
+            # Documento con un único registro: el último elemento de datos
+            tag, record = list(first_seen.items())[-1]
+            yield tag, record
+
+    @staticmethod
+    def _resolve_columns(fields):
+        """
+        Resuelve el mapeo de columnas sobre los nombres de campo del XML. Si los
+        nombres usan guiones bajos (U_L1_Avg) se prueba también con espacios.
+
+        Args:
+            fields: Nombres de campo descubiertos
+
+        Returns:
+            tuple: ({campo XML: nombre de columna} de los campos a conservar, mapeo)
+                   o (None, None) si no se reconocieron
+        """
+        candidates = [fields]
+        spaced = [name.replace('_', ' ') for name in fields]
+        if spaced != fields:
+            candidates.append(spaced)
+
+        for names in candidates:
+            valid, column_map = column_matcher.match(names)
+            if not valid:
+                continue
+            needed = set(column_map.values())
+            columns = {field: name for field, name in zip(fields, names)
+                       if name in needed or DATE_FIELD_PATTERN.search(name)}
+            return columns, column_map
+        return None, None
+
+    @staticmethod
+    def _stream_chunks(records, columns, column_map, trace, chunk_rows):
+        """
+        Agrupa los registros en DataFrames de hasta chunk_rows filas con solo las
+        columnas necesarias
+
+        Yields:
+            DataFrame con las columnas conservadas
+        """
+        names = list(columns.values())
+        fields = list(columns.keys())
+        buffer = []
+        for _, record in records:
+            buffer.append(tuple(record.get(field) for field in fields))
+            if len(buffer) >= chunk_rows:
+                yield XMLParser._build_chunk(buffer, names, column_map, trace)
+                buffer = []
+        if buffer:
+            yield XMLParser._build_chunk(buffer, names, column_map, trace)
+
+    @staticmethod
+    def _build_chunk(rows, names, column_map, trace):
+        """Construye un bloque y actualiza la traza"""
+        chunk = pd.DataFrame.from_records(rows, columns=names)
+        trace['chunks'] += 1
+        trace['rows'] += len(chunk)
+        chunk.attrs['column_map'] = dict(column_map)
+        chunk.attrs['parse_info'] = trace
+        return chunk
@@ -0,0 +1,228 @@
+#sonel_extractor/transformer/columnar_batch.py
+import numpy as np
+import pandas as pd
+
+# Columnas de medición producidas por VoltageTransformer (mismo orden que las consultas INSERT)
+MEASUREMENT_FIELDS = [
+    'u_l1_avg', 'u_l2_avg', 'u_l3_avg', 'u_l12_avg',
+    'i_l1_avg', 'i_l2_avg',
+    'p_l1_avg', 'p_l2_avg', 'p_l3_avg', 'p_e_avg',
+    'q1_l1_avg', 'q1_l2_avg', 'q1_e_avg',
+    'sn_l1_avg', 'sn_l2_avg', 'sn_e_avg',
+    's_l1_avg', 's_l2_avg', 's_e_avg'
+]
+
+# Fechas como días desde PG_EPOCH y horas como microsegundos desde medianoche,
+# la misma representación que usa el formato binario de COPY de PostgreSQL
+DATE_FIELDS = ('tiempo_utc', 'date_field')
+TIME_FIELDS = ('time',)
+PG_EPOCH = pd.Timestamp('2000-01-01')
+
+
+def encode_dates(values):
+    """
+    Codifica fechas como días desde PG_EPOCH
+
+    Args:
+        values: Serie con fechas (datetime64, datetime.date o texto)
+
+    Returns:
+        tuple: (días int32, máscara de nulos)
+    """
+    parsed = pd.to_datetime(pd.Series(values), errors='coerce')
+    if getattr(parsed.dt, 'tz', None) is not None:
+        # Igual que .dt.date: se conserva la fecha local
+        parsed = parsed.dt.tz_localize(None)
+    days = (parsed.dt.normalize() - PG_EPOCH).dt.days.to_numpy(dtype=np.float64)
+    null_mask = np.isnan(days)
+    return np.where(null_mask, 0, days).astype(np.int32), null_mask
+
+
+def encode_times(values):
+    """
+    Codifica horas del día (datetime.time) como microsegundos desde medianoche
+
+    Args:
+        values: Serie u array con datetime.time o None
+
+    Returns:
+        tuple: (microsegundos int64, máscara de nulos)
+    """
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), sort=False)
+    micros = np.array([((t.hour * 60 + t.minute) * 60 + t.second) * 1_000_000 + t.microsecond
+                       for t in uniques] + [0], dtype=np.int64)
+    null_mask = codes < 0
+    return micros[codes], null_mask
+
+
+def format_dates(days, null_mask):
+    """Días desde PG_EPOCH como texto YYYY-MM-DD (None si es nulo), formateando solo los valores distintos"""
+    codes, uniques = pd.factorize(days, sort=False)
+    text = (PG_EPOCH + pd.to_timedelta(uniques, unit='D')).strftime('%Y-%m-%d').to_numpy(dtype=object)
+    return np.where(null_mask, None, text[codes])
+
+
+def format_times(micros, null_mask):
+    """Microsegundos desde medianoche como texto, igual que str(datetime.time) (None si es nulo)"""
+    codes, uniques = pd.factorize(micros, sort=False)
+    stamps = PG_EPOCH + pd.to_timedelta(uniques, unit='us')
+    text = np.where(uniques % 1_000_000 == 0, stamps.strftime('%H:%M:%S'), stamps.strftime('%H:%M:%S.%f'))
+    return np.where(null_mask, None, text[codes])
+
+
+class ColumnarBatch:
+    """
+    Resultado de la transformación en columnas de NumPy: las mediciones presentes
+    en una matriz de flotantes (una fila contigua por campo), fechas y horas
+    codificadas como enteros y un mapa de bits de nulos por campo. Las mediciones
+    ausentes en el archivo no ocupan memoria. No contiene objetos de Python por
+    celda, así que el cargador lo serializa directamente.
+    """
+
+    def __init__(self, measurements, dates, times, utc_zone=None, float_dtype=np.float64):
+        """
+        Construye el lote a partir de las columnas ya convertidas
+
+        Args:
+            measurements: {campo de MEASUREMENT_FIELDS: array o Serie numérica} de los
+                          campos presentes (NaN = nulo)
+            dates: {campo de DATE_FIELDS: (días int32, máscara de nulos)}
+            times: {campo de TIME_FIELDS: (microsegundos int64, máscara de nulos)}
+            utc_zone: Zona UTC común a todas las filas o None
+            float_dtype: Tipo de la matriz de mediciones (float64 o float32)
+        """
+        lengths = [len(values) for values, _ in list(dates.values()) + list(times.values())]
+        lengths += [len(values) for values in measurements.values() if values is not None]
+        self.n_rows = lengths[0] if lengths else 0
+
+        self.fields = [field for field in MEASUREMENT_FIELDS if measurements.get(field) is not None]
+        self.measurements = np.empty((len(self.fields), self.n_rows), dtype=float_dtype)
+        for position, field in enumerate(self.fields):
+            self.measurements[position] = pd.to_numeric(pd.Series(measurements[field]), errors='coerce').to_numpy(
+                dtype=float_dtype, na_value=np.nan)
+
+        self.integers = {}
+        self.null_bitmap = {}
+        for field, (values, null_mask) in list(dates.items()) + list(times.items()):
+            self.integers[field] = np.ascontiguousarray(values)
+            self.null_bitmap[field] = np.packbits(null_mask, bitorder='little')
+        for position, field in enumerate(self.fields):
+            self.null_bitmap[field] = np.packbits(np.isnan(self.measurements[position]), bitorder='little')
+
+        self.utc_zone = utc_zone
+
+    @classmethod
+    def from_frame(cls, frame):
+        """
+        Codifica un DataFrame transformado (objetos date y time) como lote columnar
+
+        Args:
+            frame: DataFrame devuelto por VoltageTransformer.transform
+
+        Returns:
+            ColumnarBatch
+        """
+        dates = {field: encode_dates(frame[field]) for field in DATE_FIELDS if field in frame.columns}
+        times = {field: encode_times(frame[field]) for field in TIME_FIELDS if field in frame.columns}
+        measurements = {field: frame[field] for field in MEASUREMENT_FIELDS if field in frame.columns}
+        utc_zone = None
+        if 'utc_zone' in frame.columns and frame['utc_zone'].notna().any():
+            utc_zone = frame['utc_zone'].dropna().iloc[0]
+        return cls(measurements, dates, times, utc_zone)
+
+    def __len__(self):
+        return self.n_rows
+
+    @property
+    def empty(self):
+        """True si el lote no tiene filas (como DataFrame.empty)"""
+        return self.n_rows == 0
+
+    @property
+    def columns(self):
+        """Campos disponibles, en el orden del DataFrame transformado"""
+        return list(self.integers) + ['utc_zone'] + list(MEASUREMENT_FIELDS)
+
+    @property
+    def nbytes(self):
+        """Memoria ocupada por los arrays del lote"""
+        return (self.measurements.nbytes
+                + sum(values.nbytes for values in self.integers.values())
+                + sum(bitmap.nbytes for bitmap in self.null_bitmap.values()))
+
+    def is_null(self, field):
+        """
+        Máscara de nulos de un campo
+
+        Args:
+            field: Nombre del campo
+
+        Returns:
+            numpy.ndarray de bool
+        """
+        if field == 'utc_zone':
+            return np.full(self.n_rows, self.utc_zone is None)
+        if field in MEASUREMENT_FIELDS and field not in self.fields:
+            return np.ones(self.n_rows, dtype=bool)
+        return np.unpackbits(self.null_bitmap[field], count=self.n_rows, bitorder='little').astype(bool)
+
+    def values(self, field):
+        """
+        Array crudo de un campo sin copiar: flotantes para mediciones (NaN si el
+        campo no está en el archivo), días para fechas y microsegundos para horas
+
+        Args:
+            field: Nombre del campo
+
+        Returns:
+            numpy.ndarray
+        """
+        if field in self.integers:
+            return self.integers[field]
+        if field in self.fields:
+            return self.measurements[self.fields.index(field)]
+        return np.full(self.n_rows, np.nan, dtype=self.measurements.dtype)
+
+    def __getitem__(self, field):
+        """
+        Serie de pandas con tipos nativos: flotantes, datetime64 para fechas,
+        timedelta64 para horas y texto para utc_zone
+        """
+        if field == 'utc_zone':
+            return pd.Series(self.utc_zone, index=pd.RangeIndex(self.n_rows), dtype=object)
+        if field not in self.integers and field not in MEASUREMENT_FIELDS:
+            raise KeyError(field)
+
+        values = self.values(field)
+        if field in DATE_FIELDS:
+            stamps = PG_EPOCH + pd.to_timedelta(values, unit='D')
+            return pd.Series(stamps, name=field).where(~self.is_null(field))
+        if field in TIME_FIELDS:
+            deltas = pd.to_timedelta(values, unit='us')
+            return pd.Series(deltas, name=field).where(~self.is_null(field))
+        return pd.Series(values, name=field, copy=False)
+
+    def to_frame(self):
+        """
+        DataFrame equivalente al de VoltageTransformer.transform (fechas como
+        datetime.date y horas como datetime.time), para la carga fila a fila.
+        Las mediciones ausentes quedan como NaN.
+
+        Returns:
+            DataFrame
+        """
+        frame = {}
+        for field, values in self.integers.items():
+            null_mask = self.is_null(field)
+            codes, uniques = pd.factorize(values, sort=False)
+            if field in DATE_FIELDS:
+                objects = (PG_EPOCH + pd.to_timedelta(uniques, unit='D')).date
+            else:
+                objects = (PG_EPOCH + pd.to_timedelta(uniques, unit='us')).time
+            null_value = pd.NaT if field in DATE_FIELDS else None
+            frame[field] = pd.Series(np.where(null_mask, null_value, np.asarray(objects, dtype=object)[codes]),
+                                     dtype=object)
+        frame['utc_zone'] = self['utc_zone']
+        for field in MEASUREMENT_FIELDS:
+            frame[field] = self.values(field)
+        return pd.DataFrame(frame)
@@ -0,0 +1,149 @@
+#sonel_extractor/transformer/transform_plan.py
+import re
+import threading
+from collections import OrderedDict
+from config.logger import logger
+from core.utils.validators import validate_voltage_columns
+
+# Columna de fecha separada que se combina con la hora
+DATE_COLUMN_PATTERN = re.compile(r'(?i)fecha|date')
+TIME_COLUMN_PATTERN = re.compile(r'(?i)hora|time')
+
+# Zona UTC en el nombre de la columna Time (UTC±N)
+UTC_ZONE_PATTERN = re.compile(r'utc([+-]\d+)')
+DEFAULT_UTC_ZONE = "UTC-5"
+
+# Formatos de encabezado distintos recordados por proceso
+MAX_CACHED_PLANS = 256
+
+
+class TransformPlan:
+    """Decisiones de VoltageTransformer.transform que dependen solo del encabezado"""
+
+    def __init__(self, columns, column_map):
+        """
+        Resuelve las columnas de origen de cada campo transformado
+
+        Args:
+            columns: Nombres de columnas del DataFrame
+            column_map: Mapeo de columnas estándar validado
+        """
+        self.column_map = dict(column_map)
+        self.time_col = column_map.get('time')
+        self.date_col = column_map.get('date')
+
+        # Fecha y hora en columnas separadas: se combinan antes de extraer la fecha
+        self.combine_date_col = None
+        if self.time_col and TIME_COLUMN_PATTERN.search(self.time_col):
+            self.combine_date_col = next((col for col in columns
+                                          if DATE_COLUMN_PATTERN.search(str(col)) and col != self.time_col), None)
+
+        self.time_utc_col = column_map.get('time_utc') or column_map.get('time_utc5')
+        self.utc_zone = None
+        if self.time_utc_col:
+            utc_zone_match = UTC_ZONE_PATTERN.search(self.time_utc_col.lower())
+            # Valor por defecto si no se puede extraer
+            self.utc_zone = f"UTC{utc_zone_match.group(1)}" if utc_zone_match else DEFAULT_UTC_ZONE
+
+        self.voltage_columns = {
+            'u_l1_avg': column_map.get('u_l1'),
+            'u_l2_avg': column_map.get('u_l2'),
+            'u_l3_avg': column_map.get('u_l3'),
+            'u_l12_avg': column_map.get('u_l12')
+        }
+        self.current_columns = {
+            'i_l1_avg': column_map.get('i_l1'),
+            'i_l2_avg': column_map.get('i_l2')
+        }
+        self.power_columns = {
+            'p_l1_avg': column_map.get('p_l1'),
+            'p_l2_avg': column_map.get('p_l2'),
+            'p_l3_avg': column_map.get('p_l3'),
+            'p_e_avg': column_map.get('p_e'),
+            'q1_l1_avg': column_map.get('q1_l1'),
+            'q1_l2_avg': column_map.get('q1_l2'),
+            'q1_e_avg': column_map.get('q1_e'),
+            'sn_l1_avg': column_map.get('sn_l1'),
+            'sn_l2_avg': column_map.get('sn_l2'),
+            'sn_e_avg': column_map.get('sn_e'),
+            's_l1_avg': column_map.get('s_l1'),
+            's_l2_avg': column_map.get('s_l2'),
+            's_e_avg': column_map.get('s_e')
+        }
+        self.measurement_sources = [*self.voltage_columns.values(), *self.current_columns.values(),
+                                    *self.power_columns.values()]
+
+
+class TransformPlanCache:
+    """Planes de transformación por formato de encabezado, construidos una vez y reutilizados"""
+
+    def __init__(self, max_entries=MAX_CACHED_PLANS):
+        """
+        Inicializa la caché
+
+        Args:
+            max_entries: Formatos distintos que se recuerdan
+        """
+        self.max_entries = max_entries
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, df):
+        """
+        Plan para las columnas del DataFrame. El mapeo ya resuelto por el parser
+        (attrs['column_map']) se usa si todas sus columnas están presentes; si no,
+        se validan las columnas con los patrones.
+
+        Args:
+            df: DataFrame extraído
+
+        Returns:
+            TransformPlan o None si las columnas no se reconocen
+        """
+        columns = tuple(str(col) for col in df.columns)
+        column_map = df.attrs.get('column_map')
+        if not column_map or not all(col in columns for col in column_map.values()):
+            column_map = None
+        key = (columns, tuple(sorted(column_map.items())) if column_map else None)
+
+        with self._lock:
+            if key in self._plans:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return self._plans[key]
+
+        if column_map is None:
+            valid, column_map = validate_voltage_columns(df)
+            if not valid:
+                column_map = None
+        plan = TransformPlan(list(df.columns), column_map) if column_map else None
+        if plan is not None:
+            logger.debug(f"Plan de transformación nuevo para encabezado de {len(columns)} columnas")
+
+        with self._lock:
+            self.misses += 1
+            self._plans[key] = plan
+            if len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+        return plan
+
+    def stats(self):
+        """
+        Estadísticas de la caché de planes
+
+        Returns:
+            dict: Aciertos, fallos y planes recordados
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'cached_plans': len(self._plans)}
+
+    def clear(self):
+        """Olvida los planes (p. ej. tras cambiar COLUMN_PATTERNS)"""
+        with self._lock:
+            self._plans.clear()
+
+
+# Instancia compartida por todas las transformaciones del proceso
+transform_plans = TransformPlanCache()
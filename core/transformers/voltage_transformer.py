@@ -1,234 +1,521 @@
 #sonel_extractor/transformer/voltage_transformer.py
-import re
+import logging
 import numpy as np
 import pandas as pd
 from config.logger import logger
-from core.utils.validators import validate_voltage_columns
+from core.transformers.transform_plan import transform_plans
+from core.transformers.columnar_batch import (
+    ColumnarBatch, MEASUREMENT_FIELDS, DATE_FIELDS, TIME_FIELDS, encode_dates, encode_times
+)
+
+# HH:MM:SS(.fff) con el mismo margen que el parser anterior (espacios y campos extra tras ':')
+TIME_OF_DAY_PATTERN = r'^\s*(\d{1,2})\s*:\s*(\d{1,2})\s*:\s*(\d{1,2})(?:\.(\d*))?\s*(?::.*)?$'
+
+# Ancho máximo de texto para el camino rápido por posición de caracteres
+MAX_FIXED_TIME_WIDTH = 32
+
+# Fecha base para construir horas del día a partir de nanosegundos
+TIME_OF_DAY_BASE = pd.Timestamp(1900, 1, 1)
+
+# Formatos probados en orden para la columna de tiempo principal
+DATE_FORMATS = ['%Y-%m-%d %H:%M:%S', '%d/%m/%Y %H:%M:%S', '%m/%d/%Y %H:%M:%S',
+                '%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y']
+
+# Valores distintos con los que se prueba cada formato antes de aplicarlo a todos
+DATE_FORMAT_SAMPLE = 20
+
+# Número dentro de un texto de medición (tras cambiar ',' por '.')
+NUMERIC_VALUE_PATTERN = r'(-?[\d\.]+(?:[eE][+-]?\d+)?)'
+SCIENTIFIC_NOTATION_PATTERN = r'[eE][+-]?\d+'
+
+
+class DateFormatMismatchError(ValueError):
+    """Un bloque del archivo no sigue el formato de fecha fijado por los bloques anteriores"""
+
 
 class VoltageTransformer:
     """Clase para transformar datos de voltaje al formato requerido"""
-    
+
+    # Formato inferido por (firma de encabezado, columna); '' = parser automático
+    _date_formats = {}
+
+    @staticmethod
+    def _header_signature(df):
+        """Identifica el formato de exportación: firma de la caché de formatos o nombres de columnas"""
+        parse_info = df.attrs.get('parse_info') or {}
+        return parse_info.get('layout_signature') or tuple(df.columns)
+
+    @staticmethod
+    def parse_dates(series, formats=(), cache_key=None, encoded=False, trace=None):
+        """
+        Convierte una columna de fechas en fechas sin hora analizando solo los valores
+        distintos. Con formats, se usa el primer formato que sirve para todos los
+        valores (como probar cada formato sobre la columna completa); el formato
+        elegido se recuerda por cache_key y se prueba primero en el siguiente archivo.
+        Sin formato válido se usa el parser automático con errors='coerce'.
+        Con trace (parse_info del archivo), el formato elegido en el primer bloque
+        queda fijado en trace['date_formats'] y se aplica a los bloques siguientes.
+        
+        Args:
+            series: Serie con las fechas
+            formats: Formatos strftime candidatos, en orden de preferencia
+            cache_key: Clave para recordar el formato inferido (opcional)
+            encoded: Si True, devuelve días desde 2000-01-01 para ColumnarBatch
+            trace: Traza de lectura del archivo, compartida por sus bloques (opcional)
+            
+        Returns:
+            Serie de datetime.date (NaT donde no hay fecha válida) o, con encoded,
+            tuple (días int32, máscara de nulos)
+            
+        Raises:
+            DateFormatMismatchError: si el bloque no sigue el formato fijado para el archivo
+        """
+        codes, uniques = pd.factorize(series, sort=False)
+        values = pd.Series(uniques, dtype=object)
+
+        file_formats = trace.setdefault('date_formats', {}) if trace is not None and cache_key else None
+        column = cache_key[-1] if cache_key else None
+
+        parsed = None
+        if formats and not values.empty and file_formats is not None and column in file_formats:
+            parsed = VoltageTransformer._parse_with_file_format(values, file_formats[column], column)
+        elif formats and not values.empty:
+            cached = VoltageTransformer._date_formats.get(cache_key) if cache_key is not None else None
+            candidates = list(formats)
+            if cached in candidates:
+                candidates.remove(cached)
+                candidates.insert(0, cached)
+
+            sample = values.iloc[:DATE_FORMAT_SAMPLE]
+            for date_format in candidates:
+                try:
+                    # La muestra descarta formatos imposibles sin recorrer todos los valores
+                    pd.to_datetime(sample, format=date_format)
+                    parsed = pd.to_datetime(values, format=date_format)
+                except (ValueError, TypeError):
+                    continue
+                if cache_key is not None and cached != date_format:
+                    VoltageTransformer._date_formats[cache_key] = date_format
+                    logger.debug(f"Formato de fecha inferido para {cache_key[-1]}: {date_format}")
+                if file_formats is not None:
+                    file_formats[column] = date_format
+                break
+
+        if parsed is None:
+            parsed = pd.to_datetime(values, errors='coerce')
+            if formats and cache_key is not None and not values.empty:
+                VoltageTransformer._date_formats[cache_key] = ''
+                if file_formats is not None:
+                    file_formats[column] = ''
+
+        # El código -1 (valor nulo) toma el NaT añadido al final
+        if encoded:
+            days, null_mask = encode_dates(parsed)
+            return np.append(days, 0)[codes], np.append(null_mask, True)[codes]
+        dates = np.append(parsed.dt.date.to_numpy(dtype=object), [pd.NaT])
+        return pd.Series(dates[codes], index=series.index, dtype=object)
+
+    @staticmethod
+    def _parse_with_file_format(values, date_format, column):
+        """
+        Aplica a un bloque el formato de fecha fijado por los bloques anteriores del
+        archivo ('' = parser automático), sin volver a inferirlo
+
+        Raises:
+            DateFormatMismatchError: si algún valor no sigue el formato
+        """
+        if not date_format:
+            return pd.to_datetime(values, errors='coerce')
+        try:
+            return pd.to_datetime(values, format=date_format)
+        except (ValueError, TypeError) as e:
+            raise DateFormatMismatchError(
+                f"Las fechas de {column} no siguen el formato {date_format} de los bloques anteriores: {e}"
+            ) from e
+
+    @staticmethod
+    def parse_time_value(time_str):
+        """
+        Convierte un texto HH:MM:SS(.fff) en hora del día, valor a valor
+        
+        Args:
+            time_str: Texto con la hora (p. ej. "07:20:00.050")
+            
+        Returns:
+            datetime.time o None si el texto no es una hora válida
+        """
+        try:
+            time_parts = time_str.split(':')
+            if len(time_parts) >= 3:
+                hours = int(time_parts[0])
+                minutes = int(time_parts[1])
+                # Manejar segundos con decimales
+                seconds_part = float(time_parts[2])
+                seconds = int(seconds_part)
+                microseconds = int((seconds_part - seconds) * 1000000)
+                
+                return pd.Timestamp(
+                    year=1900, month=1, day=1,
+                    hour=hours, minute=minutes, second=seconds, microsecond=microseconds
+                ).time()
+            return None
+        except Exception:
+            return None
+
+    @staticmethod
+    def parse_time_of_day(series, encoded=False):
+        """
+        Convierte una columna Time (UTC) en horas del día de forma vectorizada. Solo se
+        analizan los valores distintos: primero por posición de caracteres (HH:MM:SS y
+        fracción opcional), luego con una expresión regular para variantes con espacios
+        o un dígito, y los restantes con parse_time_value. Las fracciones de segundo se
+        truncan a microsegundos a partir de los dígitos, sin el redondeo binario de float.
+        
+        Args:
+            series: Serie con las horas (texto, datetime.time u otros valores)
+            encoded: Si True, devuelve microsegundos desde medianoche para ColumnarBatch
+            
+        Returns:
+            Serie de datetime.time (None donde el valor no es una hora válida) o, con
+            encoded, tuple (microsegundos int64, máscara de nulos)
+        """
+        codes, uniques = pd.factorize(series.astype(str), sort=False)
+        text = pd.Series(uniques, dtype=object)
+        count = len(text)
+
+        hours = np.full(count, np.nan)
+        minutes = np.full(count, np.nan)
+        seconds = np.full(count, np.nan)
+        microseconds = np.zeros(count)
+        matched = np.zeros(count, dtype=bool)
+
+        # Camino rápido: matriz de códigos de carácter sin recorrer valores en Python
+        fast = VoltageTransformer._parse_fixed_time_codes(text)
+        if fast is not None:
+            matched, fast_values = fast
+            for target, values in zip((hours, minutes, seconds, microseconds), fast_values):
+                target[matched] = values[matched]
+
+        pending = ~matched
+        if pending.any():
+            parts = text[pending].str.extract(TIME_OF_DAY_PATTERN)
+            hours[pending] = pd.to_numeric(parts[0], errors='coerce').to_numpy()
+            minutes[pending] = pd.to_numeric(parts[1], errors='coerce').to_numpy()
+            seconds[pending] = pd.to_numeric(parts[2], errors='coerce').to_numpy()
+            fraction = parts[3].fillna('').str.slice(0, 6).str.pad(6, side='right', fillchar='0')
+            microseconds[pending] = pd.to_numeric(fraction, errors='coerce').fillna(0).to_numpy()
+            matched[pending] = parts[0].notna().to_numpy()
+
+        with np.errstate(invalid='ignore'):
+            valid = matched & (hours < 24) & (minutes < 60) & (seconds < 60)
+            micros = (((hours * 60 + minutes) * 60 + seconds) * 1_000_000 + microseconds)
+        micros = np.where(valid, micros, 0).astype(np.int64)
+
+        # Formatos no reconocidos: mismo criterio que el parser valor a valor
+        unmatched = ~matched
+        fallback = text[unmatched].map(VoltageTransformer.parse_time_value) if unmatched.any() else None
+
+        # El código -1 (valor nulo, que astype(str) conserva como nulo) toma el valor añadido al final
+        if encoded:
+            null_mask = ~valid
+            if fallback is not None:
+                micros[unmatched], null_mask[unmatched] = encode_times(fallback)
+            return np.append(micros, 0)[codes], np.append(null_mask, True)[codes]
+
+        parsed = np.full(count, None, dtype=object)
+        if valid.any():
+            times = TIME_OF_DAY_BASE + pd.to_timedelta(pd.Series(micros[valid]), unit='us')
+            parsed[valid] = times.dt.time.to_numpy()
+        if fallback is not None:
+            parsed[unmatched] = fallback.to_numpy()
+
+        parsed = np.append(parsed, np.array([None], dtype=object))
+        return pd.Series(parsed[codes], index=series.index, dtype=object)
+
+    @staticmethod
+    def _parse_fixed_time_codes(text):
+        """
+        Interpreta HH:MM:SS y HH:MM:SS.f... por posición sobre los códigos de carácter
+        
+        Args:
+            text: Serie de textos distintos
+            
+        Returns:
+            tuple: (máscara de valores con ese formato, (horas, minutos, segundos,
+                   microsegundos) como arrays) o None si no aplica
+        """
+        if text.empty:
+            return None
+        chars = np.array(text.to_numpy(), dtype=str)
+        width = chars.dtype.itemsize // 4
+        if width < 8 or width > MAX_FIXED_TIME_WIDTH:
+            return None
+
+        # Cada carácter como código Unicode; los textos cortos quedan rellenos con 0
+        grid = chars.view(np.uint32).reshape(len(chars), width).astype(np.int32)
+        digits = grid - ord('0')
+        is_digit = (digits >= 0) & (digits <= 9)
+
+        mask = (is_digit[:, [0, 1, 3, 4, 6, 7]].all(axis=1)
+                & (grid[:, 2] == ord(':')) & (grid[:, 5] == ord(':')))
+
+        microseconds = np.zeros(len(chars), dtype=np.int64)
+        if width > 8:
+            tail = grid[:, 9:]
+            ended = np.cumsum(tail == 0, axis=1) > 0
+            fraction_ok = np.where(ended, tail == 0, is_digit[:, 9:]).all(axis=1)
+            whole = grid[:, 8] == 0
+            mask &= (whole & (tail == 0).all(axis=1)) | ((grid[:, 8] == ord('.')) & fraction_ok)
+
+            fraction = np.where(is_digit[:, 9:15], digits[:, 9:15], 0)
+            scale = 10 ** np.arange(5, 5 - fraction.shape[1], -1)
+            microseconds = (fraction * scale).sum(axis=1)
+
+        hours = digits[:, 0] * 10 + digits[:, 1]
+        minutes = digits[:, 3] * 10 + digits[:, 4]
+        seconds = digits[:, 6] * 10 + digits[:, 7]
+        return mask, (hours, minutes, seconds, microseconds)
+
+    @staticmethod
+    def convert_numeric_columns(df, source_columns):
+        """
+        Convierte a números las columnas de medición en una sola pasada. Las columnas
+        ya numéricas (leídas con decimal en el parser) se devuelven tal cual; las de
+        texto se unen en una serie, se cambia ',' por '.' y se convierten juntas. Solo
+        los valores que no quedan como número finito pasan por la extracción con
+        regex del parser anterior, así que los resultados y los NaN son los mismos.
+
+        Args:
+            df: DataFrame de origen
+            source_columns: Nombres de columnas de origen (None se ignora)
+
+        Returns:
+            dict: {columna de origen: Serie numérica o None si no se pudo convertir}
+        """
+        converted = {}
+        text_columns = []
+        for source_col in dict.fromkeys(source_columns):
+            if source_col is None or source_col in converted or source_col not in df.columns:
+                continue
+            if df[source_col].dtype == object:
+                text_columns.append(source_col)
+            else:
+                converted[source_col] = df[source_col]
+
+        if not text_columns:
+            return converted
+
+        try:
+            original = df[text_columns].to_numpy(dtype=object).ravel(order='F')
+            values = pd.Series(original).astype(str).str.replace(',', '.', regex=False)
+            numeric = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64)
+
+            # NaN de texto no nulo, inf y variantes como '230 V' o '1e' requieren la regex
+            residue = ~np.isfinite(numeric) & pd.notna(original)
+            if residue.any():
+                extracted = values[residue].str.extract(NUMERIC_VALUE_PATTERN)[0]
+                numeric[residue] = pd.to_numeric(extracted, errors='coerce').to_numpy(dtype=np.float64)
+
+            if logger.isEnabledFor(logging.DEBUG):
+                scientific = values.str.contains(SCIENTIFIC_NOTATION_PATTERN, na=False, regex=True)
+                counts = scientific.to_numpy().reshape(len(text_columns), len(df)).sum(axis=1)
+                for source_col, count in zip(text_columns, counts):
+                    if count:
+                        logger.debug(f"Valores en notación científica encontrados en columna {source_col}: {count} valores")
+
+            for position, source_col in enumerate(text_columns):
+                block = numeric[position * len(df):(position + 1) * len(df)]
+                converted[source_col] = pd.Series(block, index=df.index, name=source_col)
+        except Exception as e:
+            logger.debug(f"Error en la conversión conjunta de columnas, se convierten por separado: {e}")
+            for source_col in text_columns:
+                converted[source_col] = VoltageTransformer.convert_to_numeric(df, source_col)
+
+        return converted
+
     @staticmethod
-    def transform(data):
+    def convert_to_numeric(df, source_col):
+        """
+        Convierte una columna a números extrayendo el valor con regex
+
+        Args:
+            df: DataFrame de origen
+            source_col: Nombre de la columna
+
+        Returns:
+            Serie numérica, la columna original si ya es numérica o None
+        """
+        if source_col is None:
+            return None
+
+        try:
+            if df[source_col].dtype == object:  # Si es string
+                values_series = df[source_col].astype(str)
+                values_series = values_series.str.replace(',', '.')
+                values = values_series.str.extract(NUMERIC_VALUE_PATTERN)[0]
+                return pd.to_numeric(values, errors='coerce')
+            else:
+                return df[source_col]
+        except Exception as e:
+            logger.debug(f"Error al transformar columna {source_col}: {e}")
+            return None
+
+    @staticmethod
+    def _build_batch(transformed, n_rows):
+        """
+        Arma el ColumnarBatch a partir de las columnas codificadas por transform
+
+        Args:
+            transformed: {campo: tuple codificada, Serie numérica, escalar o None}
+            n_rows: Filas del lote
+
+        Returns:
+            ColumnarBatch
+        """
+        def encoded_or_null(value, dtype):
+            if value is None:
+                return np.zeros(n_rows, dtype=dtype), np.ones(n_rows, dtype=bool)
+            return value
+
+        measurements = {field: transformed[field] for field in MEASUREMENT_FIELDS
+                        if np.ndim(transformed.get(field))}
+        # Se conserva float32 si el parser leyó todas las mediciones con ese tipo
+        single = measurements and all(getattr(values, 'dtype', None) == np.float32
+                                      for values in measurements.values())
+        return ColumnarBatch(
+            measurements,
+            {field: encoded_or_null(transformed.get(field), np.int32) for field in DATE_FIELDS},
+            {field: encoded_or_null(transformed.get(field), np.int64) for field in TIME_FIELDS},
+            utc_zone=transformed.get('utc_zone'),
+            float_dtype=np.float32 if single else np.float64
+        )
+
+    @staticmethod
+    def transform(data, columnar=False):
         """
         Transforma los datos de voltaje al formato requerido
         
         Args:
             data: DataFrame con los datos extraídos
+            columnar: Si True, devuelve un ColumnarBatch (fechas y horas como enteros)
+                      en lugar del DataFrame con objetos date y time
             
         Returns:
-            DataFrame transformado
+            DataFrame transformado o ColumnarBatch
         """
         if data is None or data.empty:
             logger.error("No hay datos para transformar")
             return None
         
         try:
-            # Copia para no modificar el original
-            df = data.copy()
+            # El original solo se lee, no hace falta copiarlo
+            df = data
             
-            # Identificar columnas usando la función mejorada
-            valid, column_map = validate_voltage_columns(df)
-            if not valid or not column_map:
+            # Columnas de origen, fecha combinada, zona UTC y mapas de mediciones: se
+            # resuelven una vez por formato de encabezado y se reutilizan entre archivos
+            plan = transform_plans.get(df)
+            if plan is None:
                 logger.error("No se pudieron identificar las columnas necesarias para la transformación")
                 return None
             
-            # Crear nuevo DataFrame con las columnas requeridas
-            transformed_df = pd.DataFrame()
+            # Columnas del resultado; con columnar, fechas y horas quedan codificadas
+            transformed = {}
+            
+            def as_dates(values):
+                return encode_dates(values) if columnar else values.dt.date
             
             # Convertir columna de tiempo
-            time_col = column_map.get('time')
+            time_col = plan.time_col
             if time_col:
                 try:
                     # Manejar posibles formatos de fecha/hora combinados
                     if df[time_col].dtype == object:
-                        # Comprobar si hay columnas separadas para fecha y hora
-                        date_col = None
-                        for col in df.columns:
-                            if re.search(r'(?i)fecha|date', col) and col != time_col:
-                                date_col = col
-                                break
-                        
-                        if date_col and re.search(r'(?i)hora|time', time_col):
+                        if plan.combine_date_col:
                             # Combinar fecha y hora si están separadas, pero extraer solo la fecha
-                            date_time = df[date_col].astype(str) + ' ' + df[time_col].astype(str)
-                            full_datetime = pd.to_datetime(date_time, errors='coerce')
+                            date_time = df[plan.combine_date_col].astype(str) + ' ' + df[time_col].astype(str)
                             # MODIFICACIÓN: Extraer solo la fecha sin componente horario
-                            transformed_df['tiempo_utc'] = full_datetime.dt.date
+                            transformed['tiempo_utc'] = VoltageTransformer.parse_dates(date_time, encoded=columnar)
                         else:
-                            # Intentar diferentes formatos de fecha/hora
-                            datetime_parsed = None
-                            for date_format in ['%Y-%m-%d %H:%M:%S', '%d/%m/%Y %H:%M:%S', '%m/%d/%Y %H:%M:%S', 
-                                            '%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y']:
-                                try:
-                                    datetime_parsed = pd.to_datetime(df[time_col], format=date_format)
-                                    break
-                                except:
-                                    continue
-                            
-                            # Si los formatos anteriores fallan, usar el parser automático
-                            if datetime_parsed is None:
-                                datetime_parsed = pd.to_datetime(df[time_col], errors='coerce')
-                            
+                            # Formato inferido una vez por encabezado y aplicado a los valores distintos
                             # MODIFICACIÓN: Extraer solo la fecha sin componente horario
-                            transformed_df['tiempo_utc'] = datetime_parsed.dt.date
+                            # El formato queda fijado en parse_info para los demás bloques del archivo
+                            transformed['tiempo_utc'] = VoltageTransformer.parse_dates(
+                                df[time_col], DATE_FORMATS, (VoltageTransformer._header_signature(df), time_col),
+                                encoded=columnar, trace=df.attrs.get('parse_info'))
                     else:
                         # Probablemente ya es datetime
                         datetime_parsed = df[time_col]
                         # MODIFICACIÓN: Extraer solo la fecha sin componente horario
-                        transformed_df['tiempo_utc'] = datetime_parsed.dt.date
+                        transformed['tiempo_utc'] = as_dates(datetime_parsed)
+                except DateFormatMismatchError:
+                    # Otro formato en el mismo archivo daría fechas inconsistentes: el archivo falla
+                    raise
                 except Exception as e:
                     logger.error(f"Error al convertir columna de tiempo: {e}")
                     # Usar el valor original como fallback, pero intentar extraer solo fecha
                     try:
                         datetime_fallback = pd.to_datetime(df[time_col], errors='coerce')
-                        transformed_df['tiempo_utc'] = datetime_fallback.dt.date
+                        transformed['tiempo_utc'] = as_dates(datetime_fallback)
                     except:
-                        transformed_df['tiempo_utc'] = df[time_col]
+                        transformed['tiempo_utc'] = None if columnar else df[time_col]
             else:
                 logger.error("No se encontró columna de tiempo para la transformación")
                 return None
 
-            date_col = column_map.get('date')
+            date_col = plan.date_col
             if date_col:
                 try:
-                    date_parsed = pd.to_datetime(df[date_col], errors='coerce')
                     # MODIFICACIÓN: Usar solo la fecha sin componente horario
-                    transformed_df['date_field'] = date_parsed.dt.date
+                    transformed['date_field'] = VoltageTransformer.parse_dates(df[date_col], encoded=columnar)
                 except Exception as e:
                     logger.warning(f"Error al procesar campo Date: {e}")
-                    transformed_df['date_field'] = None
+                    transformed['date_field'] = None
             else:
-                transformed_df['date_field'] = None
+                transformed['date_field'] = None
             
-            time_utc_col = column_map.get('time_utc') or column_map.get('time_utc5')
-            utc_zone = None
-
+            time_utc_col = plan.time_utc_col
             if time_utc_col:
                 try:
-                    # Extraer la zona UTC del nombre de la columna
-                    utc_zone_match = re.search(r'utc([+-]\d+)', time_utc_col.lower())
-                    if utc_zone_match:
-                        utc_zone = f"UTC{utc_zone_match.group(1)}"
-                    else:
-                        # Valor por defecto si no se puede extraer
-                        utc_zone = "UTC-5"
-                    
                     # Procesar tiempo UTC, puede venir como string con formato HH:MM:SS.mmm
-                    time_series = df[time_utc_col].astype(str)
-                    
-                    # Intentar convertir a tiempo
-                    def parse_time(time_str):
-                        try:
-                            # Manejar formatos como "07:20:00.050"
-                            time_parts = time_str.split(':')
-                            if len(time_parts) >= 3:
-                                hours = int(time_parts[0])
-                                minutes = int(time_parts[1])
-                                # Manejar segundos con decimales
-                                seconds_part = float(time_parts[2])
-                                seconds = int(seconds_part)
-                                microseconds = int((seconds_part - seconds) * 1000000)
-                                
-                                return pd.Timestamp(
-                                    year=1900, month=1, day=1,
-                                    hour=hours, minute=minutes, second=seconds, microsecond=microseconds
-                                ).time()
-                            return None
-                        except:
-                            return None
-                    
-                    transformed_df['time'] = time_series.apply(parse_time)
-                    transformed_df['utc_zone'] = utc_zone
+                    transformed['time'] = VoltageTransformer.parse_time_of_day(df[time_utc_col], encoded=columnar)
+                    transformed['utc_zone'] = plan.utc_zone
                 except Exception as e:
                     logger.warning(f"Error al procesar campo Time UTC: {e}")
-                    transformed_df['time'] = None
-                    transformed_df['utc_zone'] = None
+                    transformed['time'] = None
+                    transformed['utc_zone'] = None
             else:
                 logger.info("No se encontró columna Time UTC separada")
-                transformed_df['time'] = None
-                transformed_df['utc_zone'] = None
+                transformed['time'] = None
+                transformed['utc_zone'] = None
             
-            # Función auxiliar para convertir valores a numéricos
-            def convert_to_numeric(df, source_col):
-                if source_col is None:
-                    return None
-                
-                try:
-                    if df[source_col].dtype == object:  # Si es string
-                        values_series = df[source_col].astype(str)
-                        values_series = values_series.str.replace(',', '.')
-                        pattern = r'(-?[\d\.]+(?:[eE][+-]?\d+)?)'
-                        values = values_series.str.extract(pattern)[0]
-                        numeric_values = pd.to_numeric(values, errors='coerce')
-                        
-                        scientific_notation = values_series[values_series.str.contains(r'[eE][+-]?\d+', na=False, regex=True)]
-                        if not scientific_notation.empty:
-                            logger.debug(f"Valores en notación científica encontrados en columna {source_col}: {len(scientific_notation)} valores")
-                        
-                        return numeric_values
-                    else:
-                        return df[source_col]
-                except Exception as e:
-                    logger.debug(f"Error al transformar columna {source_col}: {e}")
-                    return None
-
-            # Convertir columnas de voltaje
-            voltage_columns = {
-                'u_l1_avg': column_map.get('u_l1'),
-                'u_l2_avg': column_map.get('u_l2'),
-                'u_l3_avg': column_map.get('u_l3'),
-                'u_l12_avg': column_map.get('u_l12')
-            }
-            
-            for target_col, source_col in voltage_columns.items():
-                transformed_df[target_col] = convert_to_numeric(df, source_col)
-            
-            # Agregar columnas para corriente
-            current_columns = {
-                'i_l1_avg': column_map.get('i_l1'),
-                'i_l2_avg': column_map.get('i_l2')
-            }
-            
-            for target_col, source_col in current_columns.items():
-                transformed_df[target_col] = convert_to_numeric(df, source_col)
-            
-            # Agregar columnas para potencia
-            power_columns = {
-                'p_l1_avg': column_map.get('p_l1'),
-                'p_l2_avg': column_map.get('p_l2'),
-                'p_l3_avg': column_map.get('p_l3'),
-                'p_e_avg': column_map.get('p_e'),
-                'q1_l1_avg': column_map.get('q1_l1'),
-                'q1_l2_avg': column_map.get('q1_l2'),
-                'q1_e_avg': column_map.get('q1_e'),
-                'sn_l1_avg': column_map.get('sn_l1'),
-                'sn_l2_avg': column_map.get('sn_l2'),
-                'sn_e_avg': column_map.get('sn_e'),
-                's_l1_avg': column_map.get('s_l1'),
-                's_l2_avg': column_map.get('s_l2'),
-                's_e_avg': column_map.get('s_e')
-            }
-            
-            for target_col, source_col in power_columns.items():
-                transformed_df[target_col] = convert_to_numeric(df, source_col)
+            # Todas las mediciones se convierten juntas
+            numeric_columns = VoltageTransformer.convert_numeric_columns(df, plan.measurement_sources)
+            
+            for target_col, source_col in {**plan.voltage_columns, **plan.current_columns}.items():
+                transformed[target_col] = numeric_columns.get(source_col)
+            
+            for target_col, source_col in plan.power_columns.items():
+                transformed[target_col] = numeric_columns.get(source_col)
                 
                 # Si la columna no se encontró o está vacía, asegurar que existe con valores NaN
-                if target_col not in transformed_df.columns or transformed_df[target_col].isnull().all():
-                    transformed_df[target_col] = np.nan
+                if transformed[target_col] is None or transformed[target_col].isnull().all():
+                    transformed[target_col] = np.nan
                     logger.debug(f"Columna {target_col} no encontrada, establecida como NaN")
             
             # Verificar que las columnas de potencia existan y tengan valores
-            power_cols_present = [col for col in power_columns.keys() if col in transformed_df.columns]
+            power_cols_present = [col for col in plan.power_columns.keys() if col in transformed]
             if power_cols_present:
-                has_power_data = any(not transformed_df[col].isnull().all() for col in power_cols_present)
+                has_power_data = any(np.ndim(transformed[col]) and not transformed[col].isnull().all()
+                                     for col in power_cols_present)
                 if has_power_data:
                     logger.info("Se han encontrado datos de potencia en el archivo")
                 else:
                     logger.warning("Las columnas de potencia existen pero no contienen datos")
             else:
                 logger.warning("No se encontraron columnas de potencia en el archivo")
-            return transformed_df
+            if columnar:
+                return VoltageTransformer._build_batch(transformed, len(df))
+            return pd.DataFrame(transformed, index=df.index)
             
         except Exception as e:
             logger.error(f"Error durante la transformación de datos: {e}")
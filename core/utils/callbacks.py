@@ -23,6 +23,7 @@ class ProcessingEventType(Enum):
     PHASE_STARTED = "phase_started"
     PHASE_COMPLETED = "phase_completed"
     PROGRESS_UPDATE = "progress_update"
+    STAGE_UPDATE = "stage_update"
     PROCESS_COMPLETED = "process_completed"
     PROCESS_FAILED = "process_failed"
 
@@ -138,6 +139,10 @@ class ProcessingCallbackManager:
         # Métricas
         self.total_records_processed = 0
         
+        # Etapas del procesamiento concurrente (tiempo ocupado y cola máxima por etapa)
+        self.stages = {}
+        self.queue_depths = {}
+        
     def register_callback(self, callback: Callable[[ProcessingEvent], None]):
         """Registra un callback para recibir eventos"""
         if callback not in self.callbacks:
@@ -228,6 +233,10 @@ class ProcessingCallbackManager:
                 self.phases[phase_name]['status'] = 'completed'
                 self.phases[phase_name]['files_processed'] = data.get('files_processed', 0)
                 
+        elif event_type == ProcessingEventType.STAGE_UPDATE:
+            self.stages = data.get('stages', {})
+            self.queue_depths = data.get('queue_depths', {})
+            
         elif event_type == ProcessingEventType.PROCESS_COMPLETED:
             self.end_time = event.timestamp
             self._generate_summary_file()
@@ -371,5 +380,7 @@ class ProcessingCallbackManager:
             'failed_files': self.failed_files,
             'progress_percentage': progress_percentage,
             'current_phase': self.current_phase,
+            'stages': self.stages,
+            'queue_depths': self.queue_depths,
             'elapsed_time': (datetime.now() - self.start_time).total_seconds() if self.start_time else 0
         }
\ No newline at end of file
@@ -0,0 +1,164 @@
+#sonel_extractor/utils/column_matcher.py
+import re
+import threading
+from collections import OrderedDict
+from config.logger import logger
+from config.settings import COLUMN_PATTERNS
+
+# Orden de resolución: los campos de tiempo primero y Sn antes que S para no confundirlos
+ORDERED_FIELDS = [
+    'time', 'date', 'time_utc', 'utc_zone',  # Campos de tiempo
+    'u_l1', 'u_l2', 'u_l3', 'u_l12',        # Voltajes
+    'i_l1', 'i_l2',                          # Corrientes
+    'p_l1', 'p_l2', 'p_l3', 'p_e',          # Potencia activa
+    'q1_l1', 'q1_l2', 'q1_e',               # Potencia reactiva
+    'sn_l1', 'sn_l2', 'sn_e',               # Potencia aparente compleja (procesar antes que S)
+    's_l1', 's_l2', 's_e'                   # Potencia aparente (procesar después)
+]
+
+APPARENT_POWER_FIELDS = ('s_l1', 's_l2', 's_e')
+COMPLEX_POWER_FIELDS = ('sn_l1', 'sn_l2', 'sn_e')
+COMPLEX_POWER_COLUMN = re.compile(r'(?i)sn\s')
+
+# Patrones genéricos para time_utc con cualquier zona (compatibilidad con time_utc5)
+TIME_UTC_FALLBACK_PATTERNS = [
+    re.compile(r'(?i)(time|tiempo)\s*\(utc[+-]?\d+\)'),
+    re.compile(r'(?i)(time|tiempo).*utc.*[+-]?\d*')
+]
+
+# Encabezados distintos recordados por proceso
+MAX_CACHED_HEADERS = 256
+
+
+class ColumnMatcher:
+    """Resolución de columnas estándar con patrones compilados una vez y resultados por encabezado"""
+
+    def __init__(self, patterns=None, max_entries=MAX_CACHED_HEADERS):
+        """
+        Compila los patrones de columnas
+
+        Args:
+            patterns: Diccionario {campo estándar: regex} (por defecto COLUMN_PATTERNS)
+            max_entries: Encabezados distintos que se recuerdan
+        """
+        patterns = COLUMN_PATTERNS if patterns is None else patterns
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        # Cada patrón lleva sus propias banderas en línea y una columna puede coincidir
+        # con varios, así que se compilan por separado en lugar de en una alternancia
+        self._compiled = []
+        for field in ORDERED_FIELDS:
+            if field not in patterns:
+                continue
+            try:
+                self._compiled.append((field, re.compile(patterns[field])))
+            except re.error as e:
+                logger.warning(f"Error en regex para patrón '{field}': {e}")
+
+    def match(self, columns):
+        """
+        Resuelve el mapeo de columnas de un encabezado; encabezados repetidos se
+        responden desde la caché sin evaluar expresiones regulares
+
+        Args:
+            columns: Nombres de columnas del encabezado
+
+        Returns:
+            tuple: (bool, dict) - Validez del encabezado y mapeo de columnas encontradas
+        """
+        key = tuple(str(col) for col in columns)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached[0], dict(cached[1])
+
+        valid, mapping = self._resolve(key)
+
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = (valid, mapping)
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+        # El mapeo se informa una sola vez por encabezado distinto
+        for field, column in mapping.items():
+            logger.info(f"  {field} -> {column}")
+        if valid:
+            found_types = [name for name, found in self._essential_found(mapping).items() if found]
+            logger.info(f"Se encontraron las medidas esenciales: {found_types}")
+        return valid, dict(mapping)
+
+    def _resolve(self, columns):
+        """
+        Aplica los patrones en orden sobre el encabezado
+
+        Args:
+            columns: Tupla de nombres de columnas
+
+        Returns:
+            tuple: (bool, dict) - Validez y mapeo de columnas
+        """
+        mapping = {}
+        for field, pattern in self._compiled:
+            matched = [col for col in columns if pattern.search(col)]
+            if not matched:
+                continue
+
+            if field in APPARENT_POWER_FIELDS:
+                # Para potencia aparente S, no tomar columnas ya asignadas a Sn ni que contengan "Sn"
+                assigned_sn = {mapping.get(sn_field) for sn_field in COMPLEX_POWER_FIELDS}
+                matched = [col for col in matched
+                           if col not in assigned_sn and not COMPLEX_POWER_COLUMN.search(col)]
+                if not matched:
+                    continue
+            mapping[field] = matched[0]
+
+        if 'time_utc' not in mapping:
+            for pattern in TIME_UTC_FALLBACK_PATTERNS:
+                matched = [col for col in columns if pattern.search(col)]
+                if matched:
+                    mapping['time_utc'] = matched[0]
+                    break
+
+        logger.debug(f"Encabezado de {len(columns)} columnas resuelto: {mapping}")
+
+        # Requerir al menos tiempo y alguna medida eléctrica (voltaje, corriente o potencia)
+        essential = self._essential_found(mapping)
+        valid = essential['time_found'] and (
+            essential['voltage_found'] or essential['current_found'] or essential['power_found'])
+        return valid, mapping
+
+    @staticmethod
+    def _essential_found(mapping):
+        """Grupos de medidas esenciales presentes en el mapeo"""
+        return {
+            'time_found': any(key in mapping for key in ['time', 'date', 'time_utc']),
+            'voltage_found': any(key in mapping for key in ['u_l1', 'u_l2', 'u_l3']),
+            'current_found': any(key in mapping for key in ['i_l1', 'i_l2']),
+            'power_found': any(key in mapping for key in ['p_l1', 'p_l2', 'p_l3', 'p_e'])
+        }
+
+    def stats(self):
+        """
+        Estadísticas de la caché de encabezados
+
+        Returns:
+            dict: Aciertos, fallos y encabezados recordados
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'cached_headers': len(self._cache)}
+
+    def clear(self):
+        """Olvida los encabezados resueltos (p. ej. tras cambiar COLUMN_PATTERNS)"""
+        with self._lock:
+            self._cache.clear()
+
+
+# Instancia compartida por el parser, el transformador y los validadores
+column_matcher = ColumnMatcher()
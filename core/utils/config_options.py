@@ -0,0 +1,73 @@
+#sonel_extractor/utils/config_options.py
+import os
+
+
+def get_config_option(config, section, key, default=None):
+    """
+    Obtiene una opción de configuración aceptando ConfigParser o diccionario.
+    Las variables de entorno SONEL_<SECCION>_<CLAVE> tienen prioridad.
+
+    Args:
+        config: Objeto ConfigParser, diccionario o None
+        section: Sección del archivo de configuración (ej. 'DATABASE')
+        key: Clave dentro de la sección
+        default: Valor por defecto si la opción no existe o está vacía
+
+    Returns:
+        str: Valor de la opción (sin espacios) o el valor por defecto
+    """
+    env_value = os.getenv(f"SONEL_{section}_{key}".upper())
+    if env_value and env_value.strip():
+        return env_value.strip()
+
+    value = None
+    try:
+        if config is not None and section in config and key in config[section]:
+            value = config[section][key]
+    except Exception:
+        value = None
+
+    if value is None or not str(value).strip():
+        return default
+    return str(value).strip()
+
+
+def get_config_int(config, section, key, default):
+    """
+    Obtiene una opción entera de la configuración
+
+    Returns:
+        int: Valor convertido o el valor por defecto si no es válido
+    """
+    value = get_config_option(config, section, key)
+    try:
+        return int(value) if value is not None else default
+    except (TypeError, ValueError):
+        return default
+
+
+def get_config_float(config, section, key, default):
+    """
+    Obtiene una opción numérica (float) de la configuración
+
+    Returns:
+        float: Valor convertido o el valor por defecto si no es válido
+    """
+    value = get_config_option(config, section, key)
+    try:
+        return float(value) if value is not None else default
+    except (TypeError, ValueError):
+        return default
+
+
+def get_config_bool(config, section, key, default=False):
+    """
+    Obtiene una opción booleana de la configuración
+
+    Returns:
+        bool: True para 'true', '1', 'yes', 'si', 'on'; el valor por defecto si no existe
+    """
+    value = get_config_option(config, section, key)
+    if value is None:
+        return default
+    return value.lower() in ('true', '1', 'yes', 'si', 'sí', 'on')
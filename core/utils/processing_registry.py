@@ -387,6 +387,25 @@ class ProcessingRegistry:
         batch_data = self.registry_data.get("batch_processing", {})
         return batch_data.get("total_time_seconds", 0)
 
+    def register_layout_cache_stats(self, stats: Dict):
+        """
+        Registra los aciertos y fallos de la caché de formatos CSV
+        
+        Args:
+            stats: Estadísticas devueltas por LayoutCache.stats()
+        """
+        self.registry_data["layout_cache"] = dict(stats, updated_at=datetime.now().isoformat())
+        self._save_registry()
+    
+    def get_layout_cache_stats(self) -> Dict:
+        """
+        Obtiene las estadísticas de la caché de formatos CSV
+        
+        Returns:
+            dict: Estadísticas o diccionario vacío si no están disponibles
+        """
+        return self.registry_data.get("layout_cache", {})
+    
     def get_batch_processing_info(self) -> Dict:
         """
         Obtiene información completa del procesamiento del batch
@@ -4,11 +4,13 @@ import os
 import time
 import hashlib
 from config.logger import logger
-from config.settings import COLUMN_PATTERNS
+from core.utils.column_matcher import column_matcher
 
 def validate_voltage_columns(df):
     """
-    Verifica que el DataFrame contenga las columnas necesarias o similares
+    Verifica que el DataFrame contenga las columnas necesarias o similares.
+    El mapeo se resuelve con el ColumnMatcher compartido, que recuerda cada
+    encabezado ya visto.
     Args:
         df: DataFrame a validar
 
@@ -17,102 +19,7 @@ def validate_voltage_columns(df):
     """
     # Convertir todos los nombres de columnas a string para evitar errores con enteros
     df.columns = df.columns.astype(str)
-
-    # Log de las columnas originales para debug
-    logger.debug("Columnas originales encontradas:")
-    for i, col in enumerate(df.columns):
-        logger.debug(f"  [{i}]: '{col}' (len: {len(col)})")
-
-    # Mapeo de nombres de columnas estándar a nombres encontrados
-    column_mapping = {}
-
-    # Procesar patrones en orden específico para evitar conflictos
-    ordered_patterns = [
-        'time', 'date', 'time_utc', 'utc_zone',  # Campos de tiempo
-        'u_l1', 'u_l2', 'u_l3', 'u_l12',        # Voltajes
-        'i_l1', 'i_l2',                          # Corrientes
-        'p_l1', 'p_l2', 'p_l3', 'p_e',          # Potencia activa
-        'q1_l1', 'q1_l2', 'q1_e',               # Potencia reactiva
-        'sn_l1', 'sn_l2', 'sn_e',               # Potencia aparente compleja (procesar antes que S)
-        's_l1', 's_l2', 's_e'                   # Potencia aparente (procesar después)
-    ]
-
-    for std_name in ordered_patterns:
-        if std_name in COLUMN_PATTERNS:
-            pattern = COLUMN_PATTERNS[std_name]
-            
-            # Buscar todas las columnas que coinciden con el patrón
-            matched = []
-            for col in df.columns:
-                try:
-                    if re.search(pattern, col):
-                        matched.append(col)
-                        logger.debug(f"Patrón '{std_name}' coincide con columna: '{col}'")
-                except re.error as e:
-                    logger.warning(f"Error en regex para patrón '{std_name}': {e}")
-                    continue
-            
-            if matched:
-                # Para potencia aparente S, asegurarnos de no tomar columnas Sn
-                if std_name in ['s_l1', 's_l2', 's_e']:
-                    # Filtrar columnas que contengan "Sn" (potencia aparente compleja)
-                    filtered_matches = []
-                    for col in matched:
-                        # Verificar que no sea una columna ya asignada a Sn
-                        if not any(col == column_mapping.get(sn_key) for sn_key in ['sn_l1', 'sn_l2', 'sn_e']):
-                            # Verificar que no contenga "Sn" explícitamente
-                            if not re.search(r'(?i)sn\s', col):
-                                filtered_matches.append(col)
-                    
-                    if filtered_matches:
-                        column_mapping[std_name] = filtered_matches[0]
-                        logger.debug(f"Columna {std_name} mapeada a: {filtered_matches[0]} (filtrada de Sn)")
-                    else:
-                        logger.debug(f"No se encontró columna válida para {std_name} después del filtrado")
-                else:
-                    column_mapping[std_name] = matched[0]
-                    logger.debug(f"Columna {std_name} mapeada a: {matched[0]}")
-            else:
-                logger.debug(f"No se encontró columna que coincida con patrón {std_name}: {pattern}")
-    
-    # Manejar compatibilidad con time_utc5 y variaciones UTC (mapear a time_utc si existe)
-    if 'time_utc' not in column_mapping:
-        # Buscar usando patrones más amplios para compatibilidad con diferentes zonas UTC
-        time_utc_patterns = [
-            r'(?i)(time|tiempo)\s*\(utc[+-]?\d+\)',  # UTC con cualquier número
-            r'(?i)(time|tiempo).*utc.*[+-]?\d*'       # Patrón más flexible
-        ]
-        
-        for pattern in time_utc_patterns:
-            matched = [col for col in df.columns if re.search(pattern, col)]
-            if matched:
-                column_mapping['time_utc'] = matched[0]
-                logger.debug(f"Columna time_utc mapeada desde patrón UTC genérico: {matched[0]}")
-                break
-
-    # Log del mapeo final para debug
-    for key, value in column_mapping.items():
-        logger.info(f"  {key} -> {value}")
-
-    # Verificar columnas requeridas mínimas (tiempo y al menos algunos valores eléctricos)
-    # Flexibilizar los requerimientos para manejar mejor archivos con diferentes estructuras
-    essential_patterns = {
-        'time_found': any(key in column_mapping for key in ['time', 'date', 'time_utc']),
-        'voltage_found': any(key in column_mapping for key in ['u_l1', 'u_l2', 'u_l3']),
-        'current_found': any(key in column_mapping for key in ['i_l1', 'i_l2']),
-        'power_found': any(key in column_mapping for key in ['p_l1', 'p_l2', 'p_l3', 'p_e'])
-    }
-    
-    # Requerir al menos tiempo y alguna medida eléctrica (voltaje, corriente o potencia)
-    if (essential_patterns['time_found'] and 
-        (essential_patterns['voltage_found'] or essential_patterns['current_found'] or essential_patterns['power_found'])):
-        
-        found_types = [k for k, v in essential_patterns.items() if v]
-        logger.info(f"Se encontraron las medidas esenciales: {found_types}")
-        return True, column_mapping
-    
-    # Si no se encuentran las columnas mínimas, devolver False
-    return False, column_mapping
+    return column_matcher.match(df.columns)
 
 def find_column(df, pattern):
     """
@@ -127,6 +34,26 @@ def find_column(df, pattern):
     matches = [col for col in df.columns if re.search(pattern, col)]
     return matches[0] if matches else None
 
+def compute_file_hash(file_path):
+    """
+    Calcula el hash MD5 del contenido de un archivo (mismo criterio que el registro de procesamiento)
+    
+    Args:
+        file_path: Ruta al archivo
+        
+    Returns:
+        str: Hash MD5 en hexadecimal o cadena vacía si no se pudo leer
+    """
+    try:
+        hash_md5 = hashlib.md5()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                hash_md5.update(chunk)
+        return hash_md5.hexdigest()
+    except (IOError, OSError) as e:
+        logger.error(f"Error al calcular hash de {file_path}: {e}")
+        return ""
+
 def generate_unique_code():
     """
     Genera un código único de 10 dígitos basado en timestamp actual y un componente aleatorio
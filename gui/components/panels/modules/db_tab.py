@@ -1,6 +1,7 @@
 import os
 import csv
 import json
+import threading
 from PyQt5.QtCore import Qt
 from datetime import datetime
 from gui.utils.ui_helper import UIHelpers
@@ -15,6 +16,9 @@ class DbTab(QWidget):
         self.parent_app = parent
         self.setObjectName("DbTab")
         self.json_file_path = ".\\exports\\resumen_etl.json"
+        # Evento de cancelación de la exportación en curso (None si no hay exportación)
+        self._export_cancel_event = None
+        self._active_export_button = None
         
         try:
             self.controller = SonelController()
@@ -61,7 +65,13 @@ class DbTab(QWidget):
         self.export_csv_button.clicked.connect(self.confirm_export_table_to_csv)
         self.export_csv_button.setToolTip("Exportar todos los registros de mediciones_planas a archivo CSV")
         
+        self.export_delta_button = QPushButton("🔁 Exportar Registros Nuevos (incremental)")
+        self.export_delta_button.setObjectName("ActionButton_secondary")
+        self.export_delta_button.clicked.connect(self.confirm_export_delta_to_csv)
+        self.export_delta_button.setToolTip("Exportar solo los registros cargados desde la última exportación incremental")
+        
         export_layout.addWidget(self.export_csv_button)
+        export_layout.addWidget(self.export_delta_button)
         export_layout.addStretch()
         
         layout.addWidget(export_section)
@@ -336,8 +346,15 @@ class DbTab(QWidget):
             print(f"Error formateando tiempo '{time_str}': {e}")
             return str(time_str)
         
-    def export_table_to_csv(self):
-        """Exportar todos los registros de mediciones_planas a CSV usando el controlador"""
+    def export_table_to_csv(self, incremental=False):
+        """
+        Exportar registros de mediciones_planas a CSV usando el controlador
+
+        Args:
+            incremental: Si es True, solo se exportan los registros nuevos desde la última exportación incremental
+        """
+        button = self.export_delta_button if incremental else self.export_csv_button
+        button_text = button.text()
         try:
             # Verificar controlador
             if not self.controller:
@@ -350,7 +367,8 @@ class DbTab(QWidget):
             
             # Abrir diálogo para seleccionar ubicación de archivo
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            default_filename = f"mediciones_EEASA_{timestamp}.csv"
+            prefix = "mediciones_EEASA_delta" if incremental else "mediciones_EEASA"
+            default_filename = f"{prefix}_{timestamp}.csv"
             
             # Configurar opciones del diálogo para evitar bloqueos
             options = QFileDialog.Options()
@@ -371,14 +389,22 @@ class DbTab(QWidget):
             if not file_path.lower().endswith('.csv'):
                 file_path += '.csv'
             
-            # Mostrar mensaje de progreso
-            self.export_csv_button.setText("⏳ Generando reporte EEASA...")
-            self.export_csv_button.setEnabled(False)
+            # Mostrar mensaje de progreso; el botón permite cancelar mientras se exporta
+            self._export_cancel_event = threading.Event()
+            self._active_export_button = button
+            button.setText("⏳ Generando reporte EEASA... (clic para cancelar)")
 
             QApplication.processEvents()
+
+            def on_progress(exported, total):
+                percent = int(exported * 100 / total) if total else 100
+                button.setText(f"⏳ Exportando {exported:,}/{total:,} ({percent}%) - clic para cancelar")
+                QApplication.processEvents()
             
             # Llamar al controlador para realizar la exportación
-            success, message = self.controller.export_mediciones_to_csv(file_path)
+            success, message = self.controller.export_mediciones_to_csv(
+                file_path, progress_callback=on_progress, cancel_event=self._export_cancel_event,
+                incremental=incremental)
             
             if success:
                 # Verificar que el archivo se creó correctamente
@@ -391,11 +417,10 @@ class DbTab(QWidget):
                         f"Ubicación: {os.path.dirname(file_path)}\n\n"
                     )
                 else:
-                    QMessageBox.warning(
-                        self,
-                        "Advertencia",
-                        f"El proceso reportó éxito pero no se encuentra el archivo:\n{file_path}"
-                    )
+                    # Sin registros (o sin registros nuevos) no se genera archivo
+                    QMessageBox.information(self, "Exportación EEASA", message)
+            elif self._export_cancel_event.is_set():
+                QMessageBox.information(self, "Exportación cancelada", "La exportación fue cancelada; no se generó el archivo.")
             else:
                 QMessageBox.critical(
                     self, 
@@ -415,11 +440,16 @@ class DbTab(QWidget):
             )
         finally:
             # Restaurar botón
-            self.export_csv_button.setText("📊 Exportar Reporte EEASA a CSV")
-            self.export_csv_button.setEnabled(True)
+            self._export_cancel_event = None
+            self._active_export_button = None
+            button.setText(button_text)
+            button.setEnabled(True)
 
     def confirm_export_table_to_csv(self):
         """Solicita confirmación antes de exportar la información en CSV."""
+        if self._cancel_running_export():
+            return
+
         ok = UIHelpers.show_confirmation_dialog(
             self,
             title="Confirmar exportación",
@@ -427,4 +457,32 @@ class DbTab(QWidget):
             details="El archivo se generará con el formato empresarial de EEASA y contendrá toda la información visible en la tabla actual."
         )
         if ok:
-            self.export_table_to_csv()
\ No newline at end of file
+            self.export_table_to_csv()
+
+    def confirm_export_delta_to_csv(self):
+        """Solicita confirmación antes de exportar solo los registros nuevos."""
+        if self._cancel_running_export():
+            return
+
+        ok = UIHelpers.show_confirmation_dialog(
+            self,
+            title="Confirmar exportación incremental",
+            message="¿Deseas exportar los registros cargados desde la última exportación incremental?",
+            details="Se generará un archivo delta con el formato empresarial de EEASA y se avanzará la marca de agua de exportación."
+        )
+        if ok:
+            self.export_table_to_csv(incremental=True)
+
+    def _cancel_running_export(self):
+        """
+        Durante una exportación, cualquier botón de exportación la cancela
+
+        Returns:
+            bool: True si había una exportación en curso
+        """
+        if self._export_cancel_event is None:
+            return False
+        self._export_cancel_event.set()
+        self._active_export_button.setText("⏹ Cancelando exportación...")
+        self._active_export_button.setEnabled(False)
+        return True
@@ -7,6 +7,7 @@ from PyQt5.QtCore import QTimer
 from config.settings import load_config
 from gui.utils.ui_helper import UIHelpers
 from gui.styles.themes import ThemeManager
+from core.database.pool import close_all_pools
 from core.database.connection import DatabaseConnection
 from gui.components.panels.status_panel import StatusPanel
 from gui.components.panels.footer_panel import FooterPanel
@@ -27,9 +28,11 @@ class SonelDataExtractorGUI(QMainWindow):
         config_file = self._get_config_file_portable()
         self.config = load_config(config_file)
 
-        # Base de datos con manejo de errores mejorado
+        # Base de datos con manejo de errores mejorado (conexión del pool compartido)
+        self.db_manager = None
         try:
             db_connection = DatabaseConnection(self.config)
+            self.db_manager = db_connection
             self.db_connection = db_connection.get_connection()
             if self.db_connection:
                 print("✅ Conexión a base de datos establecida")
@@ -963,11 +966,12 @@ class SonelDataExtractorGUI(QMainWindow):
                 except Exception as e:
                     print(f"⚠️ Error deteniendo timer: {e}")
             
-            # Cerrar conexión de base de datos
-            if hasattr(self, 'db_connection') and self.db_connection:
+            # Devolver la conexión al pool y cerrar el pool compartido
+            if getattr(self, 'db_manager', None) or getattr(self, 'db_connection', None):
                 try:
-                    if hasattr(self.db_connection, 'close'):
-                        self.db_connection.close()
+                    if getattr(self, 'db_manager', None):
+                        self.db_manager.close()
+                    close_all_pools()
                     print("✅ Conexión BD cerrada")
                 except Exception as e:
                     print(f"⚠️ Error cerrando conexión BD: {e}")
@@ -0,0 +1,173 @@
+#sonel_extractor/tests/test_bulk_loader.py
+import datetime
+import struct
+import numpy as np
+import pandas as pd
+import pytest
+from core.database.advisory_locks import FLAT_MERGE_LOCK_KEY
+from core.database.bulk_loader import BulkLoader, PGCOPY_HEADER, PGCOPY_TRAILER, parse_insert_columns
+from core.transformers.columnar_batch import ColumnarBatch, PG_EPOCH
+
+
+FLAT_FIELDS = ['codigo_id', 'tiempo_utc', 'time', 'utc_zone', 'u_l1_avg']
+FLAT_TYPES = ['int4', 'date', 'time', 'text', 'float8']
+
+
+def reference_field(value, pg_type):
+    """Codificación campo a campo del formato binario de COPY, para comparar"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return struct.pack('!i', -1)
+    if pg_type == 'int4':
+        data = struct.pack('!i', int(value))
+    elif pg_type == 'float8':
+        data = struct.pack('!d', float(value))
+    elif pg_type == 'date':
+        data = struct.pack('!i', (pd.Timestamp(value) - PG_EPOCH).days)
+    elif pg_type == 'time':
+        micros = ((value.hour * 60 + value.minute) * 60 + value.second) * 1_000_000 + value.microsecond
+        data = struct.pack('!q', micros)
+    else:
+        data = str(value).encode('utf-8')
+    return struct.pack('!i', len(data)) + data
+
+
+def reference_payload(rows, pg_types):
+    body = b''.join(struct.pack('!h', len(pg_types)) + b''.join(reference_field(value, pg_type)
+                                                                for value, pg_type in zip(row, pg_types))
+                    for row in rows)
+    return PGCOPY_HEADER + body + PGCOPY_TRAILER
+
+
+class RecordingCursor:
+    """Cursor que registra las sentencias en lugar de ejecutarlas"""
+
+    rowcount = 1
+
+    def __init__(self, statements):
+        self.statements = statements
+
+    def execute(self, statement, params=None):
+        self.statements.append((statement, params))
+
+    def copy_expert(self, statement, payload):
+        self.statements.append((statement, payload.getvalue()))
+
+    def close(self):
+        pass
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.statements = []
+
+    def cursor(self):
+        return RecordingCursor(self.statements)
+
+    def get_connection(self):
+        return self
+
+
+@pytest.fixture
+def transformed():
+    return pd.DataFrame({
+        'tiempo_utc': [datetime.date(2024, 2, 1), None, datetime.date(1999, 12, 31)],
+        'time': [datetime.time(10, 0), datetime.time(23, 59, 59, 500000), None],
+        'utc_zone': ['UTC-5', 'UTC-5', 'UTC-5'],
+        'u_l1_avg': [230.5, np.nan, -1.25]
+    })
+
+
+def test_parse_insert_columns():
+    table, columns = parse_insert_columns('INSERT INTO mediciones ( codigo_id, "tiempo_utc" ) VALUES (%s, %s)')
+
+    assert table == 'mediciones'
+    assert columns == ['codigo_id', 'tiempo_utc']
+    assert parse_insert_columns('SELECT 1') == (None, [])
+
+
+@pytest.mark.parametrize("values, pg_type, expected", [
+    ([1.5, np.nan], 'float8', [struct.pack('!d', 1.5), None]),
+    ([1.5, None], 'float4', [struct.pack('!f', 1.5), None]),
+    ([7, -2], 'int4', [struct.pack('!i', 7), struct.pack('!i', -2)]),
+    ([7, None], 'int8', [struct.pack('!q', 7), None]),
+    (['2000-01-02', 'no es fecha'], 'date', [struct.pack('!i', 1), None]),
+    (['00:00:01.5', None], 'time', [struct.pack('!q', 1_500_000), None]),
+    (['ñandú', None, ''], 'text', ['ñandú'.encode('utf-8'), None, b'']),
+])
+def test_encode_binary_field(values, pg_type, expected):
+    payload, lengths, null_mask = BulkLoader._encode_binary_field(pd.Series(values, dtype=object), pg_type)
+
+    assert list(null_mask) == [value is None for value in expected]
+    for row, value in enumerate(expected):
+        if value is not None:
+            assert payload[row, :lengths[row]].tobytes() == value
+
+
+def test_encode_binary_field_already_encoded_dates_and_times():
+    days = pd.Series(pd.arrays.IntegerArray(np.array([0, 366, 0]), np.array([False, False, True])))
+    micros = pd.Series(pd.arrays.IntegerArray(np.array([1, 0, 0]), np.array([False, True, False])))
+
+    date_payload, _, date_nulls = BulkLoader._encode_binary_field(days, 'date')
+    time_payload, _, time_nulls = BulkLoader._encode_binary_field(micros, 'time')
+
+    assert list(date_nulls) == [False, False, True]
+    assert date_payload[1].tobytes() == struct.pack('!i', 366)
+    assert list(time_nulls) == [False, True, False]
+    assert time_payload[0].tobytes() == struct.pack('!q', 1)
+
+
+def test_binary_payload_matches_reference_encoder(transformed):
+    loader = BulkLoader(None, copy_format='binary', chunk_rows=2)
+    frame = loader.prepare_frame(transformed, FLAT_FIELDS, constants={'codigo_id': 7})
+
+    payload = loader._build_binary_payload(frame, FLAT_TYPES).getvalue()
+
+    rows = [[7, datetime.date(2024, 2, 1), datetime.time(10, 0), 'UTC-5', 230.5],
+            [7, None, datetime.time(23, 59, 59, 500000), 'UTC-5', None],
+            [7, datetime.date(1999, 12, 31), None, 'UTC-5', -1.25]]
+    assert payload == reference_payload(rows, FLAT_TYPES)
+
+
+def test_binary_payload_from_columnar_batch_matches_frame(transformed):
+    loader = BulkLoader(None, copy_format='binary')
+    batch = ColumnarBatch.from_frame(transformed)
+
+    from_frame = loader.prepare_frame(transformed, FLAT_FIELDS, constants={'codigo_id': 7})
+    from_batch = loader.prepare_frame(batch, FLAT_FIELDS, constants={'codigo_id': 7})
+
+    assert (loader._build_binary_payload(from_batch, FLAT_TYPES).getvalue()
+            == loader._build_binary_payload(from_frame, FLAT_TYPES).getvalue())
+
+
+def test_text_payload_nulls_and_encoded_columns(transformed):
+    loader = BulkLoader(None)
+    expected = ['7\t2024-02-01\t10:00:00\tUTC-5\t230.5',
+                '7\t\t23:59:59.500000\tUTC-5\t',
+                '7\t1999-12-31\t\tUTC-5\t-1.25']
+
+    for data in (transformed, ColumnarBatch.from_frame(transformed)):
+        frame = loader.prepare_frame(data, FLAT_FIELDS, constants={'codigo_id': 7})
+        assert loader._build_text_payload(frame).getvalue().splitlines() == expected
+
+
+def test_prepare_frame_normalizes_missing_text():
+    data = pd.DataFrame({'utc_zone': ['UTC-5', '', '  ', 'nan', None]})
+
+    frame = BulkLoader(None).prepare_frame(data, ['utc_zone', 'u_l1_avg'])
+
+    assert list(frame['utc_zone'].isna()) == [False, True, True, True, True]
+    assert frame['u_l1_avg'].isna().all()
+
+
+def test_merge_matches_missing_times_as_duplicates(transformed):
+    connection = RecordingConnection()
+    transformed['time'] = None
+
+    BulkLoader(connection).merge_flat_measurements(transformed, 7)
+
+    statements = [statement for statement, _ in connection.statements]
+    merge = next(statement for statement in statements if statement.startswith('INSERT INTO'))
+    assert ('SELECT pg_advisory_xact_lock(%s, %s)', (FLAT_MERGE_LOCK_KEY, 7)) in connection.statements
+    assert 'mp."codigo_id" = s."codigo_id"' in merge
+    assert '(mp."fecha" = s."fecha" OR (mp."fecha" IS NULL AND s."fecha" IS NULL))' in merge
+    assert '(mp."time" = s."time" OR (mp."time" IS NULL AND s."time" IS NULL))' in merge
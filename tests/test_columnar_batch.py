@@ -0,0 +1,106 @@
+#sonel_extractor/tests/test_columnar_batch.py
+import datetime
+import numpy as np
+import pandas as pd
+import pytest
+from core.transformers.columnar_batch import (
+    ColumnarBatch, MEASUREMENT_FIELDS, encode_dates, encode_times, format_dates, format_times
+)
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'tiempo_utc': [datetime.date(2024, 2, 1), pd.NaT, datetime.date(1999, 12, 31),
+                       datetime.date(2024, 2, 1)],
+        'time': [datetime.time(10, 0), datetime.time(0, 0, 0, 250000), None, datetime.time(10, 0)],
+        'utc_zone': [None, 'UTC-5', 'UTC-5', None],
+        'u_l1_avg': [230.5, np.nan, 229.0, 231.25],
+        'i_l1_avg': [1.5, 2.0, np.nan, 0.0]
+    })
+
+
+def test_encode_dates_days_since_epoch_and_nulls():
+    stamps = pd.Series([pd.Timestamp('2000-01-01'), pd.NaT, pd.Timestamp('1999-12-31 08:00'),
+                        pd.Timestamp('2024-02-01 23:59')])
+
+    days, null_mask = encode_dates(stamps)
+
+    assert days.dtype == np.int32
+    assert list(null_mask) == [False, True, False, False]
+    assert list(days[~null_mask]) == [0, -1, 8797]
+
+
+def test_encode_dates_keeps_local_date_of_aware_timestamps():
+    stamps = pd.Series(pd.to_datetime(['2024-02-01 23:30:00']).tz_localize('America/Guayaquil'))
+
+    days, _ = encode_dates(stamps)
+
+    assert days[0] == encode_dates(pd.Series(['2024-02-01']))[0][0]
+
+
+def test_encode_times_microseconds_and_nulls():
+    micros, null_mask = encode_times([datetime.time(0, 0, 1, 5), None, datetime.time(23, 59, 59)])
+
+    assert micros.dtype == np.int64
+    assert list(null_mask) == [False, True, False]
+    assert micros[0] == 1_000_005
+    assert micros[2] == 86_399_000_000
+
+
+def test_format_dates_and_times_round_trip():
+    days, date_nulls = encode_dates(pd.Series(['2024-02-01', None, '2024-02-01']))
+    micros, time_nulls = encode_times([datetime.time(10, 0), datetime.time(7, 20, 0, 50000), None])
+
+    assert list(format_dates(days, date_nulls)) == ['2024-02-01', None, '2024-02-01']
+    assert list(format_times(micros, time_nulls)) == ['10:00:00', '07:20:00.050000', None]
+
+
+def test_from_frame_null_bitmaps(frame):
+    batch = ColumnarBatch.from_frame(frame)
+
+    assert len(batch) == 4 and not batch.empty
+    assert batch.fields == ['u_l1_avg', 'i_l1_avg']
+    assert batch.utc_zone == 'UTC-5'
+    assert list(batch.is_null('tiempo_utc')) == [False, True, False, False]
+    assert list(batch.is_null('time')) == [False, False, True, False]
+    assert list(batch.is_null('u_l1_avg')) == [False, True, False, False]
+    assert batch.is_null('p_l1_avg').all()
+    assert not batch.is_null('utc_zone').any()
+    # Un byte de mapa de bits por cada 8 filas
+    assert batch.null_bitmap['time'].nbytes == 1
+
+
+def test_values_and_getitem(frame):
+    batch = ColumnarBatch.from_frame(frame)
+
+    assert batch.values('tiempo_utc')[0] == 8797
+    assert batch.values('time')[1] == 250_000
+    assert np.isnan(batch.values('p_l1_avg')).all()
+    assert batch['tiempo_utc'].iloc[0] == pd.Timestamp('2024-02-01')
+    assert pd.isna(batch['tiempo_utc'].iloc[1])
+    assert batch['time'].iloc[0] == pd.Timedelta(hours=10)
+    assert list(batch['utc_zone']) == ['UTC-5'] * 4
+    with pytest.raises(KeyError):
+        batch['desconocido']
+
+
+def test_to_frame_round_trip(frame):
+    restored = ColumnarBatch.from_frame(frame).to_frame()
+
+    assert list(restored['tiempo_utc'][[0, 2, 3]]) == [datetime.date(2024, 2, 1), datetime.date(1999, 12, 31),
+                                                       datetime.date(2024, 2, 1)]
+    assert pd.isna(restored['tiempo_utc'][1])
+    assert list(restored['time']) == list(frame['time'])
+    assert list(restored.columns) == ['tiempo_utc', 'time', 'utc_zone'] + MEASUREMENT_FIELDS
+    np.testing.assert_array_equal(restored['u_l1_avg'], frame['u_l1_avg'])
+    assert restored['p_l1_avg'].isna().all()
+
+
+def test_float32_measurements_and_empty_batch():
+    batch = ColumnarBatch({'u_l1_avg': ['230.5', 'x']}, {}, {}, float_dtype=np.float32)
+
+    assert batch.measurements.dtype == np.float32
+    assert list(batch.is_null('u_l1_avg')) == [False, True]
+    assert batch.nbytes == batch.measurements.nbytes + batch.null_bitmap['u_l1_avg'].nbytes
+    assert ColumnarBatch({}, {}, {}).empty
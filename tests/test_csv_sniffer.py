@@ -0,0 +1,112 @@
+#sonel_extractor/tests/test_csv_sniffer.py
+import codecs
+import pytest
+from core.parser.csv_sniffer import CSVSniffer
+
+
+PREAMBLE = ['Sonel Analysis', 'Medidor: PQM-702;Serie: 12345', '']
+HEADER = ['Fecha', 'Time (UTC-5)', 'U L1 Avg [V]', 'I L1 Avg [A]']
+ROWS = [['01/02/2024', '10:00:00', '230,5', '1,25'],
+        ['01/02/2024', '10:10:00', '231,0', '1,50'],
+        ['01/02/2024', '10:20:00', '229,8', '1,75']]
+
+
+def write_csv(tmp_path, separator=';', rows=ROWS, preamble=PREAMBLE, encoding='utf-8', bom=b''):
+    lines = preamble + [separator.join(HEADER)] + [separator.join(row) for row in rows]
+    path = tmp_path / 'medicion.csv'
+    path.write_bytes(bom + '\r\n'.join(lines).encode(encoding))
+    return path
+
+
+@pytest.mark.parametrize("separator", [';', '\t', '|'])
+def test_detects_separator_header_and_decimal_comma(tmp_path, separator):
+    trace = CSVSniffer.sniff(write_csv(tmp_path, separator))
+
+    assert trace['separator'] == separator
+    assert trace['header_line'] == len(PREAMBLE)
+    assert trace['columns'] == HEADER
+    assert trace['decimal'] == ','
+    assert trace['encoding'] == 'utf-8'
+    assert not trace['bom']
+
+
+def test_comma_separator_uses_decimal_point(tmp_path):
+    rows = [[value.replace(',', '.') for value in row] for row in ROWS]
+
+    trace = CSVSniffer.sniff(write_csv(tmp_path, ',', rows=rows, preamble=[]))
+
+    assert trace['separator'] == ','
+    assert trace['header_line'] == 0
+    assert trace['decimal'] == '.'
+
+
+def test_semicolon_with_decimal_point(tmp_path):
+    rows = [[value.replace(',', '.') for value in row] for row in ROWS]
+
+    trace = CSVSniffer.sniff(write_csv(tmp_path, ';', rows=rows))
+
+    assert trace['separator'] == ';'
+    assert trace['decimal'] == '.'
+
+
+@pytest.mark.parametrize("bom, encoding, expected", [
+    (codecs.BOM_UTF8, 'utf-8', 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le', 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be', 'utf-16'),
+])
+def test_detects_bom(tmp_path, bom, encoding, expected):
+    trace = CSVSniffer.sniff(write_csv(tmp_path, encoding=encoding, bom=bom))
+
+    assert trace['bom']
+    assert trace['encoding'] == expected
+    assert trace['separator'] == ';'
+    assert trace['columns'][0] == 'Fecha'
+
+
+def test_utf16_without_bom_and_cp1252(tmp_path):
+    assert CSVSniffer.sniff(write_csv(tmp_path, encoding='utf-16-le'))['encoding'] == 'utf-16-le'
+
+    rows = ROWS + [['01/02/2024', '10:30:00', '230,0', 'año']]
+    assert CSVSniffer.sniff(write_csv(tmp_path, rows=rows, encoding='cp1252'))['encoding'] == 'cp1252'
+
+
+def test_header_validator_skips_rejected_rows(tmp_path):
+    preamble = ['Fecha;Hora;Comentario;Extra']
+    path = write_csv(tmp_path, preamble=preamble)
+
+    trace = CSVSniffer.sniff(path, header_validator=lambda columns: 'U L1 Avg [V]' in columns)
+
+    assert trace['header_line'] == 1
+    assert trace['header_validated']
+    assert CSVSniffer.sniff(path)['header_line'] == 0
+
+
+def test_truncated_sample_ignores_partial_last_line(tmp_path):
+    rows = ROWS * 50
+    path = write_csv(tmp_path, rows=rows)
+
+    trace = CSVSniffer.sniff(path, sample_bytes=len(path.read_bytes()) - 7)
+
+    assert trace['separator'] == ';'
+    assert trace['sample_bytes'] == len(path.read_bytes()) - 7
+
+
+def test_without_separator_returns_empty_trace(tmp_path):
+    path = tmp_path / 'texto.csv'
+    path.write_text('solo texto\nsin columnas\n')
+
+    trace = CSVSniffer.sniff(path)
+
+    assert trace['separator'] is None
+    assert trace['header_line'] is None
+
+
+def test_read_uses_detected_format(tmp_path):
+    path = write_csv(tmp_path)
+    trace = CSVSniffer.sniff(path)
+
+    frame = CSVSniffer.read(path, trace)
+
+    assert list(frame.columns) == HEADER
+    assert frame['U L1 Avg [V]'].tolist() == [230.5, 231.0, 229.8]
+    assert trace['reads'] == 1
@@ -0,0 +1,65 @@
+#sonel_extractor/tests/test_excel_parser.py
+import pytest
+from core.parser import excel_parser
+from core.parser.excel_parser import ExcelParser
+from core.utils.column_matcher import ColumnMatcher
+
+
+PATTERNS = {'time': r'(?i)^(time|tiempo)$', 'u_l1': r'(?i)^u\s*l1\s*avg', 'i_l1': r'(?i)^i\s*l1\s*avg'}
+
+# Título y fila vacía antes del encabezado (fila 3), con celdas vacías al final del rango usado
+HEAD = [
+    ('Sonel Analysis', None, None, None, None, None),
+    (None, None, None, None, None, None),
+    ('Time', 'U L1 Avg [V]', 'I L1 Avg [A]', None, None, None),
+    ('10:00:00', 230.5, 1.25, None, None, None),
+]
+
+
+@pytest.fixture(autouse=True)
+def matcher(monkeypatch):
+    monkeypatch.setattr(excel_parser, 'column_matcher', ColumnMatcher(patterns=PATTERNS))
+
+
+def test_header_names_trims_trailing_empty_cells():
+    assert ExcelParser._header_names(HEAD[2]) == ['Time', 'U L1 Avg [V]', 'I L1 Avg [A]']
+
+
+def test_header_names_follow_pandas_for_gaps_and_duplicates():
+    row = (' Time ', None, 'U L1 Avg [V]', 'U L1 Avg [V]', 'U L1 Avg [V]', None)
+
+    assert ExcelParser._header_names(row) == ['Time', 'Unnamed: 1', 'U L1 Avg [V]',
+                                              'U L1 Avg [V].1', 'U L1 Avg [V].2']
+
+
+def test_detect_header_on_third_row():
+    index, columns, column_map = ExcelParser._detect_header(HEAD)
+
+    assert index == 2
+    assert columns == ['Time', 'U L1 Avg [V]', 'I L1 Avg [A]']
+    assert column_map == {'time': 'Time', 'u_l1': 'U L1 Avg [V]', 'i_l1': 'I L1 Avg [A]'}
+
+
+def test_detect_header_without_match():
+    assert ExcelParser._detect_header([('a', 'b', 'c'), ('Time', None, None)]) == (None, [], {})
+
+
+def test_parse_workbook_with_header_on_third_row(tmp_path):
+    openpyxl = pytest.importorskip('openpyxl')
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet['A1'] = 'Sonel Analysis'
+    rows = [row[:3] for row in HEAD[2:]] + [('10:10:00', 231.0, 1.5)]
+    for row_number, row in enumerate(rows, start=3):
+        for column_number, value in enumerate(row, start=1):
+            sheet.cell(row_number, column_number, value)
+    # Celda con formato fuera de la tabla: amplía el rango usado de la hoja
+    sheet['F4'].number_format = '0.00'
+    path = tmp_path / 'medicion.xlsx'
+    workbook.save(path)
+
+    df = ExcelParser._parse_streaming(str(path))
+
+    assert df.attrs['parse_info']['header_line'] == 2
+    assert list(df.columns) == ['Time', 'U L1 Avg [V]', 'I L1 Avg [A]']
+    assert df['U L1 Avg [V]'].tolist() == [230.5, 231.0]
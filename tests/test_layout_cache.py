@@ -0,0 +1,68 @@
+#sonel_extractor/tests/test_layout_cache.py
+import json
+import pytest
+from core.parser.layout_cache import LayoutCache
+
+
+HEADER = b'Fecha;Time (UTC-5);U L1 Avg [V]'
+LINES = [b'Sonel Analysis', b'', HEADER, b'01/02/2024;10:00:00;230,5']
+TRACE = {'encoding': 'utf-8', 'separator': ';', 'decimal': ',', 'header_line': 2}
+COLUMN_MAP = {'time': 'Time (UTC-5)', 'u_l1': 'U L1 Avg [V]'}
+
+
+@pytest.fixture
+def cache_file(tmp_path):
+    return str(tmp_path / 'cache' / 'layout_cache.json')
+
+
+def test_lookup_hit_after_store(cache_file):
+    cache = LayoutCache(cache_file)
+
+    signature = cache.store(LINES, TRACE, COLUMN_MAP)
+    found, layout = cache.lookup(LINES)
+
+    assert found == signature == LayoutCache.signature(HEADER)
+    assert layout['skiprows'] == 2
+    assert layout['column_map'] == COLUMN_MAP
+    assert layout['uses'] == 2
+    assert cache.stats()['hits'] == 1
+
+
+def test_lookup_miss_for_unknown_header_or_moved_header(cache_file):
+    cache = LayoutCache(cache_file)
+    cache.store(LINES, TRACE, COLUMN_MAP)
+
+    assert cache.lookup([b'Otro;Encabezado', b'1;2']) == (None, None)
+    # Mismo encabezado en otra fila: el skiprows guardado ya no sirve
+    assert cache.lookup([b'Sonel Analysis', HEADER]) == (None, None)
+    assert cache.stats()['misses'] == 2
+    assert cache.store(LINES, dict(TRACE, header_line=10), COLUMN_MAP) is None
+
+
+def test_invalidate_is_not_undone_by_version_on_disk(cache_file):
+    cache = LayoutCache(cache_file)
+    signature = cache.store(LINES, TRACE, COLUMN_MAP)
+    cache.save()
+
+    cache.invalidate(signature)
+    cache.save()
+
+    assert cache.lookup(LINES) == (None, None)
+    assert LayoutCache(cache_file).lookup(LINES) == (None, None)
+
+
+def test_save_merges_layouts_from_other_processes(cache_file):
+    first = LayoutCache(cache_file)
+    second = LayoutCache(cache_file)
+    other_lines = [b'Time;U L1 Avg [V];I L1 Avg [A]', b'10:00:00;230,5;1,25']
+
+    first.store(LINES, TRACE, COLUMN_MAP)
+    second.store(other_lines, dict(TRACE, header_line=0), COLUMN_MAP)
+    first.save()
+    second.save()
+
+    with open(cache_file, encoding='utf-8') as f:
+        saved = json.load(f)['layouts']
+    assert set(saved) == {LayoutCache.signature(HEADER), LayoutCache.signature(other_lines[0])}
+    first.reload()
+    assert first.lookup(other_lines)[1]['skiprows'] == 0
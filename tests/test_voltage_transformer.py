@@ -0,0 +1,140 @@
+#sonel_extractor/tests/test_voltage_transformer.py
+import datetime
+import numpy as np
+import pandas as pd
+import pytest
+from core.transformers.voltage_transformer import VoltageTransformer, DateFormatMismatchError, DATE_FORMATS
+from core.transformers.columnar_batch import ColumnarBatch, PG_EPOCH
+
+
+MISSING_TIMES = ['10:00:00', None, '10:00:02', np.nan, '', '   ', 'xx:yy']
+
+
+def test_parse_time_of_day_missing_values_are_none():
+    """Los nulos (código -1 de factorize) no toman la última hora válida"""
+    series = pd.Series(['10:00:00', None, '10:00:02', np.nan], dtype=object)
+
+    parsed = VoltageTransformer.parse_time_of_day(series)
+
+    assert list(parsed) == [datetime.time(10, 0), None, datetime.time(10, 0, 2), None]
+
+
+def test_parse_time_of_day_missing_values_are_null_when_encoded():
+    series = pd.Series(['10:00:00', None, '10:00:02', np.nan], dtype=object)
+
+    micros, null_mask = VoltageTransformer.parse_time_of_day(series, encoded=True)
+
+    assert list(null_mask) == [False, True, False, True]
+    assert micros[0] == 10 * 3600 * 1_000_000
+    assert micros[2] == (10 * 3600 + 2) * 1_000_000
+
+
+def test_parse_time_of_day_blank_and_invalid_match_in_both_modes():
+    series = pd.Series(MISSING_TIMES, dtype=object)
+
+    parsed = VoltageTransformer.parse_time_of_day(series)
+    micros, null_mask = VoltageTransformer.parse_time_of_day(series, encoded=True)
+
+    assert list(parsed) == [datetime.time(10, 0), None, datetime.time(10, 0, 2), None, None, None, None]
+    assert list(null_mask) == [value is None for value in parsed]
+    assert list(micros[~null_mask]) == [36_000_000_000, 36_002_000_000]
+
+
+def test_parse_time_of_day_only_missing_values():
+    series = pd.Series([None, np.nan], dtype=object)
+
+    assert list(VoltageTransformer.parse_time_of_day(series)) == [None, None]
+    assert list(VoltageTransformer.parse_time_of_day(series, encoded=True)[1]) == [True, True]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('07:20:00.050', datetime.time(7, 20, 0, 50000)),
+    ('07:20:00.123456789', datetime.time(7, 20, 0, 123456)),
+    (' 7:20:00 ', datetime.time(7, 20)),
+    ('23:59:59', datetime.time(23, 59, 59)),
+    ('24:00:00', None),
+])
+def test_parse_time_of_day_formats(text, expected):
+    parsed = VoltageTransformer.parse_time_of_day(pd.Series([text], dtype=object))
+
+    assert parsed.iloc[0] == expected
+
+
+def test_parse_time_of_day_accepts_time_objects():
+    series = pd.Series([datetime.time(8, 30, 15), None], dtype=object)
+
+    assert list(VoltageTransformer.parse_time_of_day(series)) == [datetime.time(8, 30, 15), None]
+
+
+def test_parse_dates_formats_and_missing_values():
+    series = pd.Series(['01/02/2024 10:00:00', None, '03/02/2024 10:00:00', '01/02/2024 10:00:00'],
+                       dtype=object)
+
+    parsed = VoltageTransformer.parse_dates(series, DATE_FORMATS, cache_key=('test', 'dmy'))
+    days, null_mask = VoltageTransformer.parse_dates(series, DATE_FORMATS, cache_key=('test', 'dmy'),
+                                                     encoded=True)
+
+    assert list(parsed[[0, 2, 3]]) == [datetime.date(2024, 2, 1), datetime.date(2024, 2, 3),
+                                       datetime.date(2024, 2, 1)]
+    assert pd.isna(parsed[1])
+    assert list(null_mask) == [False, True, False, False]
+    assert days[0] == (pd.Timestamp('2024-02-01') - PG_EPOCH).days
+    assert days[2] == days[0] + 2
+
+
+def test_parse_dates_unparseable_values_are_null():
+    series = pd.Series(['2024-02-01', 'no es fecha'], dtype=object)
+
+    days, null_mask = VoltageTransformer.parse_dates(series, encoded=True)
+
+    assert list(null_mask) == [False, True]
+
+
+def test_transform_missing_utc_times_in_frame_and_batch():
+    df = pd.DataFrame({
+        'Time (UTC-5)': ['10:00:00', None, '10:00:02', np.nan],
+        'Fecha': ['2024-02-01'] * 4,
+        'U L1 Avg [V]': ['230,5', '231,0', None, '229,9']
+    })
+    df.attrs['column_map'] = {'time': 'Fecha', 'time_utc': 'Time (UTC-5)', 'u_l1': 'U L1 Avg [V]'}
+
+    frame = VoltageTransformer.transform(df)
+    batch = VoltageTransformer.transform(df, columnar=True)
+
+    assert list(frame['time']) == [datetime.time(10, 0), None, datetime.time(10, 0, 2), None]
+    assert isinstance(batch, ColumnarBatch)
+    assert list(batch.is_null('time')) == [False, True, False, True]
+    assert list(batch.to_frame()['time']) == list(frame['time'])
+
+
+def month_first_chunk(dates, trace):
+    chunk = pd.DataFrame({'Fecha': dates, 'U L1 Avg [V]': ['230,5'] * len(dates)}, dtype=object)
+    chunk.attrs['column_map'] = {'time': 'Fecha', 'u_l1': 'U L1 Avg [V]'}
+    chunk.attrs['parse_info'] = trace
+    return chunk
+
+
+def test_date_format_is_fixed_once_per_file_across_chunks():
+    trace = {'method': 'sniffer'}
+
+    first = VoltageTransformer.transform(month_first_chunk(['01/05/2024', '02/06/2024'], trace))
+    # Con %d/%m fijado por el primer bloque, el día 13 no se reinterpreta como mes-día
+    second = VoltageTransformer.transform(month_first_chunk(['01/13/2024'], trace))
+    whole = VoltageTransformer.transform(month_first_chunk(['01/05/2024', '02/06/2024', '01/13/2024'],
+                                                           {'method': 'sniffer'}))
+
+    assert list(first['tiempo_utc']) == [datetime.date(2024, 5, 1), datetime.date(2024, 6, 2)]
+    assert trace['date_formats'] == {'Fecha': '%d/%m/%Y'}
+    assert second is None
+    assert list(whole['tiempo_utc']) == [datetime.date(2024, 1, 5), datetime.date(2024, 2, 6),
+                                         datetime.date(2024, 1, 13)]
+
+
+def test_fixed_date_format_applies_to_later_chunks():
+    trace = {'method': 'sniffer', 'date_formats': {'Fecha': '%m/%d/%Y'}}
+
+    chunk = VoltageTransformer.transform(month_first_chunk(['01/05/2024'], trace), columnar=True)
+
+    assert chunk.values('tiempo_utc')[0] == (pd.Timestamp('2024-01-05') - PG_EPOCH).days
+    with pytest.raises(DateFormatMismatchError):
+        VoltageTransformer.parse_dates(pd.Series(['2024-01-05']), DATE_FORMATS, ('firma', 'Fecha'), trace=trace)
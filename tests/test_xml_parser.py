@@ -0,0 +1,68 @@
+#sonel_extractor/tests/test_xml_parser.py
+import pytest
+from core.parser import xml_parser
+from core.parser.xml_parser import XMLParser
+from core.utils.column_matcher import ColumnMatcher
+
+
+PATTERNS = {'time': r'(?i)^(time|tiempo)$', 'u_l1': r'(?i)^u\s*l1\s*avg'}
+
+
+@pytest.fixture(autouse=True)
+def matcher(monkeypatch):
+    monkeypatch.setattr(xml_parser, 'column_matcher', ColumnMatcher(patterns=PATTERNS))
+
+
+def record(time, voltage):
+    return f'<Registro><Time>{time}</Time><U_L1_Avg>{voltage}</U_L1_Avg></Registro>'
+
+
+def write_xml(tmp_path, body):
+    path = tmp_path / 'medicion.xml'
+    path.write_text(f'<?xml version="1.0" encoding="utf-8"?>{body}', encoding='utf-8')
+    return path
+
+
+def test_device_header_is_not_taken_as_record(tmp_path):
+    path = write_xml(tmp_path, '<Exportacion><Equipo><Serie>12345</Serie><Modelo>PQM-702</Modelo></Equipo>'
+                               '<Datos>' + ''.join(record(f'10:{minute}0:00', 230 + minute)
+                                                    for minute in range(3)) + '</Datos></Exportacion>')
+
+    records = list(XMLParser._iter_records(str(path)))
+
+    assert [tag for tag, _ in records] == ['Registro'] * 3
+    assert records[0][1] == {'Time': '10:00:00', 'U_L1_Avg': '230'}
+    assert records[2][1]['Time'] == '10:20:00'
+
+
+def test_namespaced_tags_and_attributes_use_local_names(tmp_path):
+    rows = ''.join(f'<s:Fila s:id="{index}"><s:Time>10:0{index}:00</s:Time><s:Vacio> </s:Vacio></s:Fila>'
+                   for index in range(2))
+    path = write_xml(tmp_path, f'<s:Datos xmlns:s="urn:sonel:pqm">{rows}</s:Datos>')
+
+    records = list(XMLParser._iter_records(str(path)))
+
+    assert records == [('Fila', {'id': '0', 'Time': '10:00:00', 'Vacio': None}),
+                       ('Fila', {'id': '1', 'Time': '10:01:00', 'Vacio': None})]
+
+
+def test_single_record_document(tmp_path):
+    path = write_xml(tmp_path, '<Exportacion><Equipo><Serie>12345</Serie></Equipo>'
+                               f'<Datos>{record("10:00:00", 230)}</Datos></Exportacion>')
+
+    assert list(XMLParser._iter_records(str(path))) == [('Registro', {'Time': '10:00:00', 'U_L1_Avg': '230'})]
+
+
+def test_iter_chunks_keeps_mapped_columns(tmp_path):
+    path = write_xml(tmp_path, '<Exportacion><Equipo><Serie>12345</Serie><Modelo>PQM-702</Modelo></Equipo>'
+                               '<Datos>' + ''.join(record(f'10:{minute}0:00', 230 + minute)
+                                                    for minute in range(5)) + '</Datos></Exportacion>')
+
+    chunks = list(XMLParser.iter_chunks(str(path), chunk_rows=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert list(chunks[0].columns) == ['Time', 'U L1 Avg']
+    assert chunks[0].attrs['column_map'] == {'time': 'Time', 'u_l1': 'U L1 Avg'}
+    trace = chunks[-1].attrs['parse_info']
+    assert trace['record_tag'] == 'Registro'
+    assert (trace['chunks'], trace['rows']) == (3, 5)